@@ -6,6 +6,8 @@ from tkinter import ttk, filedialog, messagebox
 import cv2
 import numpy as np
 from PIL import Image, ImageTk
+import sys
+import os
 
 from generacion_ruido import (
     aplicar_ruido_sal_pimienta,
@@ -32,6 +34,13 @@ from filtros_no_lineales import (
 
 from visualizador import crear_canvas_matplotlib, mostrar_imagen_en_canvas, mostrar_histograma_en_canvas
 
+# Importar la lectura de imágenes compartida desde el directorio raíz del proyecto
+directorio_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if directorio_raiz not in sys.path:
+    sys.path.insert(0, directorio_raiz)
+
+from ImagenDigital.procesamiento_basico import leer_imagen
+
 
 class InterfazPractica2:
     """
@@ -308,7 +317,7 @@ class InterfazPractica2:
         
         if ruta:
             self.ruta_imagen = ruta
-            self.imagen_original = cv2.imread(ruta)
+            self.imagen_original = leer_imagen(ruta)
             
             if self.imagen_original is None:
                 messagebox.showerror("Error", "No se pudo cargar la imagen")
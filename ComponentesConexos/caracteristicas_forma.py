@@ -0,0 +1,141 @@
+"""
+Características de Forma de Componentes Conexos
+Calcula momentos y descriptores de forma de todos los componentes a la vez
+a partir de la imagen de etiquetas, sin recorrer los componentes en Python
+"""
+
+import numpy as np
+
+from logica_componentes import TablaComponentes
+
+
+def _perimetro_crofton(labels, num_labels):
+    """
+    Perímetro aproximado de cada etiqueta con la fórmula de Cauchy-Crofton
+    
+    Cuenta las transiciones entre etiquetas distintas en 4 direcciones
+    (0°, 90°, 45° y 135°) y las combina como
+    P = π/8 * (N0 + N90 + (N45 + N135) / √2)
+    """
+    relleno = np.pad(labels, 1)
+    pares = [
+        (relleno[:, :-1], relleno[:, 1:], 1.0),                 # 0°
+        (relleno[:-1, :], relleno[1:, :], 1.0),                 # 90°
+        (relleno[:-1, 1:], relleno[1:, :-1], 1 / np.sqrt(2)),   # 45°
+        (relleno[:-1, :-1], relleno[1:, 1:], 1 / np.sqrt(2))    # 135°
+    ]
+    
+    perimetro = np.zeros(num_labels, dtype=np.float64)
+    for a, b, peso in pares:
+        diferente = a != b
+        transiciones = (np.bincount(a[diferente], minlength=num_labels) +
+                        np.bincount(b[diferente], minlength=num_labels))
+        perimetro += peso * transiciones[:num_labels]
+    
+    return perimetro * np.pi / 8
+
+
+def calcular_caracteristicas_forma(labels, num_labels=None, estadisticas=None):
+    """
+    Calcula descriptores de forma de todos los componentes de una vez
+    
+    Las sumas de coordenadas se obtienen con np.bincount sobre las etiquetas
+    de los píxeles de objeto, ponderadas por x, y, x², y² y xy.
+    
+    Args:
+        labels: Imagen de etiquetas (0 = fondo)
+        num_labels: Número de etiquetas incluido el fondo (None = máximo + 1)
+        estadisticas: TablaComponentes opcional; si se indica, se devuelven
+                      las características de sus filas (por 'id') y se usan
+                      sus rectángulos para la extensión
+    
+    Returns:
+        Diccionario campo -> arreglo con una fila por componente:
+        id, area, cx, cy, mu20, mu02, mu11, orientacion (radianes),
+        excentricidad, eje_mayor, eje_menor, diametro_equivalente,
+        extension, perimetro (Cauchy-Crofton) y circularidad
+    """
+    if num_labels is None:
+        num_labels = int(labels.max()) + 1
+    
+    etiquetas = labels.ravel()
+    posiciones = np.flatnonzero(etiquetas)
+    etiquetas_objeto = etiquetas[posiciones]
+    ancho_imagen = labels.shape[1]
+    y = (posiciones // ancho_imagen).astype(np.float64)
+    x = (posiciones % ancho_imagen).astype(np.float64)
+    
+    # ===== MOMENTOS =====
+    
+    m00 = np.bincount(etiquetas_objeto, minlength=num_labels).astype(np.float64)
+    m10 = np.bincount(etiquetas_objeto, weights=x, minlength=num_labels)
+    m01 = np.bincount(etiquetas_objeto, weights=y, minlength=num_labels)
+    m20 = np.bincount(etiquetas_objeto, weights=x * x, minlength=num_labels)
+    m02 = np.bincount(etiquetas_objeto, weights=y * y, minlength=num_labels)
+    m11 = np.bincount(etiquetas_objeto, weights=x * y, minlength=num_labels)
+    
+    area = np.maximum(m00, 1)
+    cx = m10 / area
+    cy = m01 / area
+    
+    # Momentos centrales normalizados por el área (covarianza)
+    mu20 = m20 / area - cx * cx
+    mu02 = m02 / area - cy * cy
+    mu11 = m11 / area - cx * cy
+    
+    # ===== ELIPSE EQUIVALENTE =====
+    
+    semi_suma = (mu20 + mu02) / 2
+    raiz = np.sqrt(((mu20 - mu02) / 2) ** 2 + mu11 ** 2)
+    lambda_1 = semi_suma + raiz
+    lambda_2 = np.maximum(semi_suma - raiz, 0)
+    
+    orientacion = 0.5 * np.arctan2(2 * mu11, mu20 - mu02)
+    excentricidad = np.sqrt(1 - np.divide(lambda_2, lambda_1,
+                                          out=np.ones_like(lambda_1), where=lambda_1 > 0))
+    eje_mayor = 4 * np.sqrt(lambda_1)
+    eje_menor = 4 * np.sqrt(lambda_2)
+    diametro_equivalente = np.sqrt(4 * m00 / np.pi)
+    
+    # ===== PERÍMETRO APROXIMADO =====
+    
+    perimetro = _perimetro_crofton(labels, num_labels)
+    circularidad = np.divide(4 * np.pi * m00, perimetro ** 2,
+                             out=np.zeros_like(m00), where=perimetro > 0)
+    
+    # ===== SELECCIÓN DE FILAS Y EXTENSIÓN =====
+    
+    if isinstance(estadisticas, TablaComponentes):
+        ids = np.asarray(estadisticas['id'], dtype=np.int64)
+        area_bbox = estadisticas['ancho'].astype(np.float64) * estadisticas['alto']
+    else:
+        ids = np.arange(1, num_labels)
+        x_min = np.full(num_labels, np.inf)
+        y_min = np.full(num_labels, np.inf)
+        x_max = np.full(num_labels, -np.inf)
+        y_max = np.full(num_labels, -np.inf)
+        np.minimum.at(x_min, etiquetas_objeto, x)
+        np.minimum.at(y_min, etiquetas_objeto, y)
+        np.maximum.at(x_max, etiquetas_objeto, x)
+        np.maximum.at(y_max, etiquetas_objeto, y)
+        area_bbox = ((x_max - x_min + 1) * (y_max - y_min + 1))[ids]
+    
+    extension = np.divide(m00[ids], area_bbox, out=np.zeros(len(ids)), where=area_bbox > 0)
+    
+    return {
+        'id': ids,
+        'area': m00[ids].astype(np.int64),
+        'cx': cx[ids],
+        'cy': cy[ids],
+        'mu20': mu20[ids],
+        'mu02': mu02[ids],
+        'mu11': mu11[ids],
+        'orientacion': orientacion[ids],
+        'excentricidad': excentricidad[ids],
+        'eje_mayor': eje_mayor[ids],
+        'eje_menor': eje_menor[ids],
+        'diametro_equivalente': diametro_equivalente[ids],
+        'extension': extension,
+        'perimetro': perimetro[ids],
+        'circularidad': circularidad[ids]
+    }
@@ -0,0 +1,258 @@
+"""
+Etiquetado de Componentes Conexos por Bloques
+Etiqueta imágenes binarias muy grandes por bloques independientes y une las
+etiquetas a través de las costuras con una estructura union-find
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from logica_componentes import TablaComponentes
+
+
+class ConjuntosDisjuntos:
+    """
+    Estructura union-find sobre las etiquetas provisionales 0..n
+    
+    La raíz de cada conjunto es siempre la etiqueta más pequeña, de modo que
+    el resultado no depende del orden en que se procesan las uniones.
+    """
+    
+    def __init__(self, n):
+        self.padre = np.arange(n + 1, dtype=np.int64)
+    
+    def encontrar(self, a):
+        """Retorna la raíz de a comprimiendo el camino a la mitad"""
+        padre = self.padre
+        while padre[a] != a:
+            padre[a] = padre[padre[a]]
+            a = padre[a]
+        return a
+    
+    def unir(self, a, b):
+        """Une los conjuntos de a y b"""
+        raiz_a = self.encontrar(a)
+        raiz_b = self.encontrar(b)
+        if raiz_a < raiz_b:
+            self.padre[raiz_b] = raiz_a
+        elif raiz_b < raiz_a:
+            self.padre[raiz_a] = raiz_b
+    
+    def unir_pares(self, pares_a, pares_b):
+        """Une todos los pares (a, b), descartando repetidos antes del recorrido"""
+        if len(pares_a) == 0:
+            return
+        pares = np.unique(np.stack([pares_a, pares_b], axis=1), axis=0)
+        for a, b in pares.tolist():
+            self.unir(a, b)
+    
+    def raices(self):
+        """Retorna la raíz de cada etiqueta, comprimiendo todos los caminos a la vez"""
+        padre = self.padre
+        while True:
+            abuelo = padre[padre]
+            if np.array_equal(abuelo, padre):
+                return padre
+            padre = abuelo
+
+
+def tipo_entero_minimo(valor_maximo):
+    """Tipo entero sin signo más angosto capaz de representar valor_maximo"""
+    for tipo in (np.uint8, np.uint16, np.uint32):
+        if valor_maximo <= np.iinfo(tipo).max:
+            return tipo
+    return np.uint64
+
+
+def _dividir_en_bloques(forma, tamaño_bloque):
+    """Genera los rectángulos (fila, columna, alto, ancho) que cubren la imagen"""
+    altura, ancho = forma
+    return [
+        (y, x, min(tamaño_bloque, altura - y), min(tamaño_bloque, ancho - x))
+        for y in range(0, altura, tamaño_bloque)
+        for x in range(0, ancho, tamaño_bloque)
+    ]
+
+
+def _etiquetar_bloque(imagen_binaria, bloque, conectividad):
+    """Etiqueta un bloque de la imagen con OpenCV"""
+    y, x, alto, ancho = bloque
+    region = imagen_binaria[y:y + alto, x:x + ancho]
+    if region.dtype != np.uint8:
+        region = (region != 0).astype(np.uint8)
+    return cv2.connectedComponentsWithStats(np.ascontiguousarray(region), connectivity=conectividad)
+
+
+def _pares_costura(lado_a, lado_b, conectividad):
+    """
+    Pares de etiquetas que se tocan entre dos líneas de píxeles adyacentes
+    (filas o columnas a ambos lados de una costura)
+    """
+    desplazamientos = [(lado_a, lado_b)]
+    if conectividad == 8:
+        desplazamientos += [(lado_a[:-1], lado_b[1:]), (lado_a[1:], lado_b[:-1])]
+    
+    pares_a, pares_b = [], []
+    for a, b in desplazamientos:
+        tocan = (a > 0) & (b > 0)
+        pares_a.append(a[tocan])
+        pares_b.append(b[tocan])
+    return np.concatenate(pares_a), np.concatenate(pares_b)
+
+
+def etiquetar_por_bloques(imagen_binaria, conectividad=8, tamaño_bloque=4096,
+                          ruta_salida=None, max_workers=None):
+    """
+    Etiqueta componentes conexos de una imagen grande por bloques
+    
+    Primera pasada: etiqueta cada bloque en paralelo y guarda solo sus
+    estadísticas y las líneas de borde. Las etiquetas que se tocan en las
+    costuras se unen con union-find y se calculan las estadísticas globales.
+    Segunda pasada: vuelve a etiquetar cada bloque y escribe las etiquetas
+    finales en la salida con el tipo entero más angosto posible. Así nunca se
+    mantiene en memoria una imagen de etiquetas int32 completa.
+    
+    Args:
+        imagen_binaria: Imagen binaria (H, W); puede ser un np.memmap
+        conectividad: 4 u 8
+        tamaño_bloque: Lado de los bloques en píxeles
+        ruta_salida: Archivo .npy donde escribir las etiquetas como memoria
+                     mapeada; si es None se devuelve un arreglo en memoria
+        max_workers: Hilos para etiquetar bloques (None = automático)
+    
+    Returns:
+        Tupla (num_objetos, etiquetas, estadisticas) con estadisticas como
+        TablaComponentes (área, bbox y centroide globales)
+    """
+    if conectividad not in (4, 8):
+        raise ValueError(f"Conectividad no válida: {conectividad}")
+    
+    forma = imagen_binaria.shape[:2]
+    bloques = _dividir_en_bloques(forma, tamaño_bloque)
+    
+    # ===== PRIMERA PASADA: ETIQUETAR BLOQUES Y GUARDAR BORDES =====
+    
+    def resumir_bloque(bloque):
+        num_labels, labels, stats, centroids = _etiquetar_bloque(imagen_binaria, bloque, conectividad)
+        bordes = (labels[0].copy(), labels[-1].copy(), labels[:, 0].copy(), labels[:, -1].copy())
+        return num_labels - 1, stats[1:], centroids[1:], bordes
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as ejecutor:
+        resumenes = list(ejecutor.map(resumir_bloque, bloques))
+    
+    conteos = np.array([r[0] for r in resumenes], dtype=np.int64)
+    desplazamientos = np.concatenate([[0], np.cumsum(conteos)[:-1]])
+    total_provisional = int(conteos.sum())
+    
+    # Estadísticas provisionales en coordenadas globales
+    area = np.zeros(total_provisional + 1, dtype=np.int64)
+    x0 = np.zeros(total_provisional + 1, dtype=np.int64)
+    y0 = np.zeros(total_provisional + 1, dtype=np.int64)
+    x1 = np.zeros(total_provisional + 1, dtype=np.int64)
+    y1 = np.zeros(total_provisional + 1, dtype=np.int64)
+    suma_x = np.zeros(total_provisional + 1, dtype=np.float64)
+    suma_y = np.zeros(total_provisional + 1, dtype=np.float64)
+    
+    for (y, x, _, _), (n, stats, centroids, _), inicio in zip(bloques, resumenes, desplazamientos):
+        ids = slice(inicio + 1, inicio + n + 1)
+        area[ids] = stats[:, cv2.CC_STAT_AREA]
+        x0[ids] = stats[:, cv2.CC_STAT_LEFT] + x
+        y0[ids] = stats[:, cv2.CC_STAT_TOP] + y
+        x1[ids] = x0[ids] + stats[:, cv2.CC_STAT_WIDTH]
+        y1[ids] = y0[ids] + stats[:, cv2.CC_STAT_HEIGHT]
+        suma_x[ids] = (centroids[:, 0] + x) * area[ids]
+        suma_y[ids] = (centroids[:, 1] + y) * area[ids]
+    
+    # ===== UNIÓN A TRAVÉS DE LAS COSTURAS =====
+    
+    def borde_global(indice, lado):
+        borde = resumenes[indice][3][lado].astype(np.int64)
+        borde[borde > 0] += desplazamientos[indice]
+        return borde
+    
+    indices = {(y, x): i for i, (y, x, _, _) in enumerate(bloques)}
+    filas_bloque = sorted({y for y, _, _, _ in bloques})
+    columnas_bloque = sorted({x for _, x, _, _ in bloques})
+    
+    conjuntos = ConjuntosDisjuntos(total_provisional)
+    
+    # Costuras horizontales: última fila de una banda contra la primera de la siguiente
+    for y_sup, y_inf in zip(filas_bloque[:-1], filas_bloque[1:]):
+        fila_sup = np.concatenate([borde_global(indices[(y_sup, x)], 1) for x in columnas_bloque])
+        fila_inf = np.concatenate([borde_global(indices[(y_inf, x)], 0) for x in columnas_bloque])
+        conjuntos.unir_pares(*_pares_costura(fila_sup, fila_inf, conectividad))
+    
+    # Costuras verticales: última columna de una banda contra la primera de la siguiente
+    for x_izq, x_der in zip(columnas_bloque[:-1], columnas_bloque[1:]):
+        col_izq = np.concatenate([borde_global(indices[(y, x_izq)], 3) for y in filas_bloque])
+        col_der = np.concatenate([borde_global(indices[(y, x_der)], 2) for y in filas_bloque])
+        conjuntos.unir_pares(*_pares_costura(col_izq, col_der, conectividad))
+    
+    # ===== ESTADÍSTICAS GLOBALES =====
+    
+    raices = conjuntos.raices()
+    es_raiz = raices == np.arange(total_provisional + 1)
+    es_raiz[0] = False
+    num_objetos = int(es_raiz.sum())
+    
+    # Etiqueta final compacta (1..num_objetos) para cada etiqueta provisional
+    final_de_raiz = np.zeros(total_provisional + 1, dtype=np.int64)
+    final_de_raiz[es_raiz] = np.arange(1, num_objetos + 1)
+    tabla_final = final_de_raiz[raices]
+    
+    area_final = np.bincount(tabla_final, weights=area, minlength=num_objetos + 1)[1:]
+    suma_x_final = np.bincount(tabla_final, weights=suma_x, minlength=num_objetos + 1)[1:]
+    suma_y_final = np.bincount(tabla_final, weights=suma_y, minlength=num_objetos + 1)[1:]
+    
+    x0_final = np.full(num_objetos + 1, np.iinfo(np.int64).max)
+    y0_final = np.full(num_objetos + 1, np.iinfo(np.int64).max)
+    x1_final = np.zeros(num_objetos + 1, dtype=np.int64)
+    y1_final = np.zeros(num_objetos + 1, dtype=np.int64)
+    np.minimum.at(x0_final, tabla_final, x0)
+    np.minimum.at(y0_final, tabla_final, y0)
+    np.maximum.at(x1_final, tabla_final, x1)
+    np.maximum.at(y1_final, tabla_final, y1)
+    
+    area_final = area_final.astype(np.int64)
+    estadisticas = TablaComponentes({
+        'id': np.arange(1, num_objetos + 1, dtype=np.int32),
+        'area': area_final,
+        'x': x0_final[1:],
+        'y': y0_final[1:],
+        'ancho': x1_final[1:] - x0_final[1:],
+        'alto': y1_final[1:] - y0_final[1:],
+        'cx': suma_x_final / np.maximum(area_final, 1),
+        'cy': suma_y_final / np.maximum(area_final, 1)
+    })
+    
+    # ===== SEGUNDA PASADA: ESCRIBIR ETIQUETAS FINALES =====
+    
+    tipo = tipo_entero_minimo(num_objetos)
+    tabla_final = tabla_final.astype(tipo)
+    
+    if ruta_salida is None:
+        etiquetas = np.zeros(forma, dtype=tipo)
+    else:
+        directorio = os.path.dirname(os.path.abspath(ruta_salida))
+        os.makedirs(directorio, exist_ok=True)
+        etiquetas = np.lib.format.open_memmap(ruta_salida, mode='w+', dtype=tipo, shape=forma)
+    
+    def escribir_bloque(argumentos):
+        bloque, inicio, n = argumentos
+        y, x, alto, ancho = bloque
+        _, labels, _, _ = _etiquetar_bloque(imagen_binaria, bloque, conectividad)
+        # LUT local -> final del bloque (el fondo se mantiene en 0)
+        lut = np.zeros(n + 1, dtype=tipo)
+        lut[1:] = tabla_final[inicio + 1:inicio + n + 1]
+        etiquetas[y:y + alto, x:x + ancho] = lut[labels]
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as ejecutor:
+        list(ejecutor.map(escribir_bloque, zip(bloques, desplazamientos.tolist(), conteos.tolist())))
+    
+    if isinstance(etiquetas, np.memmap):
+        etiquetas.flush()
+    
+    return num_objetos, etiquetas, estadisticas
@@ -0,0 +1,278 @@
+"""
+Índice Espacial de Componentes Conexos
+Rejilla uniforme sobre los rectángulos delimitadores y centroides de los
+componentes para consultas rápidas por región, radio y vecinos cercanos
+"""
+
+import numpy as np
+
+from logica_componentes import TablaComponentes
+
+
+def _csr_por_celda(celdas, num_celdas):
+    """
+    Agrupa elementos por celda en formato CSR
+    
+    Returns:
+        Tupla (orden, inicios): los elementos de la celda c son
+        orden[inicios[c]:inicios[c + 1]]
+    """
+    orden = np.argsort(celdas, kind='stable')
+    conteos = np.bincount(celdas, minlength=num_celdas)
+    inicios = np.zeros(num_celdas + 1, dtype=np.int64)
+    np.cumsum(conteos, out=inicios[1:])
+    return orden, inicios
+
+
+class IndiceEspacial:
+    """
+    Índice espacial de componentes basado en una rejilla uniforme
+    
+    Cada componente se registra en todas las celdas que toca su rectángulo
+    delimitador y, por separado, en la celda de su centroide. Los componentes
+    cuyo rectángulo cubre demasiadas celdas se guardan aparte y se revisan
+    siempre, para que el índice no crezca con objetos muy grandes.
+    
+    Las consultas devuelven posiciones de fila en la tabla original; use
+    tabla.seleccionar(posiciones) para obtener las estadísticas.
+    """
+    
+    def __init__(self, estadisticas, tamaño_celda=None, max_celdas_por_componente=64):
+        """
+        Construye el índice
+        
+        Args:
+            estadisticas: TablaComponentes o lista de diccionarios de
+                          componentes_conexos_4/8
+            tamaño_celda: Lado de la celda en píxeles (None = automático)
+            max_celdas_por_componente: Límite de celdas para registrar un
+                                       rectángulo en la rejilla
+        """
+        if not isinstance(estadisticas, TablaComponentes):
+            estadisticas = TablaComponentes.desde_lista(estadisticas)
+        self.tabla = estadisticas
+        
+        self.x0 = np.asarray(estadisticas['x'], dtype=np.float64)
+        self.y0 = np.asarray(estadisticas['y'], dtype=np.float64)
+        self.x1 = self.x0 + np.asarray(estadisticas['ancho'], dtype=np.float64)
+        self.y1 = self.y0 + np.asarray(estadisticas['alto'], dtype=np.float64)
+        self.cx = np.asarray(estadisticas['cx'], dtype=np.float64)
+        self.cy = np.asarray(estadisticas['cy'], dtype=np.float64)
+        
+        n = len(self.x0)
+        if n == 0:
+            self.origen_x = self.origen_y = 0.0
+            self.tamaño_celda = float(tamaño_celda or 1)
+            self.celdas_x = self.celdas_y = 1
+        else:
+            self.origen_x = min(self.x0.min(), self.cx.min())
+            self.origen_y = min(self.y0.min(), self.cy.min())
+            extension_x = max(self.x1.max(), self.cx.max()) - self.origen_x
+            extension_y = max(self.y1.max(), self.cy.max()) - self.origen_y
+            
+            if tamaño_celda is None:
+                # Unos pocos componentes por celda y celdas no menores que un objeto típico
+                tamaño_celda = max(
+                    np.sqrt(extension_x * extension_y / n) * 2,
+                    np.median(np.maximum(self.x1 - self.x0, self.y1 - self.y0)),
+                    1.0
+                )
+            self.tamaño_celda = float(tamaño_celda)
+            self.celdas_x = int(extension_x // self.tamaño_celda) + 1
+            self.celdas_y = int(extension_y // self.tamaño_celda) + 1
+        
+        self._construir_rejilla_rectangulos(max_celdas_por_componente)
+        self._construir_rejilla_centroides()
+    
+    def _celda(self, x, y):
+        """Coordenadas de celda (recortadas a la rejilla) de un punto"""
+        gx = np.clip(((np.asarray(x) - self.origen_x) // self.tamaño_celda).astype(np.int64), 0, self.celdas_x - 1)
+        gy = np.clip(((np.asarray(y) - self.origen_y) // self.tamaño_celda).astype(np.int64), 0, self.celdas_y - 1)
+        return gx, gy
+    
+    def _construir_rejilla_rectangulos(self, max_celdas_por_componente):
+        """Registra cada rectángulo en todas las celdas que cubre"""
+        num_celdas = self.celdas_x * self.celdas_y
+        gx0, gy0 = self._celda(self.x0, self.y0)
+        # El borde derecho/inferior es exclusivo: el último píxel está en x1 - 1
+        gx1, gy1 = self._celda(self.x1 - 1, self.y1 - 1)
+        ancho_celdas = gx1 - gx0 + 1
+        alto_celdas = gy1 - gy0 + 1
+        cubiertas = ancho_celdas * alto_celdas
+        
+        grandes = cubiertas > max_celdas_por_componente
+        self.grandes = np.flatnonzero(grandes)
+        
+        pequeños = np.flatnonzero(~grandes)
+        repeticiones = cubiertas[pequeños]
+        componentes = np.repeat(pequeños, repeticiones)
+        
+        # Posición de cada copia dentro del rectángulo de celdas de su componente
+        inicio_copias = np.cumsum(repeticiones) - repeticiones
+        local = np.arange(len(componentes)) - np.repeat(inicio_copias, repeticiones)
+        ancho_rep = ancho_celdas[componentes]
+        celdas = (gy0[componentes] + local // ancho_rep) * self.celdas_x + gx0[componentes] + local % ancho_rep
+        
+        orden, self.inicios_rect = _csr_por_celda(celdas, num_celdas)
+        self.componentes_rect = componentes[orden]
+    
+    def _construir_rejilla_centroides(self):
+        """Registra cada centroide en su celda"""
+        num_celdas = self.celdas_x * self.celdas_y
+        gx, gy = self._celda(self.cx, self.cy)
+        celdas = gy * self.celdas_x + gx
+        self.componentes_cent, self.inicios_cent = _csr_por_celda(celdas, num_celdas)
+    
+    def _candidatos(self, componentes, inicios, gx0, gy0, gx1, gy1):
+        """Reúne los componentes registrados en un rango de celdas"""
+        partes = []
+        for gy in range(gy0, gy1 + 1):
+            fila = gy * self.celdas_x
+            a = inicios[fila + gx0]
+            b = inicios[fila + gx1 + 1]
+            if b > a:
+                partes.append(componentes[a:b])
+        if not partes:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(partes)
+    
+    # ===== CONSULTAS =====
+    
+    def consultar_rectangulo(self, x, y, ancho, alto):
+        """
+        Componentes cuyo rectángulo delimitador se intersecta con una ROI
+        
+        Args:
+            x, y: Esquina superior izquierda de la ROI
+            ancho, alto: Dimensiones de la ROI
+        
+        Returns:
+            Posiciones de fila (ordenadas) en la tabla
+        """
+        if len(self.x0) == 0 or ancho <= 0 or alto <= 0:
+            return np.zeros(0, dtype=np.int64)
+        
+        # Margen de un píxel para ROIs con coordenadas no enteras
+        gx0, gy0 = self._celda(x - 1, y - 1)
+        gx1, gy1 = self._celda(x + ancho, y + alto)
+        candidatos = self._candidatos(self.componentes_rect, self.inicios_rect,
+                                      int(gx0), int(gy0), int(gx1), int(gy1))
+        candidatos = np.unique(np.concatenate([candidatos, self.grandes]))
+        
+        intersecta = ((self.x0[candidatos] < x + ancho) & (self.x1[candidatos] > x) &
+                      (self.y0[candidatos] < y + alto) & (self.y1[candidatos] > y))
+        return candidatos[intersecta]
+    
+    def consultar_radio(self, x, y, radio):
+        """
+        Componentes cuyo centroide está a una distancia <= radio de (x, y)
+        
+        Returns:
+            Tupla (posiciones, distancias) ordenada por distancia
+        """
+        if len(self.cx) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        
+        gx0, gy0 = self._celda(x - radio, y - radio)
+        gx1, gy1 = self._celda(x + radio, y + radio)
+        candidatos = self._candidatos(self.componentes_cent, self.inicios_cent,
+                                      int(gx0), int(gy0), int(gx1), int(gy1))
+        
+        distancias = np.hypot(self.cx[candidatos] - x, self.cy[candidatos] - y)
+        dentro = distancias <= radio
+        candidatos, distancias = candidatos[dentro], distancias[dentro]
+        orden = np.argsort(distancias, kind='stable')
+        return candidatos[orden], distancias[orden]
+    
+    def vecinos_mas_cercanos(self, x, y, k=1):
+        """
+        Los k componentes con centroide más cercano a (x, y)
+        
+        Recorre anillos de celdas alrededor del punto hasta tener k candidatos
+        y que ningún anillo sin revisar pueda contener uno más cercano.
+        
+        Returns:
+            Tupla (posiciones, distancias) ordenada por distancia
+        """
+        n = len(self.cx)
+        k = min(k, n)
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        
+        gx, gy = (int(v) for v in self._celda(x, y))
+        max_anillo = max(self.celdas_x, self.celdas_y)
+        candidatos = np.zeros(0, dtype=np.int64)
+        
+        for anillo in range(max_anillo + 1):
+            gx0, gx1 = gx - anillo, gx + anillo
+            gy0, gy1 = gy - anillo, gy + anillo
+            partes = []
+            # Filas superior e inferior completas y columnas laterales del anillo
+            for fila in {gy0, gy1}:
+                if 0 <= fila < self.celdas_y:
+                    partes.append(self._candidatos(self.componentes_cent, self.inicios_cent,
+                                                   max(gx0, 0), fila, min(gx1, self.celdas_x - 1), fila))
+            for columna in {gx0, gx1}:
+                if 0 <= columna < self.celdas_x and gy1 - gy0 > 1:
+                    partes.append(self._candidatos(self.componentes_cent, self.inicios_cent,
+                                                   columna, max(gy0 + 1, 0), columna,
+                                                   min(gy1 - 1, self.celdas_y - 1)))
+            if partes:
+                candidatos = np.concatenate([candidatos] + partes)
+            
+            if len(candidatos) >= k:
+                distancias = np.hypot(self.cx[candidatos] - x, self.cy[candidatos] - y)
+                seleccion = np.argpartition(distancias, k - 1)[:k]
+                # Todo lo no revisado está al menos a 'anillo' celdas completas del punto
+                if distancias[seleccion].max() <= anillo * self.tamaño_celda:
+                    break
+        
+        distancias = np.hypot(self.cx[candidatos] - x, self.cy[candidatos] - y)
+        orden = np.argsort(distancias, kind='stable')[:k]
+        return candidatos[orden], distancias[orden]
+    
+    def pares_cercanos(self, cx, cy, radio):
+        """
+        Todos los pares (consulta, componente) con centroides a distancia <= radio
+        
+        Versión vectorizada de consultar_radio para muchos puntos a la vez:
+        cada punto se cruza con los componentes de las celdas vecinas usando
+        los rangos CSR de la rejilla, sin recorrer los puntos en Python.
+        
+        Args:
+            cx, cy: Arreglos con las coordenadas de los puntos de consulta
+            radio: Distancia máxima
+        
+        Returns:
+            Tupla (indices_consulta, posiciones, distancias)
+        """
+        cx = np.asarray(cx, dtype=np.float64)
+        cy = np.asarray(cy, dtype=np.float64)
+        if len(cx) == 0 or len(self.cx) == 0:
+            vacio = np.zeros(0, dtype=np.int64)
+            return vacio, vacio, np.zeros(0)
+        
+        gx, gy = self._celda(cx, cy)
+        alcance = int(np.ceil(radio / self.tamaño_celda))
+        
+        consultas, posiciones = [], []
+        for dy in range(-alcance, alcance + 1):
+            for dx in range(-alcance, alcance + 1):
+                vx, vy = gx + dx, gy + dy
+                valida = (vx >= 0) & (vx < self.celdas_x) & (vy >= 0) & (vy < self.celdas_y)
+                indices = np.flatnonzero(valida)
+                celdas = vy[indices] * self.celdas_x + vx[indices]
+                inicio = self.inicios_cent[celdas]
+                conteo = self.inicios_cent[celdas + 1] - inicio
+                
+                # Expandir cada consulta a los componentes de su celda vecina
+                repetidas = np.repeat(indices, conteo)
+                desplazamiento = np.arange(len(repetidas)) - np.repeat(np.cumsum(conteo) - conteo, conteo)
+                consultas.append(repetidas)
+                posiciones.append(self.componentes_cent[np.repeat(inicio, conteo) + desplazamiento])
+        
+        consultas = np.concatenate(consultas)
+        posiciones = np.concatenate(posiciones)
+        distancias = np.hypot(self.cx[posiciones] - cx[consultas], self.cy[posiciones] - cy[consultas])
+        dentro = distancias <= radio
+        return consultas[dentro], posiciones[dentro], distancias[dentro]
@@ -11,6 +11,8 @@ from PIL import Image, ImageTk
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
+import sys
+import os
 
 from logica_componentes import (
     componentes_conexos_4,
@@ -22,6 +24,13 @@ from logica_componentes import (
     obtener_resumen_estadistico
 )
 
+# Importar la lectura de imágenes compartida desde el directorio raíz del proyecto
+directorio_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if directorio_raiz not in sys.path:
+    sys.path.insert(0, directorio_raiz)
+
+from ImagenDigital.procesamiento_basico import leer_imagen
+
 
 class InterfazComponentesConexos:
     def __init__(self, root):
@@ -130,7 +139,7 @@ class InterfazComponentesConexos:
         )
         
         if ruta:
-            self.imagen_original = cv2.imread(ruta, cv2.IMREAD_GRAYSCALE)
+            self.imagen_original = leer_imagen(ruta, 'grises')
             if self.imagen_original is None:
                 messagebox.showerror("Error", "No se pudo cargar la imagen")
                 return
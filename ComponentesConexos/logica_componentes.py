@@ -5,6 +5,8 @@ Implementa algoritmos de conectividad 4 y 8 para análisis de objetos en imágen
 
 import cv2
 import numpy as np
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple, Dict, List
 
 
@@ -23,8 +25,7 @@ def binarizar_imagen(imagen, umbral=127):
         imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
     
     # Verificar si ya es binaria
-    valores_unicos = np.unique(imagen)
-    if len(valores_unicos) <= 2:
+    if es_binaria(imagen):
         return imagen
     
     # Binarizar
@@ -32,6 +33,65 @@ def binarizar_imagen(imagen, umbral=127):
     return img_binaria
 
 
+def es_binaria(imagen):
+    """
+    Verifica en O(N) si la imagen tiene como máximo dos valores distintos
+    
+    Para uint8 cuenta los niveles ocupados del histograma; para otros tipos
+    comprueba que cada píxel sea igual al mínimo o al máximo.
+    """
+    if imagen.size == 0:
+        return True
+    
+    if imagen.dtype == np.uint8:
+        histograma = cv2.calcHist([imagen], [0], None, [256], [0, 256])
+        return np.count_nonzero(histograma) <= 2
+    
+    minimo, maximo = imagen.min(), imagen.max()
+    return bool(np.all((imagen == minimo) | (imagen == maximo)))
+
+
+def _etiquetar(imagen_binaria, conectividad):
+    """Ejecuta el etiquetado de OpenCV sobre una imagen ya binarizada"""
+    return cv2.connectedComponentsWithStats(imagen_binaria, connectivity=conectividad)
+
+
+class ResultadoConectividad(Mapping):
+    """
+    Resultado de una conectividad cuya 'imagen_coloreada' se calcula
+    la primera vez que se solicita
+    
+    Se comporta como un diccionario de solo lectura con las claves
+    num_objetos, labels, estadisticas e imagen_coloreada: la clave perezosa
+    aparece en in, get, keys, items y len aunque aún no se haya calculado.
+    """
+    
+    CLAVE_PEREZOSA = 'imagen_coloreada'
+    
+    def __init__(self, **datos):
+        self._datos = dict(datos)
+    
+    def __getitem__(self, clave):
+        if clave == self.CLAVE_PEREZOSA and clave not in self._datos:
+            self._datos[clave] = colorear_componentes(self._datos['labels'],
+                                                      self._datos['num_objetos'] + 1)
+        return self._datos[clave]
+    
+    def __contains__(self, clave):
+        return clave == self.CLAVE_PEREZOSA or clave in self._datos
+    
+    def __iter__(self):
+        yield from self._datos
+        if self.CLAVE_PEREZOSA not in self._datos:
+            yield self.CLAVE_PEREZOSA
+    
+    def __len__(self):
+        return len(self._datos) + (self.CLAVE_PEREZOSA not in self._datos)
+    
+    def __repr__(self):
+        return f"ResultadoConectividad({dict(self)!r})"
+
+
 def componentes_conexos_4(imagen_binaria):
     """
     Encuentra componentes conexos usando conectividad de 4 vecinos
@@ -47,10 +107,7 @@ def componentes_conexos_4(imagen_binaria):
     imagen_binaria = binarizar_imagen(imagen_binaria)
     
     # Aplicar algoritmo de componentes conexos con conectividad 4
-    num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(
-        imagen_binaria, 
-        connectivity=4
-    )
+    num_labels, labels, stats, centroids = _etiquetar(imagen_binaria, 4)
     
     # El primer componente (0) es el fondo, así que restamos 1
     num_objetos = num_labels - 1
@@ -79,10 +136,7 @@ def componentes_conexos_8(imagen_binaria):
     imagen_binaria = binarizar_imagen(imagen_binaria)
     
     # Aplicar algoritmo de componentes conexos con conectividad 8
-    num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(
-        imagen_binaria, 
-        connectivity=8
-    )
+    num_labels, labels, stats, centroids = _etiquetar(imagen_binaria, 8)
     
     # El primer componente (0) es el fondo, así que restamos 1
     num_objetos = num_labels - 1
@@ -96,6 +150,133 @@ def componentes_conexos_8(imagen_binaria):
     return num_objetos, labels, imagen_coloreada, estadisticas
 
 
+class RenderizadorComponentes:
+    """
+    Renderizador de componentes con paleta en caché
+    
+    La paleta se genera con un generador propio (no toca el estado global de
+    NumPy) y solo crece cuando aparecen más etiquetas. Con hasta 256
+    etiquetas se aplica con cv2.LUT; por encima se usa np.take sobre la
+    paleta. Al dibujar información, el texto se omite cuando hay más
+    componentes que max_componentes_texto.
+    """
+    
+    # Colores para dibujar
+    COLORES = [
+        (0, 255, 0),    # Verde
+        (255, 0, 0),    # Azul
+        (0, 0, 255),    # Rojo
+        (255, 255, 0),  # Cian
+        (255, 0, 255),  # Magenta
+        (0, 255, 255),  # Amarillo
+    ]
+    
+    def __init__(self, semilla=42, max_componentes_texto=200):
+        """
+        Args:
+            semilla: Semilla de la paleta (colores consistentes entre llamadas)
+            max_componentes_texto: Máximo de componentes para dibujar texto
+                                   y círculos; por encima se usa el modo denso
+        """
+        self.semilla = semilla
+        self.max_componentes_texto = max_componentes_texto
+        self._paleta = np.zeros((0, 3), dtype=np.uint8)
+        self._lut = None
+    
+    def obtener_paleta(self, num_labels):
+        """Retorna la paleta (num_labels, 3) con el fondo en negro"""
+        if len(self._paleta) < num_labels:
+            # RandomState genera la misma secuencia para cualquier tamaño, así
+            # que los colores ya asignados no cambian al crecer la paleta
+            tamaño = max(num_labels, 2 * len(self._paleta), 256)
+            generador = np.random.RandomState(self.semilla)
+            self._paleta = generador.randint(0, 255, size=(tamaño, 3), dtype=np.uint8)
+            self._paleta[0] = [0, 0, 0]  # Fondo negro
+            self._lut = self._paleta[:256].reshape(1, 256, 3).copy()
+        return self._paleta[:num_labels]
+    
+    def colorear(self, labels, num_labels):
+        """Crea la imagen coloreada de una matriz de etiquetas"""
+        paleta = self.obtener_paleta(num_labels)
+        
+        if num_labels <= 256:
+            etiquetas_8 = labels.astype(np.uint8)
+            return cv2.LUT(cv2.merge([etiquetas_8, etiquetas_8, etiquetas_8]), self._lut)
+        
+        return np.take(paleta, labels, axis=0)
+    
+    def dibujar_con_info(self, imagen_original, estadisticas, max_componentes_texto=None):
+        """
+        Dibuja rectángulos, centroides y texto de cada componente
+        
+        Con más de max_componentes_texto componentes dibuja todos los
+        rectángulos con una llamada a cv2.polylines por color y marca los
+        centroides como píxeles, sin texto.
+        """
+        if max_componentes_texto is None:
+            max_componentes_texto = self.max_componentes_texto
+        
+        # Convertir a BGR si es necesario
+        if len(imagen_original.shape) == 2:
+            imagen_resultado = cv2.cvtColor(imagen_original, cv2.COLOR_GRAY2BGR)
+        else:
+            imagen_resultado = imagen_original.copy()
+        
+        if isinstance(estadisticas, TablaComponentes) and len(estadisticas) > max_componentes_texto:
+            return self._dibujar_denso(imagen_resultado, estadisticas)
+        
+        return self._dibujar_detallado(imagen_resultado, estadisticas)
+    
+    def _dibujar_detallado(self, imagen_resultado, estadisticas):
+        """Rectángulo, centroide y texto por componente"""
+        for i, obj in enumerate(estadisticas):
+            color = self.COLORES[i % len(self.COLORES)]
+            
+            # Dibujar rectángulo delimitador
+            x, y, w, h = obj['x'], obj['y'], obj['ancho'], obj['alto']
+            cv2.rectangle(imagen_resultado, (x, y), (x + w, y + h), color, 2)
+            
+            # Dibujar centroide
+            cx, cy = obj['centroide']
+            cv2.circle(imagen_resultado, (cx, cy), 5, color, -1)
+            
+            # Añadir texto con ID y área
+            texto = f"#{obj['id']} A:{obj['area']}"
+            cv2.putText(imagen_resultado, texto, (x, y - 10),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+        
+        return imagen_resultado
+    
+    def _dibujar_denso(self, imagen_resultado, tabla):
+        """Rectángulos agrupados por color y centroides como píxeles, sin texto"""
+        x0 = tabla['x'].astype(np.int32)
+        y0 = tabla['y'].astype(np.int32)
+        x1 = x0 + tabla['ancho'].astype(np.int32)
+        y1 = y0 + tabla['alto'].astype(np.int32)
+        esquinas = np.stack([
+            np.stack([x0, y0], axis=1),
+            np.stack([x1, y0], axis=1),
+            np.stack([x1, y1], axis=1),
+            np.stack([x0, y1], axis=1)
+        ], axis=1)
+        
+        alto, ancho = imagen_resultado.shape[:2]
+        cx = np.clip(tabla['cx'].astype(np.int64), 0, ancho - 1)
+        cy = np.clip(tabla['cy'].astype(np.int64), 0, alto - 1)
+        
+        indices = np.arange(len(tabla)) % len(self.COLORES)
+        for k, color in enumerate(self.COLORES):
+            grupo = indices == k
+            cv2.polylines(imagen_resultado, list(esquinas[grupo]), True, color, 1)
+            imagen_resultado[cy[grupo], cx[grupo]] = color
+        
+        return imagen_resultado
+
+
+# Renderizador compartido por las funciones del módulo
+_renderizador = RenderizadorComponentes()
+
+
 def colorear_componentes(labels, num_labels):
     """
     Crea una imagen coloreada donde cada componente tiene un color diferente
@@ -107,15 +288,141 @@ def colorear_componentes(labels, num_labels):
     Returns:
         Imagen RGB con componentes coloreados
     """
-    # Crear una paleta de colores
-    np.random.seed(42)  # Para colores consistentes
-    colors = np.random.randint(0, 255, size=(num_labels, 3), dtype=np.uint8)
-    colors[0] = [0, 0, 0]  # Fondo negro
+    return _renderizador.colorear(labels, num_labels)
+
+
+class TablaComponentes:
+    """
+    Estadísticas de componentes conexos en formato columnar
+    
+    Guarda un arreglo por campo (id, área, bbox y centroide) en lugar de una
+    lista de diccionarios, de modo que filtrar, ordenar y resumir son
+    operaciones vectorizadas. Iterar o indexar con un entero produce los
+    diccionarios de siempre bajo demanda, para la interfaz.
+    """
     
-    # Mapear etiquetas a colores
-    imagen_coloreada = colors[labels]
+    CAMPOS = ('id', 'area', 'x', 'y', 'ancho', 'alto', 'cx', 'cy')
+    
+    def __init__(self, columnas):
+        """
+        Args:
+            columnas: Diccionario campo -> arreglo 1D, todos de igual longitud
+        """
+        self.columnas = columnas
+    
+    @classmethod
+    def desde_opencv(cls, stats, centroids):
+        """Construye la tabla desde la salida de cv2.connectedComponentsWithStats (sin el fondo)"""
+        return cls({
+            'id': np.arange(1, len(stats), dtype=np.int32),
+            'area': stats[1:, cv2.CC_STAT_AREA],
+            'x': stats[1:, cv2.CC_STAT_LEFT],
+            'y': stats[1:, cv2.CC_STAT_TOP],
+            'ancho': stats[1:, cv2.CC_STAT_WIDTH],
+            'alto': stats[1:, cv2.CC_STAT_HEIGHT],
+            'cx': centroids[1:, 0],
+            'cy': centroids[1:, 1]
+        })
     
-    return imagen_coloreada
+    @classmethod
+    def desde_lista(cls, estadisticas):
+        """Construye la tabla desde la lista de diccionarios de la versión anterior"""
+        return cls({
+            'id': np.array([obj['id'] for obj in estadisticas], dtype=np.int32),
+            'area': np.array([obj['area'] for obj in estadisticas], dtype=np.int64),
+            'x': np.array([obj['x'] for obj in estadisticas], dtype=np.int64),
+            'y': np.array([obj['y'] for obj in estadisticas], dtype=np.int64),
+            'ancho': np.array([obj['ancho'] for obj in estadisticas], dtype=np.int64),
+            'alto': np.array([obj['alto'] for obj in estadisticas], dtype=np.int64),
+            'cx': np.array([obj['centroide'][0] for obj in estadisticas], dtype=np.float64),
+            'cy': np.array([obj['centroide'][1] for obj in estadisticas], dtype=np.float64)
+        })
+    
+    @classmethod
+    def concatenar(cls, tablas):
+        """Une varias tablas conservando solo los campos comunes a todas"""
+        campos = [c for c in tablas[0].columnas if all(c in t.columnas for t in tablas[1:])]
+        return cls({c: np.concatenate([t.columnas[c] for t in tablas]) for c in campos})
+    
+    def __len__(self):
+        return len(self.columnas['id'])
+    
+    def __getitem__(self, clave):
+        """Columna si la clave es un nombre de campo, diccionario si es un entero"""
+        if isinstance(clave, str):
+            return self.columnas[clave]
+        if isinstance(clave, (int, np.integer)):
+            return self.fila(clave)
+        return self.seleccionar(clave)
+    
+    def __iter__(self):
+        """Genera los diccionarios de cada componente bajo demanda"""
+        columnas = [self.columnas[campo].tolist() for campo in self.CAMPOS]
+        for id_, area, x, y, ancho, alto, cx, cy in zip(*columnas):
+            yield {
+                'id': id_,
+                'area': area,
+                'x': x,
+                'y': y,
+                'ancho': ancho,
+                'alto': alto,
+                'centroide': (int(cx), int(cy))
+            }
+    
+    def fila(self, indice):
+        """Retorna el diccionario del componente en la posición indicada"""
+        c = self.columnas
+        return {
+            'id': int(c['id'][indice]),
+            'area': int(c['area'][indice]),
+            'x': int(c['x'][indice]),
+            'y': int(c['y'][indice]),
+            'ancho': int(c['ancho'][indice]),
+            'alto': int(c['alto'][indice]),
+            'centroide': (int(c['cx'][indice]), int(c['cy'][indice]))
+        }
+    
+    def a_lista(self):
+        """Convierte la tabla a la lista de diccionarios usada por la interfaz"""
+        return list(self)
+    
+    def seleccionar(self, seleccion):
+        """Retorna una nueva tabla con las filas indicadas (máscara booleana, índices o slice)"""
+        return TablaComponentes({campo: col[seleccion] for campo, col in self.columnas.items()})
+    
+    def filtrar_por_area(self, area_min=0, area_max=float('inf')):
+        """Filtra componentes por área sin recorrerlos en Python"""
+        area = self.columnas['area']
+        return self.seleccionar((area >= area_min) & (area <= area_max))
+    
+    def ordenar_por(self, campo, descendente=False):
+        """Retorna la tabla ordenada por un campo"""
+        orden = np.argsort(self.columnas[campo], kind='stable')
+        if descendente:
+            orden = orden[::-1]
+        return self.seleccionar(orden)
+    
+    def resumen(self):
+        """Resumen estadístico de las áreas (mismo formato que obtener_resumen_estadistico)"""
+        areas = self.columnas['area']
+        if len(areas) == 0:
+            return {
+                'num_objetos': 0,
+                'area_total': 0,
+                'area_promedio': 0,
+                'area_min': 0,
+                'area_max': 0,
+                'area_std': 0
+            }
+        
+        return {
+            'num_objetos': len(areas),
+            'area_total': int(areas.sum(dtype=np.int64)),
+            'area_promedio': areas.mean(),
+            'area_min': int(areas.min()),
+            'area_max': int(areas.max()),
+            'area_std': areas.std()
+        }
 
 
 def procesar_estadisticas(stats, centroids, num_labels):
@@ -128,33 +435,13 @@ def procesar_estadisticas(stats, centroids, num_labels):
         num_labels: Número de etiquetas
     
     Returns:
-        Lista de diccionarios con información de cada objeto
+        TablaComponentes con la información de cada objeto (iterable como
+        lista de diccionarios)
     """
-    estadisticas = []
-    
-    # Saltar el índice 0 (fondo)
-    for i in range(1, num_labels):
-        x = stats[i, cv2.CC_STAT_LEFT]
-        y = stats[i, cv2.CC_STAT_TOP]
-        w = stats[i, cv2.CC_STAT_WIDTH]
-        h = stats[i, cv2.CC_STAT_HEIGHT]
-        area = stats[i, cv2.CC_STAT_AREA]
-        cx, cy = centroids[i]
-        
-        estadisticas.append({
-            'id': i,
-            'area': area,
-            'x': x,
-            'y': y,
-            'ancho': w,
-            'alto': h,
-            'centroide': (int(cx), int(cy))
-        })
-    
-    return estadisticas
+    return TablaComponentes.desde_opencv(stats[:num_labels], centroids[:num_labels])
 
 
-def dibujar_componentes_con_info(imagen_original, labels, estadisticas):
+def dibujar_componentes_con_info(imagen_original, labels, estadisticas, max_componentes_texto=None):
     """
     Dibuja los componentes con información sobre cada uno
     
@@ -162,72 +449,51 @@ def dibujar_componentes_con_info(imagen_original, labels, estadisticas):
         imagen_original: Imagen original
         labels: Matriz de etiquetas
         estadisticas: Lista de estadísticas de objetos
+        max_componentes_texto: Máximo de componentes para dibujar texto
+                               (None = valor del renderizador)
     
     Returns:
         Imagen con componentes marcados
     """
-    # Convertir a BGR si es necesario
-    if len(imagen_original.shape) == 2:
-        imagen_resultado = cv2.cvtColor(imagen_original, cv2.COLOR_GRAY2BGR)
-    else:
-        imagen_resultado = imagen_original.copy()
-    
-    # Colores para dibujar
-    colores = [
-        (0, 255, 0),    # Verde
-        (255, 0, 0),    # Azul
-        (0, 0, 255),    # Rojo
-        (255, 255, 0),  # Cian
-        (255, 0, 255),  # Magenta
-        (0, 255, 255),  # Amarillo
-    ]
-    
-    for i, obj in enumerate(estadisticas):
-        color = colores[i % len(colores)]
-        
-        # Dibujar rectángulo delimitador
-        x, y, w, h = obj['x'], obj['y'], obj['ancho'], obj['alto']
-        cv2.rectangle(imagen_resultado, (x, y), (x + w, y + h), color, 2)
-        
-        # Dibujar centroide
-        cx, cy = obj['centroide']
-        cv2.circle(imagen_resultado, (cx, cy), 5, color, -1)
-        
-        # Añadir texto con ID y área
-        texto = f"#{obj['id']} A:{obj['area']}"
-        cv2.putText(imagen_resultado, texto, (x, y - 10),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
-    
-    return imagen_resultado
+    return _renderizador.dibujar_con_info(imagen_original, estadisticas, max_componentes_texto)
 
 
 def comparar_conectividades(imagen_binaria):
     """
     Compara los resultados de conectividad 4 y 8
     
+    La imagen se binariza una sola vez y ambos etiquetados se ejecutan en
+    paralelo (OpenCV libera el GIL). La imagen coloreada de cada
+    conectividad se genera solo cuando se accede a ella.
+    
     Args:
         imagen_binaria: Imagen binaria
     
     Returns:
         Diccionario con resultados de ambas conectividades
     """
-    # Aplicar ambos métodos
-    num_obj_4, labels_4, img_col_4, stats_4 = componentes_conexos_4(imagen_binaria)
-    num_obj_8, labels_8, img_col_8, stats_8 = componentes_conexos_8(imagen_binaria)
+    imagen_binaria = binarizar_imagen(imagen_binaria)
+    
+    with ThreadPoolExecutor(max_workers=2) as ejecutor:
+        futuro_4 = ejecutor.submit(_etiquetar, imagen_binaria, 4)
+        futuro_8 = ejecutor.submit(_etiquetar, imagen_binaria, 8)
+        num_labels_4, labels_4, stats_4, centroids_4 = futuro_4.result()
+        num_labels_8, labels_8, stats_8, centroids_8 = futuro_8.result()
+    
+    num_obj_4 = num_labels_4 - 1
+    num_obj_8 = num_labels_8 - 1
     
     return {
-        'conectividad_4': {
-            'num_objetos': num_obj_4,
-            'labels': labels_4,
-            'imagen_coloreada': img_col_4,
-            'estadisticas': stats_4
-        },
-        'conectividad_8': {
-            'num_objetos': num_obj_8,
-            'labels': labels_8,
-            'imagen_coloreada': img_col_8,
-            'estadisticas': stats_8
-        },
+        'conectividad_4': ResultadoConectividad(
+            num_objetos=num_obj_4,
+            labels=labels_4,
+            estadisticas=procesar_estadisticas(stats_4, centroids_4, num_labels_4)
+        ),
+        'conectividad_8': ResultadoConectividad(
+            num_objetos=num_obj_8,
+            labels=labels_8,
+            estadisticas=procesar_estadisticas(stats_8, centroids_8, num_labels_8)
+        ),
         'diferencia': num_obj_4 - num_obj_8
     }
 
@@ -237,13 +503,16 @@ def filtrar_por_area(estadisticas, area_min=0, area_max=float('inf')):
     Filtra componentes por área
     
     Args:
-        estadisticas: Lista de estadísticas
+        estadisticas: Lista de estadísticas o TablaComponentes
         area_min: Área mínima
         area_max: Área máxima
     
     Returns:
         Lista filtrada de estadísticas
     """
+    if isinstance(estadisticas, TablaComponentes):
+        return estadisticas.filtrar_por_area(area_min, area_max)
+    
     return [obj for obj in estadisticas if area_min <= obj['area'] <= area_max]
 
 
@@ -252,11 +521,14 @@ def obtener_resumen_estadistico(estadisticas):
     Obtiene un resumen estadístico de los componentes
     
     Args:
-        estadisticas: Lista de estadísticas
+        estadisticas: Lista de estadísticas o TablaComponentes
     
     Returns:
         Diccionario con resumen
     """
+    if isinstance(estadisticas, TablaComponentes):
+        return estadisticas.resumen()
+    
     if not estadisticas:
         return {
             'num_objetos': 0,
@@ -277,3 +549,44 @@ def obtener_resumen_estadistico(estadisticas):
         'area_max': max(areas),
         'area_std': np.std(areas)
     }
+
+
+def eliminar_componentes_por_area(labels, estadisticas, area_min=0, area_max=float('inf')):
+    """
+    Elimina los componentes fuera del rango de área directamente sobre la
+    imagen de etiquetas, sin volver a etiquetar
+    
+    Construye una tabla de consulta etiqueta -> nueva etiqueta (0 para los
+    descartados, 1..k compactas para los conservados) a partir de las
+    estadísticas y la aplica a la imagen en una sola pasada.
+    
+    Args:
+        labels: Matriz de etiquetas de componentes_conexos_4/8
+        estadisticas: TablaComponentes o lista de estadísticas de esas etiquetas
+        area_min: Área mínima
+        area_max: Área máxima
+    
+    Returns:
+        Tupla (imagen_binaria, labels_compactas, estadisticas) con la máscara
+        0/255 de los componentes conservados, sus etiquetas renumeradas y la
+        TablaComponentes con los nuevos ids
+    """
+    if not isinstance(estadisticas, TablaComponentes):
+        estadisticas = TablaComponentes.desde_lista(estadisticas)
+    
+    area = estadisticas['area']
+    conservar = (area >= area_min) & (area <= area_max)
+    num_conservados = int(np.count_nonzero(conservar))
+    
+    # Etiquetas presentes en la imagen pero ausentes de la tabla se descartan
+    tamaño_lut = int(labels.max()) + 1 if labels.size else 1
+    lut = np.zeros(tamaño_lut, dtype=labels.dtype)
+    lut[estadisticas['id'][conservar]] = np.arange(1, num_conservados + 1)
+    
+    labels_compactas = np.take(lut, labels)
+    imagen_binaria = np.where(labels_compactas > 0, np.uint8(255), np.uint8(0))
+    
+    estadisticas_compactas = estadisticas.seleccionar(conservar)
+    estadisticas_compactas.columnas['id'] = np.arange(1, num_conservados + 1, dtype=np.int32)
+    
+    return imagen_binaria, labels_compactas, estadisticas_compactas
@@ -0,0 +1,262 @@
+"""
+Seguimiento de Componentes Conexos entre Cuadros
+Asigna identificadores persistentes a los componentes de una secuencia de
+imágenes binarias y reetiqueta solo las regiones que cambiaron
+"""
+
+import cv2
+import numpy as np
+
+from logica_componentes import TablaComponentes, binarizar_imagen
+from indice_espacial import IndiceEspacial
+
+
+def iou_rectangulos(x0_a, y0_a, x1_a, y1_a, x0_b, y0_b, x1_b, y1_b):
+    """IoU elemento a elemento entre rectángulos [x0, x1) x [y0, y1)"""
+    ancho = np.clip(np.minimum(x1_a, x1_b) - np.maximum(x0_a, x0_b), 0, None)
+    alto = np.clip(np.minimum(y1_a, y1_b) - np.maximum(y0_a, y0_b), 0, None)
+    interseccion = ancho * alto
+    union = (x1_a - x0_a) * (y1_a - y0_a) + (x1_b - x0_b) * (y1_b - y0_b) - interseccion
+    return np.divide(interseccion, union, out=np.zeros_like(interseccion, dtype=np.float64),
+                     where=union > 0)
+
+
+def asignar_mejores_mutuos(filas, columnas, costos):
+    """
+    Asignación uno a uno sobre una lista dispersa de pares candidatos
+    
+    En cada ronda acepta los pares que son la mejor opción tanto para su
+    fila como para su columna, y descarta los pares que usan filas o
+    columnas ya asignadas. Todo el trabajo por ronda es vectorizado.
+    
+    Returns:
+        Tupla (filas_asignadas, columnas_asignadas)
+    """
+    asignadas_f, asignadas_c = [], []
+    
+    while len(costos) > 0:
+        # Mejor par de cada fila y de cada columna (orden por costo y luego índice)
+        orden = np.lexsort((costos, filas))
+        primero_fila = np.ones(len(orden), dtype=bool)
+        primero_fila[1:] = filas[orden][1:] != filas[orden][:-1]
+        mejor_de_fila = np.zeros(len(costos), dtype=bool)
+        mejor_de_fila[orden[primero_fila]] = True
+        
+        orden = np.lexsort((costos, columnas))
+        primero_col = np.ones(len(orden), dtype=bool)
+        primero_col[1:] = columnas[orden][1:] != columnas[orden][:-1]
+        mejor_de_col = np.zeros(len(costos), dtype=bool)
+        mejor_de_col[orden[primero_col]] = True
+        
+        aceptados = mejor_de_fila & mejor_de_col
+        if not aceptados.any():
+            break
+        asignadas_f.append(filas[aceptados])
+        asignadas_c.append(columnas[aceptados])
+        
+        usadas_f = np.zeros(filas.max() + 1, dtype=bool)
+        usadas_c = np.zeros(columnas.max() + 1, dtype=bool)
+        usadas_f[filas[aceptados]] = True
+        usadas_c[columnas[aceptados]] = True
+        libres = ~usadas_f[filas] & ~usadas_c[columnas]
+        filas, columnas, costos = filas[libres], columnas[libres], costos[libres]
+    
+    if not asignadas_f:
+        vacio = np.zeros(0, dtype=np.int64)
+        return vacio, vacio
+    return np.concatenate(asignadas_f), np.concatenate(asignadas_c)
+
+
+class SeguidorComponentes:
+    """
+    Seguidor de componentes conexos cuadro a cuadro
+    
+    Cada cuadro se compara con el anterior por bloques; si nada cambió se
+    reutilizan etiquetas y estadísticas, y si cambiaron pocos bloques solo
+    se reetiqueta el rectángulo que los contiene (ampliado hasta incluir
+    completos los componentes que lo tocan). Después, los componentes se
+    asocian con los del cuadro anterior por distancia entre centroides e
+    IoU de sus rectángulos, usando el índice espacial para generar pares.
+    
+    Con reetiquetado parcial las etiquetas dejan de ser consecutivas; la
+    columna 'id' de la tabla sigue siendo el valor en la imagen de etiquetas.
+    """
+    
+    def __init__(self, conectividad=8, distancia_max=30.0, iou_min=0.0,
+                 tamaño_bloque=128, reetiquetado_parcial=True, fraccion_max_sucia=0.5):
+        """
+        Args:
+            conectividad: 4 u 8
+            distancia_max: Distancia máxima entre centroides para asociar
+            iou_min: IoU mínima entre rectángulos para asociar
+            tamaño_bloque: Lado de los bloques de la comparación entre cuadros
+            reetiquetado_parcial: Si False, siempre se reetiqueta el cuadro completo
+            fraccion_max_sucia: Fracción de la imagen a partir de la cual el
+                                reetiquetado parcial deja de compensar
+        """
+        self.conectividad = conectividad
+        self.distancia_max = distancia_max
+        self.iou_min = iou_min
+        self.tamaño_bloque = tamaño_bloque
+        self.reetiquetado_parcial = reetiquetado_parcial
+        self.fraccion_max_sucia = fraccion_max_sucia
+        self.reiniciar()
+    
+    def reiniciar(self):
+        """Olvida el cuadro anterior y reinicia los identificadores"""
+        self.binaria_anterior = None
+        self.labels = None
+        self.tabla = None
+        self.indice = None
+        self.max_etiqueta = 0
+        self.siguiente_id = 1
+    
+    # ===== ETIQUETADO =====
+    
+    def _bloques_sucios(self, binaria):
+        """Máscara (filas_bloque, cols_bloque) de los bloques que cambiaron"""
+        t = self.tamaño_bloque
+        altura, ancho = binaria.shape
+        diferencia = cv2.compare(binaria, self.binaria_anterior, cv2.CMP_NE)
+        pad_altura = (t - altura % t) % t
+        pad_ancho = (t - ancho % t) % t
+        if pad_altura or pad_ancho:
+            diferencia = np.pad(diferencia, ((0, pad_altura), (0, pad_ancho)))
+        bloques = diferencia.reshape(diferencia.shape[0] // t, t, diferencia.shape[1] // t, t)
+        return bloques.max(axis=(1, 3)) > 0
+    
+    def _tabla_desde_opencv(self, stats, centroids, desplazamiento_id=0, origen=(0, 0)):
+        """TablaComponentes en coordenadas globales con ids desplazados"""
+        tabla = TablaComponentes.desde_opencv(stats, centroids)
+        x, y = origen
+        tabla.columnas['id'] = tabla.columnas['id'] + desplazamiento_id
+        tabla.columnas['x'] = tabla.columnas['x'] + x
+        tabla.columnas['y'] = tabla.columnas['y'] + y
+        tabla.columnas['cx'] = tabla.columnas['cx'] + x
+        tabla.columnas['cy'] = tabla.columnas['cy'] + y
+        return tabla
+    
+    def _etiquetar_completo(self, binaria):
+        """Etiqueta el cuadro completo"""
+        num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(
+            binaria, connectivity=self.conectividad
+        )
+        self.max_etiqueta = num_labels - 1
+        return labels, self._tabla_desde_opencv(stats, centroids)
+    
+    def _region_afectada(self, sucios):
+        """
+        Rectángulo (x0, y0, x1, y1) que cubre los bloques sucios y todos los
+        componentes anteriores que los tocan, ampliado hasta un punto fijo
+        """
+        t = self.tamaño_bloque
+        altura, ancho = self.labels.shape
+        filas, columnas = np.nonzero(sucios)
+        x0, y0 = columnas.min() * t, filas.min() * t
+        x1 = min((columnas.max() + 1) * t, ancho)
+        y1 = min((filas.max() + 1) * t, altura)
+        
+        while True:
+            # Margen de un píxel: un componente vecino puede unirse con lo nuevo
+            tocados = self.indice.consultar_rectangulo(x0 - 1, y0 - 1, x1 - x0 + 2, y1 - y0 + 2)
+            if len(tocados) == 0:
+                return x0, y0, x1, y1, tocados
+            tx0 = int(self.tabla['x'][tocados].min())
+            ty0 = int(self.tabla['y'][tocados].min())
+            tx1 = int((self.tabla['x'][tocados] + self.tabla['ancho'][tocados]).max())
+            ty1 = int((self.tabla['y'][tocados] + self.tabla['alto'][tocados]).max())
+            nuevo = (min(x0, tx0), min(y0, ty0), max(x1, tx1), max(y1, ty1))
+            if nuevo == (x0, y0, x1, y1):
+                return x0, y0, x1, y1, tocados
+            x0, y0, x1, y1 = nuevo
+    
+    def _etiquetar_parcial(self, binaria, sucios):
+        """Reetiqueta solo la región afectada por los bloques sucios"""
+        x0, y0, x1, y1, tocados = self._region_afectada(sucios)
+        if (x1 - x0) * (y1 - y0) > self.fraccion_max_sucia * binaria.size:
+            return self._etiquetar_completo(binaria)
+        
+        num_labels, labels_region, stats, centroids = cv2.connectedComponentsWithStats(
+            np.ascontiguousarray(binaria[y0:y1, x0:x1]), connectivity=self.conectividad
+        )
+        
+        # Los componentes anteriores que tocan la región están contenidos en ella
+        labels = self.labels.copy()
+        base = self.max_etiqueta
+        labels[y0:y1, x0:x1] = np.where(labels_region > 0, labels_region + base, 0)
+        self.max_etiqueta = base + num_labels - 1
+        
+        conservar = np.ones(len(self.tabla), dtype=bool)
+        conservar[tocados] = False
+        tabla = TablaComponentes.concatenar([
+            self.tabla.seleccionar(conservar),
+            self._tabla_desde_opencv(stats, centroids, base, (x0, y0))
+        ])
+        return labels, tabla
+    
+    # ===== ASOCIACIÓN =====
+    
+    def _asociar(self, tabla):
+        """Asigna a cada componente el id persistente de su pareja anterior o uno nuevo"""
+        ids = np.zeros(len(tabla), dtype=np.int64)
+        
+        if self.tabla is not None and len(self.tabla) > 0 and len(tabla) > 0:
+            nuevos, anteriores, distancias = self.indice.pares_cercanos(
+                tabla['cx'], tabla['cy'], self.distancia_max
+            )
+            
+            # Matriz de costos dispersa sobre los pares candidatos
+            iou = iou_rectangulos(
+                tabla['x'][nuevos], tabla['y'][nuevos],
+                tabla['x'][nuevos] + tabla['ancho'][nuevos], tabla['y'][nuevos] + tabla['alto'][nuevos],
+                self.tabla['x'][anteriores], self.tabla['y'][anteriores],
+                self.tabla['x'][anteriores] + self.tabla['ancho'][anteriores],
+                self.tabla['y'][anteriores] + self.tabla['alto'][anteriores]
+            )
+            validos = iou >= self.iou_min
+            costos = (1 - iou) + distancias / max(self.distancia_max, 1e-9)
+            
+            filas, columnas = asignar_mejores_mutuos(
+                nuevos[validos], anteriores[validos], costos[validos]
+            )
+            ids[filas] = self.tabla['id_persistente'][columnas]
+        
+        sin_pareja = ids == 0
+        num_nuevos = int(np.count_nonzero(sin_pareja))
+        ids[sin_pareja] = np.arange(self.siguiente_id, self.siguiente_id + num_nuevos)
+        self.siguiente_id += num_nuevos
+        return ids
+    
+    def procesar(self, imagen):
+        """
+        Procesa un cuadro de la secuencia
+        
+        Args:
+            imagen: Cuadro binario (o en escala de grises, se binariza)
+        
+        Returns:
+            Tupla (labels, tabla) donde tabla es una TablaComponentes con la
+            columna adicional 'id_persistente'
+        """
+        binaria = binarizar_imagen(imagen)
+        
+        if self.binaria_anterior is None or binaria.shape != self.binaria_anterior.shape:
+            self.reiniciar()
+            labels, tabla = self._etiquetar_completo(binaria)
+        else:
+            sucios = self._bloques_sucios(binaria)
+            if not sucios.any():
+                labels, tabla = self.labels, self.tabla
+            elif self.reetiquetado_parcial:
+                labels, tabla = self._etiquetar_parcial(binaria, sucios)
+            else:
+                labels, tabla = self._etiquetar_completo(binaria)
+        
+        if tabla is not self.tabla:
+            tabla.columnas['id_persistente'] = self._asociar(tabla)
+            self.indice = IndiceEspacial(tabla, tamaño_celda=max(self.distancia_max, 1.0))
+        
+        self.binaria_anterior = binaria.copy()
+        self.labels = labels
+        self.tabla = tabla
+        return labels, tabla
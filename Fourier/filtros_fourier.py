@@ -7,6 +7,59 @@ import numpy as np
 import cv2
 
 
+def crear_mascara_distancia(filas, columnas):
+    """
+    Crea una matriz con las distancias desde el centro del espectro
+    
+    Args:
+        filas: Número de filas del espectro
+        columnas: Número de columnas del espectro
+    
+    Returns:
+        Matriz (filas, columnas) con la distancia euclidiana al centro
+    """
+    y = np.arange(filas) - filas // 2
+    x = np.arange(columnas) - columnas // 2
+    return np.sqrt(y[:, np.newaxis]**2 + x[np.newaxis, :]**2)
+
+
+def crear_mascara(tipo_filtro, filas, columnas, parametro1, parametro2=None):
+    """
+    Construye la máscara de un filtro en el dominio de Fourier (DC centrado)
+    
+    Args:
+        tipo_filtro: Nombre del filtro ('ideal_pb', 'gaussiano_pb', etc.)
+        filas: Número de filas del espectro
+        columnas: Número de columnas del espectro
+        parametro1: Radio o sigma
+        parametro2: Orden (solo para Butterworth)
+    
+    Returns:
+        Máscara (filas, columnas) en float64
+    """
+    distancia = crear_mascara_distancia(filas, columnas)
+    orden = parametro2 if parametro2 else 2
+    
+    if tipo_filtro == 'ideal_pb':
+        return (distancia <= parametro1).astype(np.float64)
+    elif tipo_filtro == 'gaussiano_pb':
+        return np.exp(-(distancia**2) / (2 * (parametro1**2)))
+    elif tipo_filtro == 'butterworth_pb':
+        # Evitar división por cero
+        distancia[distancia == 0] = 0.01
+        return 1 / (1 + (distancia / parametro1)**(2 * orden))
+    elif tipo_filtro == 'ideal_pa':
+        return (distancia > parametro1).astype(np.float64)
+    elif tipo_filtro == 'gaussiano_pa':
+        return 1 - np.exp(-(distancia**2) / (2 * (parametro1**2)))
+    elif tipo_filtro == 'butterworth_pa':
+        # Evitar división por cero
+        distancia[distancia == 0] = 0.01
+        return 1 / (1 + (parametro1 / distancia)**(2 * orden))
+    else:
+        raise ValueError(f"Tipo de filtro desconocido: {tipo_filtro}")
+
+
 class FiltrosFourier:
     """Clase para aplicar filtros en el dominio de Fourier"""
     
@@ -22,15 +75,14 @@ class FiltrosFourier:
         self.centro_fila = self.filas // 2
         self.centro_col = self.columnas // 2
     
-    def _crear_mascara_distancia(self):
-        """Crea una matriz con las distancias desde el centro"""
-        y = np.arange(self.filas)
-        x = np.arange(self.columnas)
-        Y, X = np.meshgrid(y, x, indexing='ij')
+    def _filtrar(self, mascara):
+        """Aplica la máscara al espectro y reconstruye la imagen"""
+        fft_filtrada = self.fft_shift * mascara
         
-        # Calcular distancia euclidiana desde el centro
-        distancia = np.sqrt((Y - self.centro_fila)**2 + (X - self.centro_col)**2)
-        return distancia
+        # Reconstruir imagen
+        fft_ishift = np.fft.ifftshift(fft_filtrada)
+        imagen_filtrada = np.fft.ifft2(fft_ishift)
+        return np.abs(imagen_filtrada), mascara
     
     # ===== FILTROS PASA-BAJAS =====
     
@@ -42,17 +94,8 @@ class FiltrosFourier:
         Args:
             radio: Radio de corte del filtro
         """
-        distancia = self._crear_mascara_distancia()
-        mascara = np.zeros((self.filas, self.columnas))
-        mascara[distancia <= radio] = 1
-        
-        # Aplicar filtro
-        fft_filtrada = self.fft_shift * mascara
-        
-        # Reconstruir imagen
-        fft_ishift = np.fft.ifftshift(fft_filtrada)
-        imagen_filtrada = np.fft.ifft2(fft_ishift)
-        return np.abs(imagen_filtrada), mascara
+        mascara = crear_mascara('ideal_pb', self.filas, self.columnas, radio)
+        return self._filtrar(mascara)
     
     def gaussiano_pasabajas(self, sigma):
         """
@@ -62,18 +105,8 @@ class FiltrosFourier:
         Args:
             sigma: Desviación estándar (controla el ancho del filtro)
         """
-        distancia = self._crear_mascara_distancia()
-        
-        # Crear máscara Gaussiana
-        mascara = np.exp(-(distancia**2) / (2 * (sigma**2)))
-        
-        # Aplicar filtro
-        fft_filtrada = self.fft_shift * mascara
-        
-        # Reconstruir imagen
-        fft_ishift = np.fft.ifftshift(fft_filtrada)
-        imagen_filtrada = np.fft.ifft2(fft_ishift)
-        return np.abs(imagen_filtrada), mascara
+        mascara = crear_mascara('gaussiano_pb', self.filas, self.columnas, sigma)
+        return self._filtrar(mascara)
     
     def butterworth_pasabajas(self, radio, orden=2):
         """
@@ -84,21 +117,8 @@ class FiltrosFourier:
             radio: Radio de corte (frecuencia de corte)
             orden: Orden del filtro (mayor = más pronunciado)
         """
-        distancia = self._crear_mascara_distancia()
-        
-        # Evitar división por cero
-        distancia[distancia == 0] = 0.01
-        
-        # Crear máscara Butterworth
-        mascara = 1 / (1 + (distancia / radio)**(2 * orden))
-        
-        # Aplicar filtro
-        fft_filtrada = self.fft_shift * mascara
-        
-        # Reconstruir imagen
-        fft_ishift = np.fft.ifftshift(fft_filtrada)
-        imagen_filtrada = np.fft.ifft2(fft_ishift)
-        return np.abs(imagen_filtrada), mascara
+        mascara = crear_mascara('butterworth_pb', self.filas, self.columnas, radio, orden)
+        return self._filtrar(mascara)
     
     # ===== FILTROS PASA-ALTAS =====
     
@@ -110,17 +130,8 @@ class FiltrosFourier:
         Args:
             radio: Radio de corte del filtro
         """
-        distancia = self._crear_mascara_distancia()
-        mascara = np.ones((self.filas, self.columnas))
-        mascara[distancia <= radio] = 0
-        
-        # Aplicar filtro
-        fft_filtrada = self.fft_shift * mascara
-        
-        # Reconstruir imagen
-        fft_ishift = np.fft.ifftshift(fft_filtrada)
-        imagen_filtrada = np.fft.ifft2(fft_ishift)
-        return np.abs(imagen_filtrada), mascara
+        mascara = crear_mascara('ideal_pa', self.filas, self.columnas, radio)
+        return self._filtrar(mascara)
     
     def gaussiano_pasaaltas(self, sigma):
         """
@@ -130,18 +141,8 @@ class FiltrosFourier:
         Args:
             sigma: Desviación estándar (controla el ancho del filtro)
         """
-        distancia = self._crear_mascara_distancia()
-        
-        # Crear máscara Gaussiana invertida
-        mascara = 1 - np.exp(-(distancia**2) / (2 * (sigma**2)))
-        
-        # Aplicar filtro
-        fft_filtrada = self.fft_shift * mascara
-        
-        # Reconstruir imagen
-        fft_ishift = np.fft.ifftshift(fft_filtrada)
-        imagen_filtrada = np.fft.ifft2(fft_ishift)
-        return np.abs(imagen_filtrada), mascara
+        mascara = crear_mascara('gaussiano_pa', self.filas, self.columnas, sigma)
+        return self._filtrar(mascara)
     
     def butterworth_pasaaltas(self, radio, orden=2):
         """
@@ -152,21 +153,8 @@ class FiltrosFourier:
             radio: Radio de corte (frecuencia de corte)
             orden: Orden del filtro (mayor = más pronunciado)
         """
-        distancia = self._crear_mascara_distancia()
-        
-        # Evitar división por cero
-        distancia[distancia == 0] = 0.01
-        
-        # Crear máscara Butterworth invertida
-        mascara = 1 / (1 + (radio / distancia)**(2 * orden))
-        
-        # Aplicar filtro
-        fft_filtrada = self.fft_shift * mascara
-        
-        # Reconstruir imagen
-        fft_ishift = np.fft.ifftshift(fft_filtrada)
-        imagen_filtrada = np.fft.ifft2(fft_ishift)
-        return np.abs(imagen_filtrada), mascara
+        mascara = crear_mascara('butterworth_pa', self.filas, self.columnas, radio, orden)
+        return self._filtrar(mascara)
 
 
 def aplicar_filtro(imagen, tipo_filtro, parametro1, parametro2=None):
@@ -209,3 +197,96 @@ def aplicar_filtro(imagen, tipo_filtro, parametro1, parametro2=None):
         return filtro.butterworth_pasaaltas(parametro1, orden)
     else:
         raise ValueError(f"Tipo de filtro desconocido: {tipo_filtro}")
+
+
+# ===================================================================
+# FILTRADO POR LOTES (PILAS DE IMÁGENES N x H x W)
+# ===================================================================
+
+def _preparar_pila(imagenes):
+    """
+    Valida la entrada como pila (N, H, W) sin copiarla
+    
+    Un arreglo conserva su tipo (p. ej. uint8) y una lista de imágenes se
+    deja como lista; la conversión a float32 se hace por bloques en
+    _filtrar_bloques.
+    
+    Returns:
+        Tupla (pila, forma) con forma = (N, H, W)
+    """
+    if isinstance(imagenes, np.ndarray):
+        pila = imagenes[np.newaxis] if imagenes.ndim == 2 else imagenes
+        if pila.ndim != 3:
+            raise ValueError(f"Se esperaba una pila (N, H, W), se recibió la forma {pila.shape}")
+        return pila, pila.shape
+    
+    pila = [np.asarray(imagen) for imagen in imagenes]
+    formas = {imagen.shape for imagen in pila}
+    if len(formas) != 1 or len(pila[0].shape) != 2:
+        raise ValueError(f"Se esperaban imágenes (H, W) de igual forma, se recibieron {sorted(formas)}")
+    return pila, (len(pila),) + pila[0].shape
+
+
+def _filtrar_bloques(pila, mascara_desplazada, tamaño_lote):
+    """Filtra la pila por bloques con una máscara ya desplazada"""
+    for inicio in range(0, len(pila), tamaño_lote):
+        # Solo el bloque actual se convierte a float32
+        bloque = np.asarray(pila[inicio:inicio + tamaño_lote], dtype=np.float32)
+        fft = np.fft.fft2(bloque, axes=(-2, -1))
+        fft *= mascara_desplazada
+        bloque_filtrado = np.abs(np.fft.ifft2(fft, axes=(-2, -1)))
+        yield inicio, bloque_filtrado.astype(np.float32, copy=False)
+
+
+def generar_filtro_lote(imagenes, tipo_filtro, parametro1, parametro2=None, tamaño_lote=16):
+    """
+    Aplica un filtro de Fourier a una pila de imágenes, entregando el
+    resultado por bloques para acotar la memoria usada
+    
+    La máscara se construye una sola vez y se desplaza (ifftshift) en lugar
+    de desplazar el espectro de cada imagen. Cada bloque se transforma con
+    una única llamada sobre los dos últimos ejes.
+    
+    Args:
+        imagenes: Pila (N, H, W), lista de imágenes (H, W) o imagen (H, W)
+                  en escala de grises, de cualquier tipo numérico
+        tipo_filtro: Nombre del filtro ('ideal_pb', 'gaussiano_pb', etc.)
+        parametro1: Radio o sigma
+        parametro2: Orden (solo para Butterworth)
+        tamaño_lote: Número de imágenes transformadas por llamada
+    
+    Yields:
+        Tupla (inicio, bloque_filtrado) con bloque_filtrado de forma (n, H, W)
+        en float32
+    """
+    pila, forma = _preparar_pila(imagenes)
+    _, filas, columnas = forma
+    mascara = crear_mascara(tipo_filtro, filas, columnas, parametro1, parametro2)
+    yield from _filtrar_bloques(pila, np.fft.ifftshift(mascara), max(1, int(tamaño_lote)))
+
+
+def aplicar_filtro_lote(imagenes, tipo_filtro, parametro1, parametro2=None, tamaño_lote=16):
+    """
+    Versión por lotes de aplicar_filtro para pilas (N, H, W)
+    
+    Args:
+        imagenes: Pila (N, H, W), lista de imágenes (H, W) o imagen (H, W)
+                  en escala de grises, de cualquier tipo numérico
+        tipo_filtro: Nombre del filtro ('ideal_pb', 'gaussiano_pb', etc.)
+        parametro1: Radio o sigma
+        parametro2: Orden (solo para Butterworth)
+        tamaño_lote: Número de imágenes transformadas por llamada
+    
+    Returns:
+        pila_filtrada (N, H, W) en float32, mascara
+    """
+    pila, forma = _preparar_pila(imagenes)
+    _, filas, columnas = forma
+    mascara = crear_mascara(tipo_filtro, filas, columnas, parametro1, parametro2)
+    
+    pila_filtrada = np.empty(forma, dtype=np.float32)
+    bloques = _filtrar_bloques(pila, np.fft.ifftshift(mascara), max(1, int(tamaño_lote)))
+    for inicio, bloque in bloques:
+        pila_filtrada[inicio:inicio + len(bloque)] = bloque
+    
+    return pila_filtrada, mascara
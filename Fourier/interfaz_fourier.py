@@ -9,12 +9,20 @@ import cv2
 import numpy as np
 import matplotlib.pyplot as plt
 import os
+import sys
 
 from logica_fft import TransformadaFourier
 from visualizador import Visualizador
 from filtros_fourier import aplicar_filtro
 from analisis_filtros import AnalizadorFiltros
-from logica_dct import TransformadaDCT, CompresorDCT
+from logica_dct import TransformadaDCT, CompresorDCT, DecodificadorProgresivo
+
+# Importar la lectura de imágenes compartida desde el directorio raíz del proyecto
+directorio_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if directorio_raiz not in sys.path:
+    sys.path.insert(0, directorio_raiz)
+
+from ImagenDigital.procesamiento_basico import leer_imagen
 
 
 # ===================================================================
@@ -42,6 +50,7 @@ class InterfazFourier:
         # Módulo de DCT
         self.dct = TransformadaDCT()
         self.compresor = CompresorDCT()
+        self.decodificador = None
         
         # Visualizador (se inicializa después de crear la interfaz)
         self.visualizador = None
@@ -538,12 +547,15 @@ class InterfazFourier:
         
         if ruta:
             # Cargar imagen en escala de grises
-            self.imagen = cv2.imread(ruta, cv2.IMREAD_GRAYSCALE)
+            self.imagen = leer_imagen(ruta, 'grises')
             
             if self.imagen is None:
                 messagebox.showerror("Error", "No se pudo cargar la imagen")
                 return
             
+            # Cancelar cualquier reconstrucción progresiva pendiente
+            self.decodificador = None
+            
             # Calcular la FFT usando el módulo
             self.fft.cargar_imagen(self.imagen)
             
@@ -898,18 +910,58 @@ class InterfazFourier:
             messagebox.showerror("Error", f"Error al comprimir:\n{str(e)}")
     
     def comprimir_por_frecuencias(self):
-        """Comprime la imagen manteniendo solo bajas frecuencias"""
+        """
+        Comprime la imagen manteniendo solo bajas frecuencias
+        
+        Muestra primero la reconstrucción con el término DC y la refina
+        banda por banda en segundo plano hasta la compresión pedida.
+        """
         if self.imagen is None:
             messagebox.showwarning("Advertencia", "Debe cargar una imagen primero")
             return
         
         try:
-            # Cargar imagen
+            # Cargar imagen y calcular DCT por bloques
             self.compresor.cargar_imagen(self.imagen)
+            dct_bloques = self.compresor.aplicar_dct_por_bloques()
             
-            # Aplicar compresión
             num_coefs = self.num_coeficientes.get()
-            imagen_comprimida, tasa_compresion, dct_comprimida = self.compresor.comprimir_por_frecuencias(num_coefs)
+            banda_final = self.compresor.obtener_banda_final(num_coefs)
+            
+            # Vista previa inmediata con el término DC
+            decodificador = DecodificadorProgresivo(
+                dct_bloques, self.compresor.tamaño_bloque, self.imagen.shape
+            )
+            self.decodificador = decodificador
+            vista_previa = decodificador.siguiente_banda()
+            self.visualizador.mostrar_imagen_simple(
+                vista_previa, f"Vista previa progresiva - banda 0/{banda_final}"
+            )
+            
+            self.root.after(1, self._refinar_compresion, decodificador, num_coefs, banda_final)
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al comprimir:\n{str(e)}")
+    
+    def _refinar_compresion(self, decodificador, num_coefs, banda_final):
+        """Añade una banda a la vista previa o muestra el resultado final"""
+        # Descartar refinamientos de una compresión anterior o si la vista cambió
+        if decodificador is not self.decodificador or self.visualizador.imagen_simple is None:
+            return
+        
+        try:
+            if decodificador.banda_actual < banda_final:
+                imagen = decodificador.siguiente_banda()
+                self.visualizador.actualizar_imagen_simple(
+                    imagen, f"Vista previa progresiva - banda {decodificador.banda_actual}/{banda_final}"
+                )
+                self.root.after(1, self._refinar_compresion, decodificador, num_coefs, banda_final)
+                return
+            
+            self.decodificador = None
+            imagen_comprimida = decodificador.obtener_imagen()
+            dct_comprimida = decodificador.obtener_dct_actual()
+            tasa_compresion = (1 - num_coefs / (self.compresor.tamaño_bloque ** 2)) * 100
             
             # Calcular estadísticas
             stats = self.compresor.obtener_estadisticas_compresion(self.imagen, imagen_comprimida)
@@ -935,6 +987,7 @@ class InterfazFourier:
             )
             
         except Exception as e:
+            self.decodificador = None
             messagebox.showerror("Error", f"Error al comprimir:\n{str(e)}")
     
     def visualizar_compresion_dct(self, imagen_comprimida, dct_comprimida, titulo, info_text):
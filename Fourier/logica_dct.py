@@ -3,10 +3,81 @@
 # Implementa DCT y compresión por bloques
 # ===================================================================
 
+import time
+
 import numpy as np
 import cv2
 
 
+# Tablas de cuantización estándar JPEG (Anexo K de ITU-T T.81)
+TABLA_LUMINANCIA = np.array([
+    [16, 11, 10, 16, 24, 40, 51, 61],
+    [12, 12, 14, 19, 26, 58, 60, 55],
+    [14, 13, 16, 24, 40, 57, 69, 56],
+    [14, 17, 22, 29, 51, 87, 80, 62],
+    [18, 22, 37, 56, 68, 109, 103, 77],
+    [24, 35, 55, 64, 81, 104, 113, 92],
+    [49, 64, 78, 87, 103, 121, 120, 101],
+    [72, 92, 95, 98, 112, 100, 103, 99]
+], dtype=np.float32)
+
+TABLA_CROMINANCIA = np.array([
+    [17, 18, 24, 47, 99, 99, 99, 99],
+    [18, 21, 26, 66, 99, 99, 99, 99],
+    [24, 26, 56, 99, 99, 99, 99, 99],
+    [47, 66, 99, 99, 99, 99, 99, 99],
+    [99, 99, 99, 99, 99, 99, 99, 99],
+    [99, 99, 99, 99, 99, 99, 99, 99],
+    [99, 99, 99, 99, 99, 99, 99, 99],
+    [99, 99, 99, 99, 99, 99, 99, 99]
+], dtype=np.float32)
+
+
+def escalar_tabla_cuantizacion(tabla, calidad):
+    """
+    Escala una tabla de cuantización según el factor de calidad (1-100)
+    usando la misma regla que la biblioteca IJG
+    
+    Args:
+        tabla: Tabla base 8x8
+        calidad: Factor de calidad (1 = peor, 100 = mejor)
+    
+    Returns:
+        Tabla escalada en float32 con valores entre 1 y 255
+    """
+    calidad = int(np.clip(calidad, 1, 100))
+    escala = 5000 / calidad if calidad < 50 else 200 - 2 * calidad
+    tabla_escalada = np.floor((tabla * escala + 50) / 100)
+    return np.clip(tabla_escalada, 1, 255).astype(np.float32)
+
+
+def matriz_dct(n):
+    """
+    Matriz ortonormal de la DCT-II de tamaño n x n
+    
+    Para un bloque B, C @ B @ C.T equivale a cv2.dct(B)
+    """
+    k = np.arange(n)[:, np.newaxis]
+    i = np.arange(n)[np.newaxis, :]
+    matriz = np.sqrt(2.0 / n) * np.cos(np.pi * (2 * i + 1) * k / (2 * n))
+    matriz[0, :] = np.sqrt(1.0 / n)
+    return matriz.astype(np.float32)
+
+
+def dividir_en_bloques(plano, tamaño):
+    """Reorganiza un plano (H, W) en una vista de bloques (H/t, W/t, t, t)"""
+    altura, ancho = plano.shape
+    bloques = plano.reshape(altura // tamaño, tamaño, ancho // tamaño, tamaño)
+    return bloques.swapaxes(1, 2)
+
+
+def unir_bloques(bloques):
+    """Operación inversa de dividir_en_bloques"""
+    filas_bloques, cols_bloques, tamaño, _ = bloques.shape
+    plano = bloques.swapaxes(1, 2)
+    return plano.reshape(filas_bloques * tamaño, cols_bloques * tamaño)
+
+
 class TransformadaDCT:
     """Clase para manejar la Transformada del Coseno Discreta"""
     
@@ -63,6 +134,11 @@ class TransformadaDCT:
         }
 
 
+def _a_uint8(plano):
+    """Redondea y satura un plano flotante a uint8 en una sola pasada"""
+    return cv2.add(plano, 0.0, dtype=cv2.CV_8U)
+
+
 class CompresorDCT:
     """Clase para comprimir imágenes usando DCT por bloques 8x8"""
     
@@ -104,20 +180,10 @@ class CompresorDCT:
         if self.imagen_original is None:
             return None
         
-        altura, ancho = self.imagen_original.shape
-        self.dct_bloques = np.zeros_like(self.imagen_original)
-        
-        # Procesar cada bloque
-        for i in range(0, altura, self.tamaño_bloque):
-            for j in range(0, ancho, self.tamaño_bloque):
-                # Extraer bloque
-                bloque = self.imagen_original[i:i+self.tamaño_bloque, j:j+self.tamaño_bloque]
-                
-                # Aplicar DCT al bloque
-                dct_bloque = cv2.dct(bloque)
-                
-                # Guardar en la imagen de DCT
-                self.dct_bloques[i:i+self.tamaño_bloque, j:j+self.tamaño_bloque] = dct_bloque
+        # DCT de todos los bloques a la vez: C @ B @ C^T (equivale a cv2.dct)
+        matriz = matriz_dct(self.tamaño_bloque)
+        bloques = dividir_en_bloques(self.imagen_original, self.tamaño_bloque)
+        self.dct_bloques = unir_bloques(matriz @ bloques @ matriz.T)
         
         return self.dct_bloques
     
@@ -190,6 +256,14 @@ class CompresorDCT:
         
         return self.imagen_comprimida, tasa_compresion, dct_comprimida
     
+    def obtener_banda_final(self, num_coeficientes):
+        """
+        Última banda zig-zag (anti-diagonal u + v) que conserva
+        comprimir_por_frecuencias para num_coeficientes
+        """
+        n = int(np.ceil(np.sqrt(num_coeficientes * 2)))
+        return min(n, 2 * self.tamaño_bloque - 1) - 1
+    
     def _crear_mascara_zigzag(self, tamaño, num_coefs):
         """Crea una máscara que mantiene los primeros N coeficientes en orden zig-zag"""
         mascara = np.zeros((tamaño, tamaño))
@@ -242,3 +316,246 @@ class CompresorDCT:
             'mse': mse,
             'psnr': psnr
         }
+
+
+def orden_zigzag(tamaño):
+    """
+    Devuelve las posiciones (fila, columna) de un bloque en orden zig-zag
+    
+    Returns:
+        Lista de tuplas ordenadas de bajas a altas frecuencias
+    """
+    posiciones = [(i, j) for i in range(tamaño) for j in range(tamaño)]
+    # Por anti-diagonal; el sentido del recorrido alterna en cada diagonal
+    return sorted(posiciones, key=lambda p: (p[0] + p[1], p[1] if (p[0] + p[1]) % 2 == 0 else p[0]))
+
+
+class DecodificadorProgresivo:
+    """
+    Reconstrucción progresiva de una imagen a partir de su DCT por bloques
+    
+    Empieza con el término DC de cada bloque y añade bandas zig-zag
+    (anti-diagonales u + v = banda) una a una. Cada paso suma a la
+    reconstrucción actual solo la contribución de las funciones base de la
+    banda nueva, sin repetir la IDCT completa.
+    """
+    
+    def __init__(self, dct_bloques, tamaño_bloque=8, forma_original=None):
+        """
+        Inicializa el decodificador
+        
+        Args:
+            dct_bloques: Coeficientes DCT por bloques (H, W), múltiplos del bloque
+            tamaño_bloque: Tamaño de los bloques
+            forma_original: (alto, ancho) para recortar el padding (opcional)
+        """
+        self.tamaño_bloque = tamaño_bloque
+        self.forma_original = forma_original or dct_bloques.shape
+        self.num_bandas = 2 * tamaño_bloque - 1
+        self.banda_actual = -1
+        
+        self.coeficientes = dividir_en_bloques(dct_bloques.astype(np.float32), tamaño_bloque)
+        self.reconstruccion = np.zeros_like(self.coeficientes)
+        
+        # Funciones base: base[u, v] = C[u]^T * C[v]
+        matriz = matriz_dct(tamaño_bloque)
+        self.bases = np.einsum('ui,vj->uvij', matriz, matriz)
+        
+        zigzag = orden_zigzag(tamaño_bloque)
+        self.bandas = [[p for p in zigzag if p[0] + p[1] == b] for b in range(self.num_bandas)]
+    
+    def terminado(self):
+        """Verifica si ya se añadieron todas las bandas"""
+        return self.banda_actual >= self.num_bandas - 1
+    
+    def siguiente_banda(self):
+        """
+        Añade la contribución de la siguiente banda zig-zag
+        
+        Returns:
+            Imagen reconstruida actual (float32, recortada a 0-255) o None si
+            ya se añadieron todas las bandas
+        """
+        if self.terminado():
+            return None
+        
+        self.banda_actual += 1
+        filas, columnas = zip(*self.bandas[self.banda_actual])
+        coefs_banda = self.coeficientes[:, :, filas, columnas]
+        bases_banda = self.bases[filas, columnas]
+        self.reconstruccion += np.einsum('abk,kij->abij', coefs_banda, bases_banda)
+        
+        return self.obtener_imagen()
+    
+    def obtener_imagen(self):
+        """Retorna la reconstrucción actual como imagen"""
+        altura, ancho = self.forma_original
+        imagen = unir_bloques(self.reconstruccion)[:altura, :ancho]
+        return np.clip(imagen, 0, 255)
+    
+    def obtener_dct_actual(self):
+        """Retorna los coeficientes DCT de las bandas ya añadidas (resto en cero)"""
+        n = self.tamaño_bloque
+        u, v = np.indices((n, n))
+        mascara = (u + v <= self.banda_actual).astype(np.float32)
+        return unir_bloques(self.coeficientes * mascara)
+    
+    def iterar(self, banda_final=None):
+        """
+        Genera las reconstrucciones sucesivas hasta banda_final (inclusive)
+        
+        Yields:
+            Tupla (banda, imagen_reconstruida)
+        """
+        if banda_final is None:
+            banda_final = self.num_bandas - 1
+        while self.banda_actual < min(banda_final, self.num_bandas - 1):
+            imagen = self.siguiente_banda()
+            yield self.banda_actual, imagen
+
+
+class CompresorJPEG:
+    """
+    Compresor de imágenes a color estilo JPEG
+    
+    Convierte BGR a YCbCr, submuestrea opcionalmente la crominancia (4:2:0)
+    y cuantiza cada bloque 8x8 con las tablas estándar escaladas por el
+    factor de calidad. La DCT se calcula sobre todos los bloques a la vez.
+    """
+    
+    TAMAÑO_BLOQUE = 8
+    
+    def __init__(self, calidad=75, submuestreo=True):
+        """
+        Inicializa el compresor
+        
+        Args:
+            calidad: Factor de calidad (1-100)
+            submuestreo: Si True, submuestrea la crominancia 4:2:0
+        """
+        self.calidad = calidad
+        self.submuestreo = submuestreo
+        self.matriz = matriz_dct(self.TAMAÑO_BLOQUE)
+        self.coeficientes = None
+        self.imagen_comprimida = None
+    
+    def _transformar_plano(self, plano, tabla):
+        """
+        Aplica DCT, cuantización y decuantización a todos los bloques de un plano
+        
+        La DCT separable se calcula con dos productos grandes sobre el plano
+        completo (columnas por franjas de n filas y luego filas de n valores)
+        en lugar de millones de productos 8x8, y la cuantización usa la
+        tabla difundida sobre la vista (franjas, n, bloques, n) sin copias.
+        """
+        n = self.TAMAÑO_BLOQUE
+        altura, ancho = plano.shape
+        pad_altura = (n - altura % n) % n
+        pad_ancho = (n - ancho % n) % n
+        if pad_altura > 0 or pad_ancho > 0:
+            plano = np.pad(plano, ((0, pad_altura), (0, pad_ancho)), mode='edge')
+        altura_p, ancho_p = plano.shape
+        franjas, columnas = altura_p // n, ancho_p // n
+        
+        # DCT de todos los bloques: C @ B @ C^T
+        dct = self.matriz @ (plano - np.float32(128)).reshape(franjas, n, ancho_p)
+        dct = (dct.reshape(-1, n) @ self.matriz.T).reshape(franjas, n, columnas, n)
+        
+        tabla = tabla[np.newaxis, :, np.newaxis, :]
+        dct /= tabla
+        np.rint(dct, out=dct)
+        cuantizados = dct.swapaxes(1, 2).astype(np.int16)
+        
+        # Decuantizar e invertir: C^T @ D @ C
+        dct *= tabla
+        reconstruidos = self.matriz.T @ dct.reshape(franjas, n, ancho_p)
+        plano_reconstruido = (reconstruidos.reshape(-1, n) @ self.matriz).reshape(altura_p, ancho_p)
+        plano_reconstruido += np.float32(128)
+        
+        return plano_reconstruido[:altura, :ancho], cuantizados
+    
+    def comprimir(self, imagen, calidad=None, submuestreo=None):
+        """
+        Comprime y reconstruye una imagen
+        
+        Args:
+            imagen: Imagen BGR (H, W, 3) o en escala de grises (H, W)
+            calidad: Factor de calidad; si es None se usa el del compresor
+            submuestreo: Submuestreo 4:2:0; si es None se usa el del compresor
+        
+        Returns:
+            Tupla (imagen_reconstruida uint8, estadisticas)
+        """
+        calidad = self.calidad if calidad is None else calidad
+        submuestreo = self.submuestreo if submuestreo is None else submuestreo
+        inicio = time.perf_counter()
+        
+        tabla_y = escalar_tabla_cuantizacion(TABLA_LUMINANCIA, calidad)
+        tabla_c = escalar_tabla_cuantizacion(TABLA_CROMINANCIA, calidad)
+        
+        if imagen.ndim == 2:
+            plano, coef = self._transformar_plano(imagen.astype(np.float32), tabla_y)
+            self.coeficientes = [coef]
+            reconstruida = _a_uint8(plano)
+        else:
+            # OpenCV ordena los canales como Y, Cr, Cb; cada plano se
+            # convierte por separado para trabajar con arreglos contiguos
+            ycrcb = cv2.split(cv2.cvtColor(imagen, cv2.COLOR_BGR2YCrCb))
+            altura, ancho = imagen.shape[:2]
+            
+            y, coef_y = self._transformar_plano(ycrcb[0].astype(np.float32), tabla_y)
+            self.coeficientes = [coef_y]
+            
+            planos = [_a_uint8(y)]
+            for canal in (1, 2):
+                croma = ycrcb[canal].astype(np.float32)
+                if submuestreo:
+                    tamaño_croma = ((ancho + 1) // 2, (altura + 1) // 2)
+                    croma = cv2.resize(croma, tamaño_croma, interpolation=cv2.INTER_AREA)
+                croma, coef_c = self._transformar_plano(croma, tabla_c)
+                if submuestreo:
+                    croma = cv2.resize(croma, (ancho, altura), interpolation=cv2.INTER_LINEAR)
+                self.coeficientes.append(coef_c)
+                planos.append(_a_uint8(croma))
+            
+            reconstruida = cv2.cvtColor(cv2.merge(planos), cv2.COLOR_YCrCb2BGR)
+        
+        tiempo = time.perf_counter() - inicio
+        self.imagen_comprimida = reconstruida
+        
+        estadisticas = self._calcular_estadisticas(imagen, reconstruida, tiempo)
+        estadisticas['calidad'] = calidad
+        return reconstruida, estadisticas
+    
+    def _calcular_estadisticas(self, imagen_original, imagen_reconstruida, tiempo):
+        """Calcula tamaño estimado, tasa de compresión y PSNR"""
+        total_coeficientes = sum(c.size for c in self.coeficientes)
+        
+        # Estimación del tamaño codificado a partir de la entropía de los
+        # coeficientes; los ceros (la gran mayoría) se cuentan aparte y solo
+        # los no nulos pasan por bincount
+        no_nulos = np.concatenate([c[c != 0] for c in self.coeficientes]).astype(np.int32)
+        no_cero = int(no_nulos.size)
+        conteos = np.bincount(no_nulos - no_nulos.min()) if no_cero else np.zeros(0, dtype=np.int64)
+        conteos = np.append(conteos[conteos > 0], total_coeficientes - no_cero)
+        probabilidades = conteos[conteos > 0] / total_coeficientes
+        entropia = float(-np.sum(probabilidades * np.log2(probabilidades)))
+        bytes_estimados = entropia * total_coeficientes / 8
+        
+        if imagen_original.dtype == imagen_reconstruida.dtype:
+            mse = cv2.norm(imagen_original, imagen_reconstruida, cv2.NORM_L2SQR) / imagen_original.size
+        else:
+            # Entrada flotante: cv2.norm exige el mismo tipo en ambos operandos
+            diferencia = imagen_original.astype(np.float32) - imagen_reconstruida.astype(np.float32)
+            mse = float(np.mean(diferencia ** 2))
+        psnr = float('inf') if mse == 0 else 20 * np.log10(255.0 / np.sqrt(mse))
+        
+        return {
+            'coeficientes_no_cero': no_cero,
+            'tasa_compresion': (1 - no_cero / total_coeficientes) * 100,
+            'bytes_estimados': bytes_estimados,
+            'bits_por_pixel': bytes_estimados * 8 / (imagen_original.shape[0] * imagen_original.shape[1]),
+            'mse': mse,
+            'psnr': psnr,
+            'tiempo_ms': tiempo * 1000
+        }
@@ -90,3 +90,91 @@ class TransformadaFourier:
     def esta_calculada(self):
         """Verifica si la FFT ha sido calculada"""
         return self.fft_shift is not None
+
+
+class TransformadaFourierLote:
+    """Clase para calcular la Transformada de Fourier de una pila de imágenes (N, H, W)"""
+    
+    def __init__(self, tamaño_lote=16):
+        """
+        Inicializa la transformada por lotes
+        
+        Args:
+            tamaño_lote: Número de imágenes transformadas por llamada a la FFT
+        """
+        self.tamaño_lote = tamaño_lote
+        self.imagenes = None
+        self.fft_shift = None
+        self.magnitud = None
+        self.fase = None
+    
+    def cargar_imagenes(self, imagenes):
+        """Carga una pila (N, H, W) y calcula la FFT de todas las imágenes"""
+        imagenes = np.asarray(imagenes)
+        if imagenes.ndim == 2:
+            imagenes = imagenes[np.newaxis]
+        if imagenes.ndim != 3:
+            raise ValueError(f"Se esperaba una pila (N, H, W), se recibió la forma {imagenes.shape}")
+        
+        self.imagenes = imagenes
+        self._calcular_fft()
+    
+    def iterar_fft(self, imagenes=None):
+        """
+        Calcula la FFT desplazada por bloques sin guardar la pila completa
+        
+        Yields:
+            Tupla (inicio, fft_shift_bloque) con bloques de forma (n, H, W)
+        """
+        if imagenes is None:
+            imagenes = self.imagenes
+        if imagenes is None:
+            return
+        
+        for inicio in range(0, len(imagenes), self.tamaño_lote):
+            bloque = np.float32(imagenes[inicio:inicio + self.tamaño_lote])
+            fft = np.fft.fft2(bloque, axes=(-2, -1))
+            yield inicio, np.fft.fftshift(fft, axes=(-2, -1))
+    
+    def _calcular_fft(self):
+        """Calcula la FFT 2D de cada imagen sobre los dos últimos ejes"""
+        if self.imagenes is None:
+            return
+        
+        self.fft_shift = None
+        for inicio, fft_shift in self.iterar_fft():
+            if self.fft_shift is None:
+                self.fft_shift = np.empty(self.imagenes.shape, dtype=fft_shift.dtype)
+            self.fft_shift[inicio:inicio + len(fft_shift)] = fft_shift
+        
+        self.magnitud = np.log1p(np.abs(self.fft_shift))
+        self.fase = np.angle(self.fft_shift)
+    
+    def obtener_magnitud(self):
+        """Retorna los espectros de magnitud (N, H, W)"""
+        return self.magnitud
+    
+    def obtener_fase(self):
+        """Retorna los espectros de fase (N, H, W)"""
+        return self.fase
+    
+    def obtener_magnitud_normalizada(self):
+        """Retorna la magnitud de cada imagen normalizada a 8 bits de forma independiente"""
+        if self.magnitud is None:
+            return None
+        minimo = self.magnitud.min(axis=(1, 2), keepdims=True)
+        maximo = self.magnitud.max(axis=(1, 2), keepdims=True)
+        rango = np.where(maximo > minimo, maximo - minimo, 1)
+        return ((self.magnitud - minimo) * (255.0 / rango)).astype(np.uint8)
+    
+    def reconstruir_imagenes(self):
+        """Reconstruye la pila de imágenes desde la FFT (IFFT)"""
+        if self.fft_shift is None:
+            return None
+        
+        fft_ishift = np.fft.ifftshift(self.fft_shift, axes=(-2, -1))
+        return np.abs(np.fft.ifft2(fft_ishift, axes=(-2, -1)))
+    
+    def esta_calculada(self):
+        """Verifica si la FFT ha sido calculada"""
+        return self.fft_shift is not None
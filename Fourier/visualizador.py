@@ -14,6 +14,7 @@ class Visualizador:
         self.frame = frame_contenedor
         self.figura = None
         self.canvas = None
+        self.imagen_simple = None
     
     def limpiar(self):
         """Limpia el canvas actual"""
@@ -25,6 +26,8 @@ class Visualizador:
             plt.close(self.figura)
             self.figura = None
         
+        self.imagen_simple = None
+        
         # Limpiar widgets restantes
         for widget in self.frame.winfo_children():
             widget.destroy()
@@ -47,12 +50,23 @@ class Visualizador:
         fig = self._crear_canvas(figsize=(8, 6))
         
         ax = fig.add_subplot(111)
-        ax.imshow(imagen, cmap=cmap)
+        self.imagen_simple = ax.imshow(imagen, cmap=cmap)
         ax.set_title(titulo, fontsize=12, fontweight='bold')
         ax.axis('off')
         
         self._mostrar_canvas()
     
+    def actualizar_imagen_simple(self, imagen, titulo=None):
+        """Reemplaza los datos de la imagen simple mostrada sin recrear la figura"""
+        if self.canvas is None or self.imagen_simple is None:
+            return
+        
+        self.imagen_simple.set_data(imagen)
+        self.imagen_simple.autoscale()
+        if titulo:
+            self.imagen_simple.axes.set_title(titulo, fontsize=12, fontweight='bold')
+        self.canvas.draw_idle()
+    
     def mostrar_dos_imagenes(self, img1, img2, titulo1, titulo2, titulo_principal, 
                               cmap1='gray', cmap2='gray', color_titulo2='purple'):
         """Muestra dos imágenes lado a lado"""
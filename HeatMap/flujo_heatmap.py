@@ -0,0 +1,305 @@
+"""
+Mapas de calor en flujo para videos y secuencias de imágenes
+"""
+import os
+import queue
+import re
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from logica_heatmap import HeatMapProcessor, calcular_rango_percentil
+
+
+EXTENSIONES_IMAGEN = (".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".tif")
+
+# Códec de cv2.VideoWriter según la extensión del archivo de salida
+CODECS_VIDEO = {
+    ".mp4": "mp4v",
+    ".m4v": "mp4v",
+    ".mov": "mp4v",
+    ".avi": "MJPG",
+    ".mkv": "XVID"
+}
+
+# Marca de fin de flujo entre etapas
+_FIN = object()
+
+
+def _clave_natural(nombre):
+    """Clave de orden natural: los tramos de dígitos se comparan como enteros"""
+    return [(0, int(tramo), '') if tramo.isdigit() else (1, 0, tramo.lower())
+            for tramo in re.split(r'(\d+)', nombre) if tramo]
+
+
+def listar_imagenes(directorio):
+    """Rutas de las imágenes de un directorio en orden natural de nombre"""
+    nombres = [n for n in os.listdir(directorio) if n.lower().endswith(EXTENSIONES_IMAGEN)]
+    return [os.path.join(directorio, n) for n in sorted(nombres, key=_clave_natural)]
+
+
+def leer_cuadros(entrada):
+    """
+    Generar los cuadros de un video o de un directorio de imágenes
+    
+    Las imágenes se leen conservando 16 bits o flotantes.
+    
+    Args:
+        entrada: Ruta de un archivo de video o de un directorio
+    
+    Yields:
+        Cuadros en formato OpenCV
+    """
+    if os.path.isdir(entrada):
+        for ruta in listar_imagenes(entrada):
+            cuadro = cv2.imread(ruta, cv2.IMREAD_ANYDEPTH | cv2.IMREAD_ANYCOLOR)
+            if cuadro is None:
+                raise ValueError(f"No se pudo leer la imagen: {ruta}")
+            yield cuadro
+        return
+    
+    captura = cv2.VideoCapture(entrada)
+    if not captura.isOpened():
+        raise ValueError(f"No se pudo abrir el video: {entrada}")
+    try:
+        while True:
+            ok, cuadro = captura.read()
+            if not ok:
+                break
+            yield cuadro
+    finally:
+        captura.release()
+
+
+def fps_de_entrada(entrada, fps_por_defecto=30.0):
+    """FPS declarados por un video (o el valor por defecto para directorios)"""
+    if os.path.isdir(entrada):
+        return fps_por_defecto
+    captura = cv2.VideoCapture(entrada)
+    fps = captura.get(cv2.CAP_PROP_FPS)
+    captura.release()
+    return fps if fps and fps > 0 else fps_por_defecto
+
+
+class EscritorCuadros:
+    """Escribe cuadros en un video (cv2.VideoWriter) o como PNG numerados"""
+    
+    def __init__(self, salida, fps=30.0):
+        """
+        Args:
+            salida: Archivo de video (.mp4, .avi, ...) o directorio para PNG
+                    (ruta sin extensión o directorio existente)
+            fps: Cuadros por segundo del video de salida
+        """
+        self.salida = salida
+        self.fps = fps
+        self.escritor = None
+        self.cuadros = 0
+        
+        extension = os.path.splitext(salida)[1].lower()
+        self.es_video = extension in CODECS_VIDEO
+        if not self.es_video:
+            # Solo una ruta sin extensión (o un directorio existente) recibe PNG
+            if extension and not os.path.isdir(salida):
+                soportadas = ", ".join(sorted(CODECS_VIDEO))
+                raise ValueError(f"Extensión de video no soportada: {extension} "
+                                 f"(soportadas: {soportadas})")
+            os.makedirs(salida, exist_ok=True)
+    
+    def escribir(self, cuadro):
+        """Escribir un cuadro BGR de 8 bits"""
+        if self.es_video:
+            if self.escritor is None:
+                # El tamaño del video se fija con el primer cuadro
+                altura, ancho = cuadro.shape[:2]
+                extension = os.path.splitext(self.salida)[1].lower()
+                fourcc = cv2.VideoWriter_fourcc(*CODECS_VIDEO[extension])
+                self.escritor = cv2.VideoWriter(self.salida, fourcc, self.fps, (ancho, altura))
+                if not self.escritor.isOpened():
+                    raise ValueError(f"No se pudo crear el video: {self.salida}")
+            self.escritor.write(cuadro)
+        else:
+            ruta = os.path.join(self.salida, f"cuadro_{self.cuadros:06d}.png")
+            if not cv2.imwrite(ruta, cuadro):
+                raise ValueError(f"No se pudo escribir la imagen: {ruta}")
+        self.cuadros += 1
+    
+    def cerrar(self):
+        """Liberar el escritor de video"""
+        if self.escritor is not None:
+            self.escritor.release()
+            self.escritor = None
+
+
+class ProcesadorFlujoHeatMap:
+    """
+    Aplica un mapa de calor a un video o secuencia de imágenes
+    
+    Decodificación, coloreado y codificación corren en hilos separados
+    unidos por colas acotadas, de modo que la memoria no crece con la
+    longitud del video y las tres etapas se solapan (OpenCV libera el GIL).
+    """
+    
+    def __init__(self, mapa_tipo="JET", auto_rango=None, suavizado=0.0,
+                 percentiles=(1.0, 99.0), rango=None, tamaño_cola=8, processor=None):
+        """
+        Args:
+            mapa_tipo: Mapa de calor a aplicar
+            auto_rango: Estirar cada cuadro a su rango por percentiles; None
+                        lo activa solo para cuadros de 16 bits o flotantes
+            suavizado: Peso del rango anterior en el promedio exponencial del
+                       rango automático (0 = sin suavizado, evita parpadeo si > 0)
+            percentiles: Percentiles (bajo, alto) del rango automático
+            rango: Rango fijo (minimo, maximo); desactiva el rango automático
+            tamaño_cola: Capacidad de las colas entre etapas
+            processor: HeatMapProcessor a usar (None = uno nuevo)
+        """
+        self.mapa_tipo = mapa_tipo
+        self.auto_rango = auto_rango
+        self.suavizado = suavizado
+        self.percentiles = percentiles
+        self.rango = rango
+        self.tamaño_cola = tamaño_cola
+        self.processor = processor if processor is not None else HeatMapProcessor()
+        
+        self.rango_actual = None
+        self._detener = threading.Event()
+    
+    def detener(self):
+        """Solicitar que el procesamiento termine tras el cuadro actual"""
+        self._detener.set()
+    
+    def _rango_cuadro(self, gris):
+        """Rango del cuadro con el promedio exponencial entre cuadros"""
+        if self.rango is not None:
+            return self.rango
+        
+        bajo, alto = calcular_rango_percentil(gris, *self.percentiles)
+        if self.rango_actual is not None and self.suavizado > 0:
+            bajo_anterior, alto_anterior = self.rango_actual
+            bajo = self.suavizado * bajo_anterior + (1 - self.suavizado) * bajo
+            alto = self.suavizado * alto_anterior + (1 - self.suavizado) * alto
+        self.rango_actual = (bajo, alto)
+        return self.rango_actual
+    
+    def colorear(self, cuadro):
+        """Aplicar el mapa de calor a un cuadro"""
+        usar_rango = self.rango is not None or (
+            self.auto_rango if self.auto_rango is not None else cuadro.dtype != np.uint8
+        )
+        if not usar_rango:
+            return self.processor.aplicar_mapa_calor(cuadro, self.mapa_tipo)
+        
+        gris = cv2.cvtColor(cuadro, cv2.COLOR_BGR2GRAY) if len(cuadro.shape) == 3 else cuadro
+        imagen_coloreada, _ = self.processor.aplicar_mapa_calor_hdr(
+            gris, self.mapa_tipo, rango=self._rango_cuadro(gris)
+        )
+        return imagen_coloreada
+    
+    def procesar(self, entrada, salida, fps=None, callback_progreso=None):
+        """
+        Procesar un video o directorio completo
+        
+        Args:
+            entrada: Archivo de video o directorio de imágenes
+            salida: Archivo de video o directorio para PNG numerados
+            fps: FPS del video de salida (None = los de la entrada)
+            callback_progreso: Función opcional (cuadros, fps_sostenidos)
+                               llamada desde el hilo de codificación
+        
+        Returns:
+            Diccionario con cuadros procesados, segundos y FPS sostenidos
+        """
+        self._detener.clear()
+        self.rango_actual = None
+        if fps is None:
+            fps = fps_de_entrada(entrada)
+        
+        cola_decodificados = queue.Queue(maxsize=self.tamaño_cola)
+        cola_coloreados = queue.Queue(maxsize=self.tamaño_cola)
+        errores = []
+        
+        def poner(cola, elemento):
+            # Reintenta para poder abandonar si otra etapa falló
+            while not self._detener.is_set():
+                try:
+                    cola.put(elemento, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def fallar(error):
+            errores.append(error)
+            self._detener.set()
+        
+        def etapa(funcion, cola_siguiente):
+            try:
+                funcion()
+            except Exception as e:
+                fallar(e)
+            finally:
+                # Las etapas siguientes vacían su cola hasta la marca de fin,
+                # así que entregarla nunca bloquea indefinidamente
+                if cola_siguiente is not None:
+                    cola_siguiente.put(_FIN)
+        
+        def decodificar():
+            for cuadro in leer_cuadros(entrada):
+                if not poner(cola_decodificados, cuadro):
+                    break
+        
+        def colorear():
+            while True:
+                cuadro = cola_decodificados.get()
+                if cuadro is _FIN:
+                    break
+                if self._detener.is_set():
+                    continue
+                try:
+                    poner(cola_coloreados, self.colorear(cuadro))
+                except Exception as e:
+                    fallar(e)
+        
+        escritor = EscritorCuadros(salida, fps)
+        inicio = time.perf_counter()
+        
+        def codificar():
+            try:
+                while True:
+                    cuadro = cola_coloreados.get()
+                    if cuadro is _FIN:
+                        break
+                    if self._detener.is_set():
+                        continue
+                    try:
+                        escritor.escribir(cuadro)
+                        if callback_progreso is not None:
+                            transcurrido = time.perf_counter() - inicio
+                            callback_progreso(escritor.cuadros, escritor.cuadros / max(transcurrido, 1e-9))
+                    except Exception as e:
+                        fallar(e)
+            finally:
+                escritor.cerrar()
+        
+        hilos = [
+            threading.Thread(target=etapa, args=(decodificar, cola_decodificados), daemon=True),
+            threading.Thread(target=etapa, args=(colorear, cola_coloreados), daemon=True),
+            threading.Thread(target=etapa, args=(codificar, None), daemon=True)
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        
+        if errores:
+            raise errores[0]
+        
+        segundos = time.perf_counter() - inicio
+        return {
+            "cuadros": escritor.cuadros,
+            "segundos": segundos,
+            "fps": escritor.cuadros / max(segundos, 1e-9)
+        }
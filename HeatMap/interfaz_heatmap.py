@@ -3,10 +3,21 @@ Interfaz gráfica para aplicar mapas de calor a imágenes
 """
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image, ImageTk
 import cv2
 import numpy as np
-from logica_heatmap import HeatMapProcessor
+import threading
+from logica_heatmap import HeatMapProcessor, calcular_rango_percentil, cuantizar_rango
+from flujo_heatmap import ProcesadorFlujoHeatMap
+import sys
+import os
+
+# Importar el visor compartido desde el directorio raíz del proyecto
+directorio_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if directorio_raiz not in sys.path:
+    sys.path.insert(0, directorio_raiz)
+
+from ImagenDigital.visor_imagen import VisorImagen
+from ImagenDigital.procesamiento_basico import leer_imagen
 
 
 class HeatMapApp:
@@ -18,6 +29,9 @@ class HeatMapApp:
         self.processor = HeatMapProcessor()
         self.imagen_original = None
         self.imagen_path = None
+        self.mapa_actual = "JET"
+        self.procesador_flujo = None
+        self.visores = {}
         
         self.setup_ui()
     
@@ -61,12 +75,31 @@ class HeatMapApp:
         ttk.Button(control_frame, text="Mapa Pastel", 
                    command=lambda: self.aplicar_mapa("PASTEL")).grid(row=22, column=0, pady=5, sticky=(tk.W, tk.E))
         
+        # Botón para ver todos los mapas a la vez
+        ttk.Button(control_frame, text="Galería de Mapas", 
+                   command=self.mostrar_galeria).grid(row=23, column=0, pady=5, sticky=(tk.W, tk.E))
+        
         # Separador
-        ttk.Separator(control_frame, orient=tk.HORIZONTAL).grid(row=23, column=0, sticky=(tk.W, tk.E), pady=10)
+        ttk.Separator(control_frame, orient=tk.HORIZONTAL).grid(row=24, column=0, sticky=(tk.W, tk.E), pady=10)
         
         # Botón para limpiar
         ttk.Button(control_frame, text="Limpiar Todo", 
-                   command=self.limpiar_todo).grid(row=24, column=0, pady=5, sticky=(tk.W, tk.E))
+                   command=self.limpiar_todo).grid(row=25, column=0, pady=5, sticky=(tk.W, tk.E))
+        
+        # Separador
+        ttk.Separator(control_frame, orient=tk.HORIZONTAL).grid(row=26, column=0, sticky=(tk.W, tk.E), pady=10)
+        
+        # Label para video y secuencias
+        ttk.Label(control_frame, text="Video / Secuencia:", 
+                  font=('Arial', 10, 'bold')).grid(row=27, column=0, pady=(5, 10), sticky=tk.W)
+        
+        # Botones para procesar en flujo con el último mapa aplicado
+        ttk.Button(control_frame, text="Procesar Video", 
+                   command=self.procesar_video).grid(row=28, column=0, pady=2, sticky=(tk.W, tk.E))
+        ttk.Button(control_frame, text="Procesar Carpeta", 
+                   command=self.procesar_carpeta).grid(row=29, column=0, pady=2, sticky=(tk.W, tk.E))
+        ttk.Button(control_frame, text="Detener", 
+                   command=self.detener_flujo).grid(row=30, column=0, pady=2, sticky=(tk.W, tk.E))
         
         # Frame para imagen original
         original_frame = ttk.LabelFrame(main_frame, text="Imagen Original", padding="10")
@@ -135,8 +168,8 @@ class HeatMapApp:
         
         if file_path:
             try:
-                # Cargar imagen con OpenCV
-                self.imagen_original = cv2.imread(file_path)
+                # Cargar imagen con OpenCV conservando 16 bits o flotantes
+                self.imagen_original = leer_imagen(file_path, 'original')
                 if self.imagen_original is None:
                     raise ValueError("No se pudo cargar la imagen")
                 
@@ -164,45 +197,117 @@ class HeatMapApp:
                 self.imagen_original.copy(), mapa_tipo
             )
             
+            self.mapa_actual = mapa_tipo
             self.mostrar_imagen(imagen_procesada, self.canvas_procesada)
             self.info_label.config(text=f"Mapa aplicado: {mapa_tipo}")
             
         except Exception as e:
             messagebox.showerror("Error", f"Error al aplicar mapa de calor:\n{str(e)}")
     
-    def mostrar_imagen(self, imagen_cv, canvas):
-        """Mostrar imagen en un canvas"""
-        # Convertir de BGR a RGB
-        imagen_rgb = cv2.cvtColor(imagen_cv, cv2.COLOR_BGR2RGB)
-        
-        # Obtener dimensiones del canvas
-        canvas.update()
-        canvas_width = canvas.winfo_width()
-        canvas_height = canvas.winfo_height()
+    def mostrar_galeria(self):
+        """Mostrar la imagen con todos los mapas de calor en un mosaico"""
+        if self.imagen_original is None:
+            messagebox.showwarning("Advertencia", "Por favor, carga una imagen primero")
+            return
         
-        # Redimensionar imagen manteniendo aspecto
-        imagen_pil = Image.fromarray(imagen_rgb)
-        img_width, img_height = imagen_pil.size
+        try:
+            mapas = self.processor.nombres_mapas()
+            columnas = int(np.ceil(np.sqrt(len(mapas))))
+            filas = int(np.ceil(len(mapas) / columnas))
+            
+            # Reducir antes de colorear para que el mosaico quepa en el canvas
+            self.canvas_procesada.update()
+            altura, ancho = self.imagen_original.shape[:2]
+            escala = min(self.canvas_procesada.winfo_width() / (columnas * ancho),
+                         self.canvas_procesada.winfo_height() / (filas * altura), 1.0)
+            
+            mosaico, _ = self.processor.aplicar_todos_los_mapas(
+                self.imagen_original, mapas, escala=escala, mosaico=True, columnas=columnas
+            )
+            
+            self.mostrar_imagen(mosaico, self.canvas_procesada)
+            self.info_label.config(text=f"Galería: {', '.join(mapas)}")
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al crear la galería:\n{str(e)}")
+    
+    def procesar_video(self):
+        """Aplicar el mapa actual a un video y guardar el resultado"""
+        entrada = filedialog.askopenfilename(
+            title="Seleccionar Video",
+            filetypes=[
+                ("Videos", "*.mp4 *.avi *.mkv *.mov *.m4v"),
+                ("Todos los archivos", "*.*")
+            ]
+        )
+        if not entrada:
+            return
+        salida = filedialog.asksaveasfilename(
+            title="Guardar Video",
+            defaultextension=".mp4",
+            filetypes=[("MP4", "*.mp4"), ("AVI", "*.avi")]
+        )
+        if salida:
+            self.iniciar_flujo(entrada, salida)
+    
+    def procesar_carpeta(self):
+        """Aplicar el mapa actual a una carpeta de imágenes y guardar PNG numerados"""
+        entrada = filedialog.askdirectory(title="Seleccionar Carpeta de Imágenes")
+        if not entrada:
+            return
+        salida = filedialog.askdirectory(title="Seleccionar Carpeta de Salida")
+        if salida:
+            self.iniciar_flujo(entrada, salida)
+    
+    def iniciar_flujo(self, entrada, salida):
+        """Procesar un video o secuencia en segundo plano mostrando el progreso"""
+        if self.procesador_flujo is not None:
+            messagebox.showwarning("Advertencia", "Ya hay un procesamiento en curso")
+            return
         
-        # Calcular escala
-        scale = min(canvas_width / img_width, canvas_height / img_height, 1.0)
-        new_width = int(img_width * scale)
-        new_height = int(img_height * scale)
+        self.procesador_flujo = ProcesadorFlujoHeatMap(
+            self.mapa_actual, suavizado=0.9, processor=self.processor
+        )
         
-        # Redimensionar
-        imagen_pil = imagen_pil.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        def progreso(cuadros, fps):
+            self.root.after(0, lambda: self.info_label.config(
+                text=f"Procesando ({self.mapa_actual}): {cuadros} cuadros, {fps:.1f} FPS"
+            ))
         
-        # Convertir a PhotoImage
-        imagen_tk = ImageTk.PhotoImage(imagen_pil)
+        def trabajar():
+            try:
+                resultado = self.procesador_flujo.procesar(entrada, salida, callback_progreso=progreso)
+                texto = (f"Listo: {resultado['cuadros']} cuadros en {resultado['segundos']:.1f} s "
+                         f"({resultado['fps']:.1f} FPS)")
+                self.root.after(0, lambda: self.info_label.config(text=texto))
+            except Exception as e:
+                error = str(e)
+                self.root.after(0, lambda: messagebox.showerror(
+                    "Error", f"Error al procesar el flujo:\n{error}"
+                ))
+            finally:
+                self.procesador_flujo = None
         
-        # Limpiar canvas y mostrar imagen
-        canvas.delete("all")
-        x = (canvas_width - new_width) // 2
-        y = (canvas_height - new_height) // 2
-        canvas.create_image(x, y, anchor=tk.NW, image=imagen_tk)
+        threading.Thread(target=trabajar, daemon=True).start()
+    
+    def detener_flujo(self):
+        """Detener el procesamiento en curso"""
+        if self.procesador_flujo is not None:
+            self.procesador_flujo.detener()
+    
+    def mostrar_imagen(self, imagen_cv, canvas):
+        """Mostrar imagen en un canvas"""
+        # Datos de 16 bits o flotantes: mostrar con el rango automático
+        if imagen_cv.dtype != np.uint8:
+            imagen_cv = cuantizar_rango(imagen_cv, *calcular_rango_percentil(
+                imagen_cv if imagen_cv.ndim == 2 else cv2.cvtColor(imagen_cv, cv2.COLOR_BGR2GRAY)
+            ))
         
-        # Guardar referencia para evitar garbage collection
-        canvas.image = imagen_tk
+        # El visor del canvas ajusta la imagen a su tamaño, centra y reutiliza el PhotoImage
+        canvas.update()
+        if canvas not in self.visores:
+            self.visores[canvas] = VisorImagen(canvas)
+        self.visores[canvas].mostrar(imagen_cv)
     
     def limpiar_todo(self):
         """Limpiar todas las imágenes"""
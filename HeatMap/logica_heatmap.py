@@ -5,6 +5,192 @@ import cv2
 import numpy as np
 
 
+# ===== MAPAS DE COLOR PERSONALIZADOS =====
+
+def crear_lut_desde_puntos(puntos):
+    """
+    Crear una LUT de 256 entradas interpolando linealmente entre puntos de control
+    
+    Args:
+        puntos: Lista de (posicion, (b, g, r)) con posicion en [0, 1]
+    
+    Returns:
+        LUT de 256x1x3 (uint8) lista para cv2.applyColorMap
+    """
+    puntos = sorted(puntos, key=lambda p: p[0])
+    posiciones = np.array([p[0] for p in puntos], dtype=np.float64) * 255
+    colores = np.array([p[1] for p in puntos], dtype=np.float64)
+    
+    indices = np.arange(256)
+    lut = np.empty((256, 1, 3), dtype=np.uint8)
+    for canal in range(3):
+        valores = np.interp(indices, posiciones, colores[:, canal])
+        lut[:, 0, canal] = np.clip(np.rint(valores), 0, 255)
+    return lut
+
+
+def _crear_lut_pastel():
+    """LUT pastel en 6 segmentos (rosa, melocotón, amarillo, menta, cielo, lavanda)"""
+    t = np.arange(256) / 255.0
+    
+    # Cada segmento: (inicio, longitud, (r, g, b) inicial, (dr, dg, db) por unidad de factor)
+    segmentos = [
+        (0.00, 0.16, (255, 255, 255), (-30, -70, -50)),   # Blanco a rosa pastel
+        (0.16, 0.17, (225, 185, 205), (-20, -15, 20)),    # Rosa a melocotón
+        (0.33, 0.17, (205, 170, 225), (40, 70, -45)),     # Melocotón a amarillo pastel
+        (0.50, 0.16, (245, 240, 180), (-75, -25, 30)),    # Amarillo pastel a verde menta
+        (0.66, 0.17, (170, 215, 210), (-30, -20, 35)),    # Verde menta a azul cielo
+        (0.83, 0.17, (140, 195, 245), (50, -40, -15))     # Azul cielo a lavanda
+    ]
+    
+    lut = np.zeros((256, 1, 3), dtype=np.uint8)
+    limites = [inicio for inicio, _, _, _ in segmentos[1:]] + [np.inf]
+    inicio_anterior = -np.inf
+    for (inicio, longitud, base, pendiente), limite in zip(segmentos, limites):
+        en_segmento = (t >= inicio_anterior) & (t < limite)
+        inicio_anterior = limite
+        factor = (t[en_segmento] - inicio) / longitud
+        r, g, b = (np.trunc(c + factor * d) for c, d in zip(base, pendiente))
+        lut[en_segmento, 0] = np.stack([b, g, r], axis=1)
+    return lut
+
+
+def _crear_lut_pastel_alternativo():
+    """LUT pastel con transiciones sinusoidales (tonos de dulces y postres)"""
+    t = np.arange(256) / 255.0
+    r = np.trunc(200 + 55 * np.sin(t * np.pi))
+    g = np.trunc(180 + 75 * np.sin(t * np.pi + np.pi / 3))
+    b = np.trunc(220 + 35 * np.sin(t * np.pi + 2 * np.pi / 3))
+    return np.clip(np.stack([b, g, r], axis=1), 0, 255).astype(np.uint8).reshape(256, 1, 3)
+
+
+# Constructores de los mapas incluidos; cada LUT se crea en su primer uso
+_CONSTRUCTORES_LUT = {
+    "PASTEL": _crear_lut_pastel,
+    "PASTEL_ALTERNATIVO": _crear_lut_pastel_alternativo
+}
+_LUTS_PERSONALIZADAS = {}
+
+
+def registrar_mapa_color(nombre, puntos=None, lut=None):
+    """
+    Registrar un mapa de color personalizado
+    
+    Args:
+        nombre: Nombre del mapa
+        puntos: Puntos de control (posicion, (b, g, r)) con posicion en [0, 1]
+        lut: LUT ya construida de 256 colores BGR (alternativa a puntos)
+    
+    Returns:
+        LUT de 256x1x3 registrada
+    """
+    if lut is None:
+        if puntos is None:
+            raise ValueError("Se requieren puntos de control o una LUT")
+        lut = crear_lut_desde_puntos(puntos)
+    else:
+        lut = np.ascontiguousarray(np.asarray(lut, dtype=np.uint8).reshape(256, 1, 3))
+    
+    _LUTS_PERSONALIZADAS[nombre] = lut
+    return lut
+
+
+def obtener_lut_personalizada(nombre):
+    """Obtener la LUT (256x1x3) de un mapa personalizado, creándola si es necesario"""
+    lut = _LUTS_PERSONALIZADAS.get(nombre)
+    if lut is None:
+        if nombre not in _CONSTRUCTORES_LUT:
+            raise ValueError(f"Mapa de calor no reconocido: {nombre}")
+        lut = _LUTS_PERSONALIZADAS[nombre] = _CONSTRUCTORES_LUT[nombre]()
+    return lut
+
+
+def mapas_personalizados():
+    """Nombres de los mapas personalizados disponibles"""
+    return list(dict.fromkeys(list(_CONSTRUCTORES_LUT) + list(_LUTS_PERSONALIZADAS)))
+
+
+# ===== DATOS DE ALTO RANGO DINÁMICO (16 BITS Y FLOTANTES) =====
+
+def calcular_rango_percentil(datos, percentil_bajo=1.0, percentil_alto=99.0, bins=4096):
+    """
+    Rango robusto de una imagen a partir de su histograma
+    
+    Los percentiles se buscan en un histograma de 'bins' intervalos entre el
+    mínimo y el máximo, sin ordenar los píxeles. El error es como máximo el
+    ancho de un intervalo.
+    
+    Args:
+        datos: Imagen de un canal (uint8, uint16 o float32) con valores finitos
+        percentil_bajo: Percentil del límite inferior (0-100)
+        percentil_alto: Percentil del límite superior (0-100)
+        bins: Número de intervalos del histograma
+    
+    Returns:
+        Tupla (minimo, maximo) con minimo < maximo
+    """
+    minimo, maximo, _, _ = cv2.minMaxLoc(datos)
+    if maximo <= minimo:
+        return float(minimo), float(minimo) + 1.0
+    
+    # El límite superior de calcHist es exclusivo
+    if np.issubdtype(datos.dtype, np.integer):
+        limite = maximo + 1.0
+    else:
+        limite = float(np.nextafter(np.float32(maximo), np.float32(np.inf)))
+    
+    if datos.dtype == np.float64:
+        datos = datos.astype(np.float32)
+    hist = cv2.calcHist([datos], [0], None, [bins], [minimo, limite]).ravel()
+    acumulado = np.cumsum(hist)
+    total = acumulado[-1]
+    
+    ancho_bin = (limite - minimo) / bins
+    bin_bajo = np.searchsorted(acumulado, total * percentil_bajo / 100.0, side='right')
+    bin_alto = np.searchsorted(acumulado, total * percentil_alto / 100.0, side='left')
+    bajo = minimo + bin_bajo * ancho_bin
+    alto = min(minimo + (bin_alto + 1) * ancho_bin, maximo)
+    if alto <= bajo:
+        alto = bajo + ancho_bin
+    return float(bajo), float(alto)
+
+
+def cuantizar_rango(datos, minimo, maximo):
+    """
+    Cuantizar datos de cualquier profundidad a índices 0-255 de una LUT
+    
+    Tras fijar el límite inferior, escala, desplazamiento, redondeo y
+    saturación se hacen en una sola pasada con cv2.convertScaleAbs.
+    
+    Args:
+        datos: Imagen entera (con o sin signo) o float32 de uno o varios
+               canales; cada canal se cuantiza con el mismo rango
+        minimo: Valor que se asigna al índice 0
+        maximo: Valor que se asigna al índice 255
+    
+    Returns:
+        Imagen uint8 con los índices
+    """
+    escala = 255.0 / max(maximo - minimo, 1e-12)
+    # Los escalares van con 4 componentes: un número solo afectaría al canal 0
+    if np.issubdtype(datos.dtype, np.integer):
+        info = np.iinfo(datos.dtype)
+        if minimo > info.max:
+            return np.zeros(datos.shape, dtype=np.uint8)
+        base = max(int(np.ceil(minimo)), info.min)
+        if info.min < 0:
+            # Con signo: acotar al mínimo antes de convertScaleAbs, que
+            # reflejaría los valores negativos hacia arriba
+            acotado = cv2.max(datos, (base,) * 4)
+            return cv2.convertScaleAbs(acotado, alpha=escala, beta=-minimo * escala)
+        # Resta con saturación en 0: los valores bajo el mínimo quedan en 0
+        desplazado = cv2.subtract(datos, (max(base, 0),) * 4)
+        return cv2.convertScaleAbs(desplazado, alpha=escala, beta=(max(base, 0) - minimo) * escala)
+    
+    acotado = cv2.max(datos, (float(minimo),) * 4)
+    return cv2.convertScaleAbs(acotado, alpha=escala, beta=-minimo * escala)
+
+
 class HeatMapProcessor:
     def __init__(self):
         # Mapeo de nombres a constantes de OpenCV
@@ -30,6 +216,9 @@ class HeatMapProcessor:
             "TWILIGHT": cv2.COLORMAP_TWILIGHT,
             "TURBO": cv2.COLORMAP_TURBO
         }
+        
+        # LUTs de 256x1x3 de los mapas de OpenCV, calculadas en el primer uso
+        self._luts_opencv = {}
     
     def aplicar_mapa_calor(self, imagen, mapa_tipo):
         """
@@ -42,27 +231,69 @@ class HeatMapProcessor:
         Returns:
             Imagen con mapa de calor aplicado
         """
+        # Datos de 16 bits o flotantes: ruta de alto rango dinámico
+        if imagen.dtype != np.uint8:
+            imagen_coloreada, _ = self.aplicar_mapa_calor_hdr(imagen, mapa_tipo)
+            return imagen_coloreada
+        
         # Convertir imagen a escala de grises
         if len(imagen.shape) == 3:
             imagen_gray = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
         else:
-            imagen_gray = imagen.copy()
+            imagen_gray = imagen
         
         # Aplicar mapa de calor
-        if mapa_tipo == "PASTEL":
-            # Mapa personalizado tipo pastel
-            imagen_coloreada = self.aplicar_mapa_pastel(imagen_gray)
-        elif mapa_tipo in self.opencv_colormaps:
+        if mapa_tipo in self.opencv_colormaps:
             # Mapas de OpenCV
             imagen_coloreada = cv2.applyColorMap(imagen_gray, self.opencv_colormaps[mapa_tipo])
         else:
-            raise ValueError(f"Mapa de calor no reconocido: {mapa_tipo}")
+            # Mapas personalizados: misma ruta de OpenCV con la LUT precalculada
+            imagen_coloreada = cv2.applyColorMap(imagen_gray, obtener_lut_personalizada(mapa_tipo))
         
         return imagen_coloreada
     
+    def aplicar_mapa_calor_hdr(self, datos, mapa_tipo, rango=None, percentiles=(1.0, 99.0),
+                               bins=4096, ganancia=1.0, desplazamiento=0.0):
+        """
+        Aplicar un mapa de calor a datos radiométricos de 16 bits o flotantes
+        
+        Args:
+            datos: Imagen uint16, float32 o float64 (un canal o BGR)
+            mapa_tipo: Tipo de mapa de calor a aplicar
+            rango: Tupla (minimo, maximo) fija en unidades de temperatura;
+                   None para calcularla por percentiles en cada imagen
+            percentiles: Percentiles (bajo, alto) del rango automático
+            bins: Intervalos del histograma del rango automático
+            ganancia: Conversión de valores crudos a temperatura
+                      (temperatura = crudo * ganancia + desplazamiento)
+            desplazamiento: Desplazamiento de la conversión a temperatura
+        
+        Returns:
+            Tupla (imagen_coloreada, rango) con el rango usado en unidades
+            de temperatura
+        """
+        if len(datos.shape) == 3:
+            datos = cv2.cvtColor(datos, cv2.COLOR_BGR2GRAY)
+        if datos.dtype == np.float64:
+            datos = datos.astype(np.float32)
+        
+        if rango is None:
+            crudo_min, crudo_max = calcular_rango_percentil(datos, percentiles[0], percentiles[1], bins)
+            rango = tuple(sorted((crudo_min * ganancia + desplazamiento,
+                                  crudo_max * ganancia + desplazamiento)))
+        else:
+            # Rango fijo de temperatura expresado en valores crudos
+            crudo_min, crudo_max = sorted(((t - desplazamiento) / ganancia for t in rango))
+        
+        indices = cuantizar_rango(datos, crudo_min, crudo_max)
+        if ganancia < 0:
+            indices = cv2.bitwise_not(indices)
+        
+        return self.aplicar_mapa_calor(indices, mapa_tipo), rango
+    
     def aplicar_mapa_pastel(self, imagen_gray):
         """
-        Crear y aplicar un mapa de colores personalizado con tonos pastel
+        Aplicar el mapa de colores personalizado con tonos pastel
         
         Args:
             imagen_gray: Imagen en escala de grises
@@ -70,87 +301,109 @@ class HeatMapProcessor:
         Returns:
             Imagen con colores pastel aplicados
         """
-        # Crear imagen de salida en color (3 canales)
-        altura, ancho = imagen_gray.shape
-        imagen_coloreada = np.zeros((altura, ancho, 3), dtype=np.uint8)
-        
-        # Crear una tabla de colores (LUT - Look Up Table) de 256 entradas
-        lut = np.zeros((256, 3), dtype=np.uint8)
-        
-        # Definir colores pastel en BGR para diferentes rangos de intensidad
-        # Dividimos en 6 segmentos para transiciones suaves
-        
-        for i in range(256):
-            # Normalizar el valor (0-1)
-            t = i / 255.0
-            
-            if t < 0.16:  # Rosa pastel claro
-                # Interpolación de blanco a rosa pastel
-                factor = t / 0.16
-                r = int(255 - factor * 30)
-                g = int(255 - factor * 70)
-                b = int(255 - factor * 50)
-            elif t < 0.33:  # Rosa a melocotón
-                factor = (t - 0.16) / 0.17
-                r = int(225 - factor * 20)
-                g = int(185 - factor * 15)
-                b = int(205 + factor * 20)
-            elif t < 0.50:  # Melocotón a amarillo pastel
-                factor = (t - 0.33) / 0.17
-                r = int(205 + factor * 40)
-                g = int(170 + factor * 70)
-                b = int(225 - factor * 45)
-            elif t < 0.66:  # Amarillo pastel a verde menta
-                factor = (t - 0.50) / 0.16
-                r = int(245 - factor * 75)
-                g = int(240 - factor * 25)
-                b = int(180 + factor * 30)
-            elif t < 0.83:  # Verde menta a azul cielo
-                factor = (t - 0.66) / 0.17
-                r = int(170 - factor * 30)
-                g = int(215 - factor * 20)
-                b = int(210 + factor * 35)
-            else:  # Azul cielo a lavanda
-                factor = (t - 0.83) / 0.17
-                r = int(140 + factor * 50)
-                g = int(195 - factor * 40)
-                b = int(245 - factor * 15)
-            
-            # Asignar colores en formato BGR
-            lut[i, 0] = b  # Blue
-            lut[i, 1] = g  # Green
-            lut[i, 2] = r  # Red
-        
-        # Aplicar LUT a cada píxel de la imagen
-        for canal in range(3):
-            imagen_coloreada[:, :, canal] = lut[imagen_gray, canal]
-        
-        return imagen_coloreada
+        return cv2.applyColorMap(imagen_gray, obtener_lut_personalizada("PASTEL"))
     
     def crear_mapa_pastel_alternativo(self):
         """
-        Crear un mapa de colores pastel alternativo con diferentes tonalidades
+        Obtener el mapa de colores pastel alternativo con diferentes tonalidades
         
         Returns:
             LUT (Look Up Table) de 256x1x3 con colores pastel
         """
-        lut = np.zeros((256, 1, 3), dtype=np.uint8)
-        
-        # Colores pastel inspirados en dulces y postres
-        for i in range(256):
-            t = i / 255.0
-            
-            # Usar funciones sinusoidales para transiciones suaves
-            r = int(200 + 55 * np.sin(t * np.pi))
-            g = int(180 + 75 * np.sin(t * np.pi + np.pi / 3))
-            b = int(220 + 35 * np.sin(t * np.pi + 2 * np.pi / 3))
-            
-            # Asegurar que los valores estén en el rango válido
-            lut[i, 0, 0] = np.clip(b, 0, 255)
-            lut[i, 0, 1] = np.clip(g, 0, 255)
-            lut[i, 0, 2] = np.clip(r, 0, 255)
-        
-        return lut
+        return obtener_lut_personalizada("PASTEL_ALTERNATIVO").copy()
+    
+    def registrar_mapa_personalizado(self, nombre, puntos):
+        """
+        Registrar un mapa de calor a partir de puntos de control
+        
+        Args:
+            nombre: Nombre con el que se aplicará el mapa
+            puntos: Lista de (posicion, (b, g, r)) con posicion en [0, 1]
+        
+        Returns:
+            LUT de 256x1x3 registrada
+        """
+        if nombre in self.opencv_colormaps:
+            raise ValueError(f"El nombre {nombre} pertenece a un mapa de OpenCV")
+        return registrar_mapa_color(nombre, puntos)
+    
+    def obtener_lut(self, mapa_tipo):
+        """
+        Obtener la LUT de 256x1x3 de cualquier mapa (OpenCV o personalizado)
+        
+        Args:
+            mapa_tipo: Nombre del mapa
+        
+        Returns:
+            LUT de 256x1x3 (uint8) en BGR
+        """
+        if mapa_tipo in self.opencv_colormaps:
+            lut = self._luts_opencv.get(mapa_tipo)
+            if lut is None:
+                rampa = np.arange(256, dtype=np.uint8).reshape(256, 1)
+                lut = self._luts_opencv[mapa_tipo] = cv2.applyColorMap(
+                    rampa, self.opencv_colormaps[mapa_tipo]
+                )
+            return lut
+        return obtener_lut_personalizada(mapa_tipo)
+    
+    def nombres_mapas(self):
+        """Nombres de todos los mapas disponibles (OpenCV y personalizados)"""
+        return list(self.opencv_colormaps) + mapas_personalizados()
+    
+    def aplicar_todos_los_mapas(self, imagen, mapas=None, escala=1.0, mosaico=False, columnas=None):
+        """
+        Aplicar varios mapas de calor a una imagen en una sola pasada
+        
+        La imagen se convierte a gris y se reduce una sola vez; después cada
+        versión coloreada se escribe, con su LUT de la pila (K, 256, 1, 3),
+        directamente en su posición de un arreglo reservado de antemano.
+        
+        Args:
+            imagen: Imagen en formato BGR o escala de grises
+            mapas: Lista de nombres de mapas (None = todos los disponibles)
+            escala: Factor de reducción aplicado antes de colorear (<= 1)
+            mosaico: Si True, devuelve las versiones en una cuadrícula
+            columnas: Columnas del mosaico (None = cuadrícula casi cuadrada)
+        
+        Returns:
+            Tupla (resultado, mapas) donde resultado es un arreglo
+            (K, H, W, 3) o, con mosaico=True, una imagen BGR con las K
+            versiones ordenadas por filas
+        """
+        if mapas is None:
+            mapas = self.nombres_mapas()
+        
+        # Convertir a gris y reducir una sola vez
+        if len(imagen.shape) == 3:
+            imagen_gray = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+        else:
+            imagen_gray = imagen
+        if imagen_gray.dtype != np.uint8:
+            imagen_gray = cuantizar_rango(imagen_gray, *calcular_rango_percentil(imagen_gray))
+        if escala < 1.0:
+            altura, ancho = imagen_gray.shape
+            nuevo_tamaño = (max(1, int(round(ancho * escala))), max(1, int(round(altura * escala))))
+            imagen_gray = cv2.resize(imagen_gray, nuevo_tamaño, interpolation=cv2.INTER_AREA)
+        
+        luts = np.stack([self.obtener_lut(mapa) for mapa in mapas])
+        altura, ancho = imagen_gray.shape
+        k = len(mapas)
+        if columnas is None:
+            columnas = int(np.ceil(np.sqrt(k)))
+        filas = int(np.ceil(k / columnas)) if mosaico else 1
+        
+        # Las celdas sobrantes del mosaico quedan en negro
+        total = filas * columnas if mosaico else k
+        resultado = np.zeros((total, altura, ancho, 3), dtype=np.uint8)
+        for i in range(k):
+            cv2.applyColorMap(imagen_gray, luts[i], dst=resultado[i])
+        
+        if not mosaico:
+            return resultado, mapas
+        
+        resultado = resultado.reshape(filas, columnas, altura, ancho, 3).transpose(0, 2, 1, 3, 4)
+        return resultado.reshape(filas * altura, columnas * ancho, 3), mapas
     
     def obtener_informacion_imagen(self, imagen):
         """
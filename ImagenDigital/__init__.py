@@ -2,21 +2,56 @@
 Módulo de Procesamiento Básico de Imágenes Digitales
 
 Este módulo proporciona funcionalidades para:
+- Lectura de imágenes con decodificación reducida y cachés de imágenes
 - Conversión de imágenes RGB a escala de grises
 - Binarización con umbral fijo y automático (Otsu)
+- Conversiones CMY, YIQ y HSI con sus inversas
 - Visualización de histogramas de intensidad
+- Histogramas integrales para inspeccionar regiones
 """
 
 from .procesamiento_basico import (
+    leer_imagen,
+    leer_miniatura,
+    CacheImagenes,
+    configurar_cache_imagenes,
+    limpiar_cache_imagenes,
     rgb_a_grises,
     binarizacion_umbral_fijo,
     binarizacion_umbral_otsu,
-    calcular_histograma
+    calcular_histograma,
+    calcular_histogramas,
+    calcular_histogramas_archivos,
+    propiedades_histogramas
 )
+from .modelos_color import (
+    bgr_a_cmy,
+    cmy_a_bgr,
+    bgr_a_yiq,
+    yiq_a_bgr,
+    bgr_a_hsi,
+    hsi_a_bgr
+)
+from .histograma_integral import HistogramaIntegral
 
 __all__ = [
+    'leer_imagen',
+    'leer_miniatura',
+    'CacheImagenes',
+    'configurar_cache_imagenes',
+    'limpiar_cache_imagenes',
     'rgb_a_grises',
     'binarizacion_umbral_fijo',
     'binarizacion_umbral_otsu',
-    'calcular_histograma'
+    'calcular_histograma',
+    'calcular_histogramas',
+    'calcular_histogramas_archivos',
+    'propiedades_histogramas',
+    'bgr_a_cmy',
+    'cmy_a_bgr',
+    'bgr_a_yiq',
+    'yiq_a_bgr',
+    'bgr_a_hsi',
+    'hsi_a_bgr',
+    'HistogramaIntegral'
 ]
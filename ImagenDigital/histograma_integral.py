@@ -0,0 +1,159 @@
+"""
+Histogramas integrales para la inspección interactiva de regiones
+Permiten obtener el histograma y las propiedades de cualquier rectángulo
+sin recorrer sus píxeles
+"""
+
+import cv2
+import numpy as np
+
+try:
+    from .procesamiento_basico import propiedades_histograma
+except ImportError:
+    from procesamiento_basico import propiedades_histograma
+
+
+# Memoria máxima de la tabla integral cuando el tamaño de celda es automático
+MEMORIA_MAX = 64 * 1024 * 1024
+
+
+class HistogramaIntegral:
+    """
+    Histograma integral de una imagen en escala de grises
+    
+    La tabla guarda, para cada esquina de una rejilla de celdas, el conteo
+    acumulado de cada bin de todos los píxeles por encima y a la izquierda.
+    El histograma de un rectángulo alineado a la rejilla sale de cuatro
+    lecturas de la tabla (O(bins)); los bordes no alineados, de menos de
+    una celda de ancho, se cuentan directamente sobre la imagen de bins.
+    Con tamaño_celda=1 toda consulta es O(bins) sin importar el tamaño.
+    """
+    
+    def __init__(self, imagen, bins=256, tamaño_celda=None, memoria_max=MEMORIA_MAX):
+        """
+        Args:
+            imagen: Imagen uint8 en escala de grises o BGR (se convierte a grises)
+            bins: Número de bins (divisor de 256) para acotar la memoria
+            tamaño_celda: Lado de las celdas de la rejilla en píxeles; None
+                          elige el menor que respeta memoria_max
+            memoria_max: Bytes máximos de la tabla integral con celda automática
+        """
+        if 256 % bins != 0:
+            raise ValueError("bins debe ser un divisor de 256")
+        if len(imagen.shape) == 3:
+            imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+        
+        self.bins = bins
+        self.ancho_bin = 256 // bins
+        self.altura, self.ancho = imagen.shape
+        
+        if tamaño_celda is None:
+            tamaño_celda = 1
+            while ((self.altura // tamaño_celda + 2) * (self.ancho // tamaño_celda + 2)
+                   * bins * 4 > memoria_max):
+                tamaño_celda += 1
+        self.tamaño_celda = tamaño_celda
+        
+        # Imagen de índices de bin, usada también para los bordes
+        if self.ancho_bin == 1:
+            self.indices = np.ascontiguousarray(imagen)
+        else:
+            self.indices = imagen // np.uint8(self.ancho_bin)
+        
+        self.tabla = self._construir()
+    
+    @property
+    def nbytes(self):
+        """Memoria ocupada por la tabla integral y la imagen de bins"""
+        return self.tabla.nbytes + self.indices.nbytes
+    
+    def _construir(self):
+        """Conteos por celda con un solo bincount y acumulados en ambos ejes"""
+        t = self.tamaño_celda
+        filas = -(-self.altura // t)
+        columnas = -(-self.ancho // t)
+        
+        tipo = np.int64 if filas * columnas * self.bins >= 2 ** 31 else np.int32
+        celda = ((np.arange(self.altura, dtype=tipo) // t)[:, None] * columnas
+                 + (np.arange(self.ancho, dtype=tipo) // t)[None, :])
+        celda *= self.bins
+        celda += self.indices
+        
+        conteos = np.bincount(celda.ravel(), minlength=filas * columnas * self.bins)
+        conteos = conteos.reshape(filas, columnas, self.bins)
+        
+        # Fila y columna de ceros para que la esquina (0, 0) valga cero
+        tabla = np.zeros((filas + 1, columnas + 1, self.bins), dtype=np.uint32)
+        np.cumsum(conteos, axis=0, out=conteos)
+        np.cumsum(conteos, axis=1, out=conteos)
+        tabla[1:, 1:] = conteos
+        return tabla
+    
+    def _contar(self, y0, y1, x0, x1):
+        """Histograma contado directamente sobre la imagen de bins"""
+        if y1 <= y0 or x1 <= x0:
+            return np.zeros(self.bins, dtype=np.int64)
+        return np.bincount(self.indices[y0:y1, x0:x1].ravel(), minlength=self.bins)
+    
+    def _limite_celda(self, valor, maximo, hacia_arriba):
+        """Índice de la línea de la rejilla más cercana dentro del rectángulo"""
+        if valor >= maximo:
+            return -(-maximo // self.tamaño_celda)
+        if hacia_arriba:
+            return -(-valor // self.tamaño_celda)
+        return valor // self.tamaño_celda
+    
+    def histograma(self, x, y, ancho, alto):
+        """
+        Histograma de un rectángulo (recortado a la imagen)
+        
+        Args:
+            x, y: Esquina superior izquierda
+            ancho, alto: Tamaño del rectángulo
+        
+        Returns:
+            Array float32 de bins valores
+        """
+        x0, y0 = max(0, int(x)), max(0, int(y))
+        x1, y1 = min(self.ancho, int(x + ancho)), min(self.altura, int(y + alto))
+        if x1 <= x0 or y1 <= y0:
+            return np.zeros(self.bins, dtype=np.float32)
+        
+        t = self.tamaño_celda
+        cx0 = self._limite_celda(x0, self.ancho, True)
+        cx1 = self._limite_celda(x1, self.ancho, False)
+        cy0 = self._limite_celda(y0, self.altura, True)
+        cy1 = self._limite_celda(y1, self.altura, False)
+        if cx1 <= cx0 or cy1 <= cy0:
+            # No contiene ninguna celda completa: es angosto en algún eje
+            return self._contar(y0, y1, x0, x1).astype(np.float32)
+        
+        tabla = self.tabla
+        hist = (tabla[cy1, cx1].astype(np.int64) - tabla[cy0, cx1]
+                - tabla[cy1, cx0] + tabla[cy0, cx0])
+        
+        # Bordes fuera de las celdas completas (vacíos con celdas de un píxel)
+        ix0, ix1 = cx0 * t, min(cx1 * t, self.ancho)
+        iy0, iy1 = cy0 * t, min(cy1 * t, self.altura)
+        hist += self._contar(y0, iy0, x0, x1)
+        hist += self._contar(iy1, y1, x0, x1)
+        hist += self._contar(iy0, iy1, x0, ix0)
+        hist += self._contar(iy0, iy1, ix1, x1)
+        return hist.astype(np.float32)
+    
+    def histograma_256(self, x, y, ancho, alto):
+        """Histograma del rectángulo en 256 niveles, con cada bin en su nivel central"""
+        hist = self.histograma(x, y, ancho, alto)
+        if self.ancho_bin == 1:
+            return hist
+        completo = np.zeros(256, dtype=np.float32)
+        completo[np.arange(self.bins) * self.ancho_bin + self.ancho_bin // 2] = hist
+        return completo
+    
+    def propiedades(self, x, y, ancho, alto):
+        """
+        Propiedades estadísticas del rectángulo (ver propiedades_histograma)
+        
+        Con bins gruesos los valores se aproximan por el nivel central de cada bin.
+        """
+        return propiedades_histograma(self.histograma_256(x, y, ancho, alto))
@@ -17,19 +17,24 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 
 from procesamiento_basico import (
+    leer_imagen,
     rgb_a_grises,
     binarizacion_umbral_fijo,
     binarizacion_umbral_otsu,
     calcular_histograma,
     separar_canales_rgb,
     separar_canales_rgb_visualizar,
+    calcular_histogramas,
     calcular_histogramas_rgb,
     propiedades_histograma,
+    propiedades_histogramas,
     rgb_a_cmy,
     rgb_a_yiq,
     rgb_a_hsi,
     rgb_a_hsv
 )
+from histograma_integral import HistogramaIntegral
+from visor_imagen import VisorImagen
 
 
 class InterfazImagenDigital:
@@ -42,6 +47,10 @@ class InterfazImagenDigital:
         self.imagen_grises = None
         self.imagen_procesada = None
         
+        # Histograma integral de la imagen mostrada y origen del arrastre
+        self.histograma_integral = None
+        self.inicio_region = None
+        
         self.crear_interfaz()
     
     def crear_interfaz(self):
@@ -177,6 +186,11 @@ class InterfazImagenDigital:
         ttk.Button(panel_izquierdo, text="Propiedades del Histograma",
                   command=self.mostrar_propiedades_histograma, width=35).pack(fill=tk.X, padx=10, pady=5)
         
+        self.label_region = ttk.Label(panel_izquierdo,
+                                      text="Arrastra sobre la imagen para inspeccionar una región",
+                                      font=('Arial', 9, 'italic'), wraplength=260, justify=tk.LEFT)
+        self.label_region.pack(fill=tk.X, padx=10, pady=5)
+        
         ttk.Separator(panel_izquierdo, orient='horizontal').pack(fill=tk.X, pady=15)
         
         # Panel derecho - Visualización
@@ -191,6 +205,14 @@ class InterfazImagenDigital:
         self.label_procesada = ttk.Label(self.frame_visualizacion)
         self.frame_histograma = ttk.Frame(self.frame_visualizacion)
         
+        # Inspección de regiones arrastrando sobre la imagen mostrada
+        self.label_procesada.bind('<ButtonPress-1>', self.iniciar_region)
+        self.label_procesada.bind('<B1-Motion>', self.inspeccionar_region)
+        self.visores = {
+            self.label_original: VisorImagen(self.label_original),
+            self.label_procesada: VisorImagen(self.label_procesada)
+        }
+        
         self.actualizar_layout('simple')
     
     def actualizar_layout(self, modo='simple'):
@@ -247,7 +269,7 @@ class InterfazImagenDigital:
         )
         
         if ruta:
-            self.imagen_original = cv2.imread(ruta)
+            self.imagen_original = leer_imagen(ruta)
             if self.imagen_original is None:
                 messagebox.showerror("Error", "No se pudo cargar la imagen")
                 return
@@ -275,25 +297,44 @@ class InterfazImagenDigital:
         if imagen is None:
             return
         
-        # Convertir a RGB para mostrar
-        if len(imagen.shape) == 3:
-            imagen_rgb = cv2.cvtColor(imagen, cv2.COLOR_BGR2RGB)
-        else:
-            imagen_rgb = cv2.cvtColor(imagen, cv2.COLOR_GRAY2RGB)
-        
-        # Redimensionar si es necesario
-        h, w = imagen_rgb.shape[:2]
-        factor = min(tamano_max[0]/w, tamano_max[1]/h)
-        if factor < 1:
-            nuevo_w, nuevo_h = int(w*factor), int(h*factor)
-            imagen_rgb = cv2.resize(imagen_rgb, (nuevo_w, nuevo_h))
-        
-        # Convertir a formato Tkinter
-        imagen_pil = Image.fromarray(imagen_rgb)
-        imagen_tk = ImageTk.PhotoImage(imagen_pil)
-        
-        label.config(image=imagen_tk)
-        label.image = imagen_tk
+        # El visor del label reutiliza su PhotoImage y la pirámide de la imagen
+        self.visores[label].mostrar(imagen, tamano_max)
+    
+    def iniciar_region(self, event):
+        """Fija la esquina inicial de la región a inspeccionar"""
+        if self.visores[self.label_procesada].imagen is None:
+            return
+        self.inicio_region = self.visores[self.label_procesada].a_coordenadas_imagen(event.x, event.y)
+        self.inspeccionar_region(event)
+    
+    def inspeccionar_region(self, event):
+        """Muestra las propiedades del rectángulo arrastrado en tiempo real"""
+        visor = self.visores[self.label_procesada]
+        imagen = visor.imagen
+        if imagen is None or self.inicio_region is None:
+            return
+        
+        # El histograma integral se construye una vez por imagen mostrada
+        if self.histograma_integral is None or self.histograma_integral[0] is not imagen:
+            self.histograma_integral = (imagen, HistogramaIntegral(imagen))
+        integral = self.histograma_integral[1]
+        
+        x0, y0 = self.inicio_region
+        x1, y1 = visor.a_coordenadas_imagen(event.x, event.y)
+        x, y = min(x0, x1), min(y0, y1)
+        ancho, alto = abs(x1 - x0) + 1, abs(y1 - y0) + 1
+        
+        props = integral.propiedades(x, y, ancho, alto)
+        if props is None:
+            self.label_region.config(text="Región fuera de la imagen")
+            return
+        
+        self.label_region.config(text=(
+            f"Región ({max(x, 0)}, {max(y, 0)}) {ancho}x{alto}\n"
+            f"Media: {props['media']:.2f}  Mediana: {props['mediana']}  Moda: {props['moda']}\n"
+            f"Desv. estándar: {props['desviacion_estandar']:.2f}  "
+            f"Rango: {props['minimo']}-{props['maximo']}  Píxeles: {props['total_pixeles']:,}"
+        ))
     
     def convertir_a_grises(self):
         """Convierte la imagen cargada a escala de grises"""
@@ -461,8 +502,11 @@ class InterfazImagenDigital:
         self.imagen_grises = None
         self.imagen_procesada = None
         
-        self.label_original.config(image='')
-        self.label_procesada.config(image='')
+        self.visores[self.label_original].limpiar()
+        self.visores[self.label_procesada].limpiar()
+        self.histograma_integral = None
+        self.inicio_region = None
+        self.label_region.config(text="Arrastra sobre la imagen para inspeccionar una región")
         self.label_umbral_calculado.config(text="")
         
         for widget in self.frame_histograma.winfo_children():
@@ -722,14 +766,19 @@ class InterfazImagenDigital:
             return
         
         try:
-            # Usar grises si existe
+            # Usar grises si existe; si no, grises y canales RGB en una pasada
             if self.imagen_grises is not None:
                 img_grises = self.imagen_grises
+                histogramas = calcular_histogramas(img_grises)
+                nombres = ['Gris']
             else:
                 img_grises = rgb_a_grises(self.imagen_original)
+                histogramas = calcular_histogramas(self.imagen_original)
+                nombres = ['Gris', 'R', 'G', 'B'][:len(histogramas)]
             
-            hist = calcular_histograma(img_grises)
+            hist = histogramas[0]
             props = propiedades_histograma(hist)
+            todas = propiedades_histogramas(histogramas)
             
             if props is None:
                 messagebox.showerror("Error", "No se pudieron calcular las propiedades")
@@ -760,26 +809,32 @@ class InterfazImagenDigital:
             frame_props = ttk.LabelFrame(frame_sup, text="Propiedades Estadísticas", padding=10)
             frame_props.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(5, 0))
             
-            # Crear tabla
-            columns = ('Propiedad', 'Valor')
+            # Crear tabla con una columna por histograma
+            columns = ('Propiedad',) + tuple(nombres)
             tree = ttk.Treeview(frame_props, columns=columns, show='headings', height=10)
             
             tree.heading('Propiedad', text='Propiedad')
-            tree.heading('Valor', text='Valor')
-            
-            tree.column('Propiedad', width=200)
-            tree.column('Valor', width=150)
+            tree.column('Propiedad', width=160)
+            for nombre in nombres:
+                tree.heading(nombre, text=nombre)
+                tree.column(nombre, width=max(70, 150 // len(nombres)))
             
             # Insertar datos
-            tree.insert('', tk.END, values=('Media', f"{props['media']:.2f}"))
-            tree.insert('', tk.END, values=('Mediana', f"{props['mediana']}"))
-            tree.insert('', tk.END, values=('Moda', f"{props['moda']}"))
-            tree.insert('', tk.END, values=('Varianza', f"{props['varianza']:.2f}"))
-            tree.insert('', tk.END, values=('Desviación Estándar', f"{props['desviacion_estandar']:.2f}"))
-            tree.insert('', tk.END, values=('Valor Mínimo', f"{props['minimo']}"))
-            tree.insert('', tk.END, values=('Valor Máximo', f"{props['maximo']}"))
-            tree.insert('', tk.END, values=('Rango', f"{props['rango']}"))
-            tree.insert('', tk.END, values=('Total Píxeles', f"{props['total_pixeles']:,}"))
+            filas = [
+                ('Media', 'media', "{:.2f}"),
+                ('Mediana', 'mediana', "{}"),
+                ('Moda', 'moda', "{}"),
+                ('Varianza', 'varianza', "{:.2f}"),
+                ('Desviación Estándar', 'desviacion_estandar', "{:.2f}"),
+                ('Valor Mínimo', 'minimo', "{}"),
+                ('Valor Máximo', 'maximo', "{}"),
+                ('Rango', 'rango', "{}"),
+                ('Total Píxeles', 'total_pixeles', "{:,}")
+            ]
+            for etiqueta, clave, formato in filas:
+                tree.insert('', tk.END, values=(etiqueta,) + tuple(
+                    formato.format(valor.item()) for valor in todas[clave]
+                ))
             
             tree.pack(fill=tk.BOTH, expand=True)
             
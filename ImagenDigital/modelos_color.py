@@ -0,0 +1,222 @@
+"""
+Conversiones entre modelos de color (CMY, YIQ y HSI) con sus inversas
+Las conversiones trabajan sobre imágenes BGR de OpenCV en una sola pasada
+por píxel siempre que es posible
+"""
+
+import cv2
+import numpy as np
+
+
+# ===================================================================
+# CONSTANTES
+# ===================================================================
+
+# Matriz RGB -> YIQ (filas Y, I, Q; columnas R, G, B)
+MATRIZ_RGB_A_YIQ = np.array([
+    [0.299, 0.587, 0.114],
+    [0.596, -0.275, -0.321],
+    [0.212, -0.523, 0.311]
+], dtype=np.float64)
+
+# Misma matriz con las columnas en el orden B, G, R de OpenCV
+_MATRIZ_BGR_A_YIQ = MATRIZ_RGB_A_YIQ[:, ::-1]
+_MATRIZ_YIQ_A_BGR = np.linalg.inv(_MATRIZ_BGR_A_YIQ)
+
+# Codificación de I y Q en [0, 255]: (valor + desplazamiento) * escala
+_DESPLAZAMIENTO_YIQ = np.array([0.0, 151.9, 133.3])
+_ESCALA_YIQ = np.array([1.0, 255 / 303.8, 255 / 266.6])
+
+# Transformaciones afines 3x4 para codificar y decodificar en una pasada
+_AFIN_BGR_A_YIQ = np.hstack([
+    _ESCALA_YIQ[:, None] * _MATRIZ_BGR_A_YIQ,
+    (_ESCALA_YIQ * _DESPLAZAMIENTO_YIQ)[:, None]
+])
+_AFIN_YIQ_A_BGR = np.hstack([
+    np.linalg.inv(_AFIN_BGR_A_YIQ[:, :3]),
+    -(np.linalg.inv(_AFIN_BGR_A_YIQ[:, :3]) @ _AFIN_BGR_A_YIQ[:, 3])[:, None]
+])
+
+_DOS_PI = np.float32(2 * np.pi)
+_TERCIO = np.float32(2 * np.pi / 3)
+
+
+def _validar_color(imagen):
+    """Verifica que la imagen tenga 3 canales"""
+    if len(imagen.shape) != 3 or imagen.shape[2] != 3:
+        raise ValueError("La imagen debe ser a color")
+
+
+def _a_uint8(imagen, escala=1.0):
+    """Redondea y satura una imagen flotante (imagen * escala) a uint8"""
+    resultado = np.multiply(imagen, np.float32(escala), dtype=np.float32)
+    np.clip(resultado, 0, 255, out=resultado)
+    resultado += 0.5
+    return resultado.astype(np.uint8)
+
+
+# ===================================================================
+# CMY
+# ===================================================================
+
+def bgr_a_cmy(imagen, dst=None):
+    """
+    Convierte BGR a CMY (canales C, M, Y)
+    CMY = 255 - RGB, calculado con un bitwise_not en el propio destino
+    
+    Args:
+        imagen: Imagen BGR uint8
+        dst: Arreglo de salida opcional (puede ser la propia imagen)
+    
+    Returns:
+        Imagen CMY uint8
+    """
+    _validar_color(imagen)
+    dst = cv2.cvtColor(imagen, cv2.COLOR_BGR2RGB, dst=dst)
+    return cv2.bitwise_not(dst, dst=dst)
+
+
+def cmy_a_bgr(imagen_cmy, dst=None):
+    """
+    Convierte CMY (canales C, M, Y) de vuelta a BGR
+    
+    Args:
+        imagen_cmy: Imagen CMY uint8
+        dst: Arreglo de salida opcional (puede ser la propia imagen)
+    
+    Returns:
+        Imagen BGR uint8
+    """
+    _validar_color(imagen_cmy)
+    dst = cv2.bitwise_not(imagen_cmy, dst=dst)
+    return cv2.cvtColor(dst, cv2.COLOR_RGB2BGR, dst=dst)
+
+
+# ===================================================================
+# YIQ
+# ===================================================================
+
+def bgr_a_yiq(imagen, normalizar=True):
+    """
+    Convierte BGR a YIQ con una sola pasada de cv2.transform
+    
+    Args:
+        imagen: Imagen BGR uint8
+        normalizar: True para obtener uint8 con I y Q llevados a [0, 255];
+                    False para obtener float32 con Y en [0, 255] e I, Q con signo
+    
+    Returns:
+        Imagen YIQ (canales Y, I, Q)
+    """
+    _validar_color(imagen)
+    if normalizar:
+        # La transformación afín incluye la codificación de I y Q y la
+        # salida uint8 se redondea y satura
+        return cv2.transform(imagen, _AFIN_BGR_A_YIQ)
+    return cv2.transform(imagen.astype(np.float32), _MATRIZ_BGR_A_YIQ)
+
+
+def yiq_a_bgr(imagen_yiq):
+    """
+    Convierte YIQ de vuelta a BGR
+    
+    Args:
+        imagen_yiq: Resultado de bgr_a_yiq (uint8 normalizado o float32)
+    
+    Returns:
+        Imagen BGR uint8
+    """
+    _validar_color(imagen_yiq)
+    if imagen_yiq.dtype == np.uint8:
+        return cv2.transform(imagen_yiq, _AFIN_YIQ_A_BGR)
+    return _a_uint8(cv2.transform(imagen_yiq.astype(np.float32, copy=False), _MATRIZ_YIQ_A_BGR))
+
+
+# ===================================================================
+# HSI
+# ===================================================================
+
+def bgr_a_hsi(imagen, normalizar=True):
+    """
+    Convierte BGR a HSI (Hue, Saturation, Intensity)
+    
+    I = (R + G + B) / 3, S = 1 - min(R, G, B) / I y H es el ángulo del
+    vector de crominancia, calculado como atan2(sqrt(3)(G - B), 2R - G - B),
+    que equivale a la fórmula clásica con arccos sin su caso especial B > G.
+    
+    Args:
+        imagen: Imagen BGR uint8
+        normalizar: True para obtener uint8 con los tres canales en [0, 255];
+                    False para obtener float32 con H en radianes [0, 2π) y
+                    S, I en [0, 1]
+    
+    Returns:
+        Imagen HSI (canales H, S, I)
+    """
+    _validar_color(imagen)
+    
+    # Con los planos uint8 las sumas y restas son exactas: un gris puro
+    # da x = y = 0 y cv2.phase le asigna matiz 0
+    b, g, r = cv2.split(imagen)
+    suma = cv2.add(cv2.add(b, g, dtype=cv2.CV_32F), r, dtype=cv2.CV_32F)
+    x = cv2.add(cv2.subtract(r, g, dtype=cv2.CV_32F), cv2.subtract(r, b, dtype=cv2.CV_32F))
+    y = cv2.subtract(g, b, dtype=cv2.CV_32F)
+    y *= np.float32(np.sqrt(3.0))
+    minimo = cv2.min(cv2.min(b, g), r)
+    
+    # S = (suma - 3 min) / suma; OpenCV deja 0/0 en NaN, que se anula después
+    saturacion = cv2.scaleAdd(minimo.astype(np.float32), -3.0, suma)
+    cv2.divide(saturacion, suma, dst=saturacion)
+    saturacion[suma == 0] = 0
+    
+    matiz = cv2.phase(x, y)
+    
+    if normalizar:
+        return cv2.merge([
+            cv2.convertScaleAbs(matiz, alpha=255 / (2 * np.pi)),
+            cv2.convertScaleAbs(saturacion, alpha=255),
+            cv2.convertScaleAbs(suma, alpha=1 / 3)
+        ])
+    return cv2.merge([matiz, saturacion, suma * np.float32(1 / 765)])
+
+
+def hsi_a_bgr(imagen_hsi):
+    """
+    Convierte HSI de vuelta a BGR con las fórmulas por sector de 120°
+    
+    Args:
+        imagen_hsi: Resultado de bgr_a_hsi (uint8 normalizado o float32 con
+                    H en [0, 2π])
+    
+    Returns:
+        Imagen BGR uint8
+    """
+    _validar_color(imagen_hsi)
+    matiz, saturacion, intensidad = cv2.split(imagen_hsi.astype(np.float32, copy=False))
+    if imagen_hsi.dtype == np.uint8:
+        matiz *= _DOS_PI / 255
+        saturacion *= np.float32(1 / 255)
+        intensidad *= np.float32(1 / 255)
+    
+    # Máscaras de los sectores 1 (H >= 120°) y 2 (H >= 240°) y ángulo
+    # relativo al inicio de cada sector
+    sector_1 = cv2.compare(matiz, float(_TERCIO), cv2.CMP_GE)
+    sector_2 = cv2.compare(matiz, float(2 * _TERCIO), cv2.CMP_GE)
+    angulo = matiz
+    cv2.subtract(angulo, float(_TERCIO), dst=angulo, mask=sector_1)
+    cv2.subtract(angulo, float(_TERCIO), dst=angulo, mask=sector_2)
+    
+    # Dentro de cada sector: mínimo, componente del sector y la restante
+    a = intensidad * (1 - saturacion)
+    b = intensidad * (1 + saturacion * np.cos(angulo) / np.cos(np.float32(np.pi / 3) - angulo))
+    c = 3 * intensidad - (a + b)
+    
+    # Sector 0: (R, G, B) = (b, c, a); 1: (a, b, c); 2: (c, a, b)
+    canales = []
+    for base, en_1, en_2 in ((a, c, b), (c, b, a), (b, a, c)):
+        canal = base.copy()
+        cv2.copyTo(en_1, sector_1, canal)
+        cv2.copyTo(en_2, sector_2, canal)
+        canales.append(canal)
+    
+    return _a_uint8(cv2.merge(canales), 255)
@@ -4,30 +4,242 @@ Incluye conversión a escala de grises, binarización, separación de canales,
 conversiones entre modelos de color y análisis de histogramas
 """
 
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
 import cv2
 import numpy as np
 from typing import Tuple, Dict, List
 
+try:
+    from .modelos_color import bgr_a_cmy, bgr_a_yiq, bgr_a_hsi
+except ImportError:
+    from modelos_color import bgr_a_cmy, bgr_a_yiq, bgr_a_hsi
+
 
 # ===================================================================
 # 1.4 LECTURA Y OBTENCIÓN DE IMÁGENES
 # ===================================================================
 
-def leer_imagen(ruta: str, modo='color'):
+# Factores de decodificación reducida de OpenCV (solo JPEG decodifica
+# realmente a menor escala; otros formatos se reducen tras decodificar)
+_BANDERAS_LECTURA = {
+    ('color', 1): cv2.IMREAD_COLOR,
+    ('color', 2): cv2.IMREAD_REDUCED_COLOR_2,
+    ('color', 4): cv2.IMREAD_REDUCED_COLOR_4,
+    ('color', 8): cv2.IMREAD_REDUCED_COLOR_8,
+    ('grises', 1): cv2.IMREAD_GRAYSCALE,
+    ('grises', 2): cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    ('grises', 4): cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    ('grises', 8): cv2.IMREAD_REDUCED_GRAYSCALE_8,
+    # Profundidad y canales del archivo (16 bits, flotantes), sin reducción
+    ('original', 1): cv2.IMREAD_ANYDEPTH | cv2.IMREAD_ANYCOLOR
+}
+
+# Directorio por defecto de las miniaturas en disco
+DIRECTORIO_MINIATURAS = os.path.join(tempfile.gettempdir(), 'imageanalysis_miniaturas')
+
+
+class CacheImagenes:
+    """
+    Caché LRU en memoria de imágenes decodificadas con presupuesto en bytes
+    
+    Las claves incluyen la fecha de modificación y el tamaño del archivo,
+    así que una imagen modificada en disco nunca se sirve desde la caché.
+    """
+    
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        """
+        Args:
+            max_bytes: Bytes máximos que pueden ocupar las imágenes guardadas
+        """
+        self.max_bytes = max_bytes
+        self.bytes_usados = 0
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._entradas)
+    
+    def limpiar(self):
+        """Elimina todas las imágenes guardadas"""
+        with self._lock:
+            self._entradas.clear()
+            self.bytes_usados = 0
+    
+    def obtener(self, clave):
+        """Imagen guardada con la clave (o None) y la marca como reciente"""
+        with self._lock:
+            imagen = self._entradas.get(clave)
+            if imagen is not None:
+                self._entradas.move_to_end(clave)
+            return imagen
+    
+    def guardar(self, clave, imagen):
+        """Guarda una imagen (solo lectura) desalojando las menos recientes"""
+        if imagen.nbytes > self.max_bytes:
+            return
+        imagen.setflags(write=False)
+        with self._lock:
+            anterior = self._entradas.pop(clave, None)
+            if anterior is not None:
+                self.bytes_usados -= anterior.nbytes
+            self._entradas[clave] = imagen
+            self.bytes_usados += imagen.nbytes
+            while self.bytes_usados > self.max_bytes:
+                _, desalojada = self._entradas.popitem(last=False)
+                self.bytes_usados -= desalojada.nbytes
+
+
+_cache_imagenes = CacheImagenes()
+
+
+def configurar_cache_imagenes(max_bytes):
+    """Cambia el presupuesto en bytes de la caché de imágenes en memoria"""
+    _cache_imagenes.max_bytes = max_bytes
+    with _cache_imagenes._lock:
+        while _cache_imagenes.bytes_usados > max_bytes and _cache_imagenes._entradas:
+            _, desalojada = _cache_imagenes._entradas.popitem(last=False)
+            _cache_imagenes.bytes_usados -= desalojada.nbytes
+
+
+def limpiar_cache_imagenes():
+    """Vacía la caché de imágenes en memoria"""
+    _cache_imagenes.limpiar()
+
+
+def _firma_archivo(ruta):
+    """(ruta absoluta, mtime en ns, tamaño) o None si el archivo no existe"""
+    try:
+        estado = os.stat(ruta)
+    except OSError:
+        return None
+    return (os.path.abspath(ruta), estado.st_mtime_ns, estado.st_size)
+
+
+def leer_imagen(ruta: str, modo='color', reduccion=1, usar_cache=True):
     """
     Lee una imagen desde archivo
     
     Args:
         ruta: Ruta del archivo de imagen
-        modo: 'color' para BGR, 'grises' para escala de grises
+        modo: 'color' para BGR, 'grises' para escala de grises, 'original'
+              para conservar la profundidad y los canales del archivo
+        reduccion: Factor de reducción al decodificar (1, 2, 4 u 8); en JPEG
+                   la decodificación reducida es mucho más rápida
+        usar_cache: Reutilizar la imagen si ya se decodificó y el archivo
+                    no cambió
     
     Returns:
         Imagen cargada o None si hay error
     """
-    if modo == 'grises':
-        return cv2.imread(ruta, cv2.IMREAD_GRAYSCALE)
-    else:
-        return cv2.imread(ruta, cv2.IMREAD_COLOR)
+    if modo not in ('grises', 'original'):
+        modo = 'color'
+    if (modo, reduccion) not in _BANDERAS_LECTURA:
+        raise ValueError(f"Factor de reducción no soportado: {reduccion}")
+    
+    firma = _firma_archivo(ruta) if usar_cache else None
+    if firma is not None:
+        clave = firma + (modo, reduccion)
+        imagen = _cache_imagenes.obtener(clave)
+        if imagen is not None:
+            # Copia para que el llamador pueda modificarla sin tocar la caché
+            return imagen.copy()
+    
+    imagen = cv2.imread(ruta, _BANDERAS_LECTURA[(modo, reduccion)])
+    if imagen is not None and firma is not None:
+        _cache_imagenes.guardar(clave, imagen.copy())
+    return imagen
+
+
+def _ruta_miniatura(firma, modo, tamaño_max, directorio):
+    """Ruta en disco de la miniatura de un archivo con la firma dada"""
+    texto = f"{firma[0]}|{firma[1]}|{firma[2]}|{modo}|{tamaño_max}"
+    nombre = hashlib.blake2b(texto.encode('utf-8'), digest_size=16).hexdigest()
+    return os.path.join(directorio, nombre + '.png')
+
+
+def leer_miniatura(ruta: str, tamaño_max=256, modo='color', directorio_cache=None):
+    """
+    Lee una versión reducida de una imagen para vistas previas
+    
+    La imagen se decodifica con el mayor factor de reducción que conserve
+    al menos tamaño_max píxeles en el lado mayor, se ajusta con INTER_AREA
+    y se guarda en disco con un nombre derivado de la ruta, la fecha de
+    modificación y el tamaño del archivo; las siguientes lecturas (también
+    desde otros procesos) solo decodifican la miniatura.
+    
+    Args:
+        ruta: Ruta del archivo de imagen
+        tamaño_max: Lado mayor de la miniatura en píxeles
+        modo: 'color' para BGR, 'grises' para escala de grises
+        directorio_cache: Directorio de miniaturas (None = DIRECTORIO_MINIATURAS,
+                          False = no usar caché en disco)
+    
+    Returns:
+        Miniatura o None si hay error
+    """
+    if modo != 'grises':
+        modo = 'color'
+    firma = _firma_archivo(ruta)
+    if firma is None:
+        return None
+    
+    clave = firma + (modo, 'miniatura', tamaño_max)
+    miniatura = _cache_imagenes.obtener(clave)
+    if miniatura is not None:
+        return miniatura.copy()
+    
+    if directorio_cache is None:
+        directorio_cache = DIRECTORIO_MINIATURAS
+    ruta_miniatura = None
+    if directorio_cache:
+        ruta_miniatura = _ruta_miniatura(firma, modo, tamaño_max, directorio_cache)
+        if os.path.exists(ruta_miniatura):
+            miniatura = cv2.imread(ruta_miniatura, _BANDERAS_LECTURA[(modo, 1)])
+    
+    if miniatura is None:
+        # La reducción de 8 deja suficiente resolución en casi cualquier foto;
+        # si no alcanza, su tamaño da el del original (lado ≈ lado_8 * 8) y
+        # basta una segunda decodificación con el factor adecuado
+        imagen = cv2.imread(ruta, _BANDERAS_LECTURA[(modo, 8)])
+        if imagen is None:
+            return None
+        if max(imagen.shape[:2]) < tamaño_max:
+            # Cota inferior del lado original: el decodificador redondea hacia arriba
+            lado_original = max(imagen.shape[:2]) * 8 - 7
+            reduccion = next(r for r in (4, 2, 1) if r == 1 or lado_original / r >= tamaño_max)
+            imagen = cv2.imread(ruta, _BANDERAS_LECTURA[(modo, reduccion)])
+            if imagen is None:
+                return None
+        
+        h, w = imagen.shape[:2]
+        factor = tamaño_max / max(h, w)
+        if factor < 1:
+            imagen = cv2.resize(imagen, (max(1, round(w * factor)), max(1, round(h * factor))),
+                                interpolation=cv2.INTER_AREA)
+        miniatura = imagen
+        
+        if ruta_miniatura is not None:
+            try:
+                os.makedirs(directorio_cache, exist_ok=True)
+                # Escritura atómica: otro proceso nunca ve una miniatura a medias
+                temporal = f"{ruta_miniatura}.{os.getpid()}.{threading.get_ident()}.png"
+                try:
+                    if cv2.imwrite(temporal, miniatura):
+                        os.replace(temporal, ruta_miniatura)
+                finally:
+                    # Tras un fallo no debe quedar el temporal en el directorio
+                    if os.path.exists(temporal):
+                        os.remove(temporal)
+            except (OSError, cv2.error):
+                pass
+    
+    _cache_imagenes.guardar(clave, miniatura.copy())
+    return miniatura
 
 
 def obtener_propiedades_pixel(imagen, x, y):
@@ -206,20 +418,7 @@ def rgb_a_cmy(imagen):
     Returns:
         Imagen CMY (3 canales)
     """
-    if len(imagen.shape) != 3:
-        raise ValueError("La imagen debe ser a color")
-    
-    # Convertir BGR a RGB
-    imagen_rgb = cv2.cvtColor(imagen, cv2.COLOR_BGR2RGB)
-    
-    # Normalizar a [0, 1]
-    imagen_norm = imagen_rgb.astype(np.float32) / 255.0
-    
-    # Aplicar transformación CMY
-    imagen_cmy = 1.0 - imagen_norm
-    
-    # Volver a [0, 255]
-    return (imagen_cmy * 255).astype(np.uint8)
+    return bgr_a_cmy(imagen)
 
 
 def rgb_a_yiq(imagen):
@@ -231,25 +430,9 @@ def rgb_a_yiq(imagen):
         imagen: Imagen BGR
     
     Returns:
-        Imagen YIQ (3 canales)
+        Imagen YIQ (3 canales, I y Q normalizados a 0-255)
     """
-    if len(imagen.shape) != 3:
-        raise ValueError("La imagen debe ser a color")
-    
-    # Convertir BGR a RGB
-    b, g, r = cv2.split(imagen)
-    
-    # Matriz de transformación RGB a YIQ
-    y = 0.299 * r + 0.587 * g + 0.114 * b
-    i = 0.596 * r - 0.275 * g - 0.321 * b
-    q = 0.212 * r - 0.523 * g + 0.311 * b
-    
-    # Normalizar I y Q al rango [0, 255]
-    i = ((i + 151.9) * 255 / 303.8).clip(0, 255).astype(np.uint8)
-    q = ((q + 133.3) * 255 / 266.6).clip(0, 255).astype(np.uint8)
-    y = y.astype(np.uint8)
-    
-    return cv2.merge([y, i, q])
+    return bgr_a_yiq(imagen)
 
 
 def rgb_a_hsi(imagen):
@@ -262,33 +445,7 @@ def rgb_a_hsi(imagen):
     Returns:
         Imagen HSI (3 canales, valores normalizados a 0-255)
     """
-    if len(imagen.shape) != 3:
-        raise ValueError("La imagen debe ser a color")
-    
-    # Convertir a HSV primero (OpenCV lo maneja bien)
-    imagen_hsv = cv2.cvtColor(imagen, cv2.COLOR_BGR2HSV)
-    
-    # En HSV: H está en [0, 179], S y V en [0, 255]
-    # Para HSI necesitamos ajustar
-    h, s, v = cv2.split(imagen_hsv)
-    
-    # Convertir BGR a RGB normalizado
-    imagen_rgb = cv2.cvtColor(imagen, cv2.COLOR_BGR2RGB).astype(np.float32) / 255.0
-    r, g, b = cv2.split(imagen_rgb)
-    
-    # Calcular Intensity
-    i = (r + g + b) / 3.0
-    
-    # Usar H y S de HSV pero ajustados
-    h_rad = h.astype(np.float32) * 2 * np.pi / 179.0  # Convertir a radianes
-    s_norm = s.astype(np.float32) / 255.0
-    
-    # Volver a escala 0-255 para visualización
-    h_out = (h.astype(np.float32) * 255 / 179).astype(np.uint8)
-    s_out = s
-    i_out = (i * 255).astype(np.uint8)
-    
-    return cv2.merge([h_out, s_out, i_out])
+    return bgr_a_hsi(imagen)
 
 
 def rgb_a_hsv(imagen):
@@ -311,6 +468,64 @@ def rgb_a_hsv(imagen):
 # ANÁLISIS DE HISTOGRAMAS
 # ===================================================================
 
+# Orden de las filas de calcular_histogramas para imágenes a color
+CANALES_HISTOGRAMA = ('gris', 'R', 'G', 'B')
+
+
+def calcular_histogramas(imagen, incluir_gris=True):
+    """
+    Calcula en una sola llamada el histograma de grises y los de cada canal
+    
+    Cada canal se cuenta con cv2.calcHist directamente sobre la imagen
+    intercalada (sin copias de cv2.split); el de grises requiere la
+    conversión con cv2.cvtColor.
+    
+    Args:
+        imagen: Imagen BGR o en escala de grises
+        incluir_gris: Incluir la fila de grises en imágenes a color
+    
+    Returns:
+        Array float32 (C, 256) con filas en el orden de CANALES_HISTOGRAMA
+        (sin 'gris' si incluir_gris=False); una sola fila para imágenes en grises
+    """
+    if len(imagen.shape) == 2:
+        return cv2.calcHist([imagen], [0], None, [256], [0, 256]).reshape(1, 256)
+    
+    histogramas = np.empty((4 if incluir_gris else 3, 256), dtype=np.float32)
+    fila = 0
+    if incluir_gris:
+        gris = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+        histogramas[0] = cv2.calcHist([gris], [0], None, [256], [0, 256]).ravel()
+        fila = 1
+    # OpenCV usa BGR: R, G, B son los canales 2, 1, 0
+    for desplazamiento, canal in enumerate((2, 1, 0)):
+        histogramas[fila + desplazamiento] = cv2.calcHist([imagen], [canal], None, [256], [0, 256]).ravel()
+    return histogramas
+
+
+def calcular_histogramas_archivos(rutas, reduccion=1):
+    """
+    Histogramas de grises y RGB de una lista de archivos
+    
+    Las imágenes se leen sin pasar por la caché en memoria para no
+    desalojar las imágenes abiertas en la interfaz.
+    
+    Args:
+        rutas: Lista de rutas de imágenes
+        reduccion: Factor de reducción al decodificar (ver leer_imagen)
+    
+    Returns:
+        Array float32 (N, 4, 256) con las filas de CANALES_HISTOGRAMA
+    """
+    histogramas = np.empty((len(rutas), 4, 256), dtype=np.float32)
+    for i, ruta in enumerate(rutas):
+        imagen = leer_imagen(ruta, reduccion=reduccion, usar_cache=False)
+        if imagen is None:
+            raise ValueError(f"No se pudo leer la imagen: {ruta}")
+        histogramas[i] = calcular_histogramas(imagen)
+    return histogramas
+
+
 def calcular_histograma(imagen):
     """
     Calcula el histograma de intensidad de una imagen
@@ -342,20 +557,65 @@ def calcular_histogramas_rgb(imagen):
     if len(imagen.shape) != 3:
         raise ValueError("La imagen debe ser a color")
     
-    # OpenCV usa BGR
-    b, g, r = cv2.split(imagen)
-    
-    hist_r = cv2.calcHist([r], [0], None, [256], [0, 256]).flatten()
-    hist_g = cv2.calcHist([g], [0], None, [256], [0, 256]).flatten()
-    hist_b = cv2.calcHist([b], [0], None, [256], [0, 256]).flatten()
+    histogramas = calcular_histogramas(imagen, incluir_gris=False)
     
     return {
-        'R': hist_r,
-        'G': hist_g,
-        'B': hist_b
+        'R': histogramas[0],
+        'G': histogramas[1],
+        'B': histogramas[2]
     }
 
 
+def propiedades_histogramas(histogramas):
+    """
+    Calcula las propiedades estadísticas de muchos histogramas a la vez
+    
+    Args:
+        histogramas: Array (..., bins), p. ej. (C, 256) de calcular_histogramas
+                     o (N, 4, 256) de calcular_histogramas_archivos
+    
+    Returns:
+        Diccionario con las mismas claves que propiedades_histograma, cada
+        una con un array de la forma de los ejes iniciales; los histogramas
+        vacíos tienen media, varianza y desviación NaN y 'validos' en False
+    """
+    histogramas = np.asarray(histogramas, dtype=np.float64)
+    forma = histogramas.shape[:-1]
+    h = histogramas.reshape(-1, histogramas.shape[-1])
+    bins = h.shape[1]
+    valores = np.arange(bins, dtype=np.float64)
+    
+    total = h.sum(axis=1)
+    validos = total > 0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = (h @ valores) / total
+        varianza = (h * (valores - media[:, None]) ** 2).sum(axis=1) / total
+    
+    # Mediana: primer bin cuyo acumulado alcanza la mitad del total
+    acumulado = np.cumsum(h, axis=1)
+    mediana = np.argmax(acumulado >= (total / 2)[:, None], axis=1)
+    moda = np.argmax(h, axis=1)
+    
+    no_cero = h > 0
+    minimo = np.where(validos, np.argmax(no_cero, axis=1), 0)
+    maximo = np.where(validos, bins - 1 - np.argmax(no_cero[:, ::-1], axis=1), 0)
+    mediana = np.where(validos, mediana, 0)
+    
+    propiedades = {
+        'media': media,
+        'mediana': mediana,
+        'moda': moda,
+        'varianza': varianza,
+        'desviacion_estandar': np.sqrt(varianza),
+        'minimo': minimo,
+        'maximo': maximo,
+        'rango': maximo - minimo,
+        'total_pixeles': total.astype(np.int64),
+        'validos': validos
+    }
+    return {clave: valor.reshape(forma) for clave, valor in propiedades.items()}
+
+
 def propiedades_histograma(histograma):
     """
     Calcula propiedades estadísticas del histograma
@@ -366,44 +626,18 @@ def propiedades_histograma(histograma):
     Returns:
         Diccionario con propiedades: media, mediana, moda, varianza, desviación estándar
     """
-    # Crear array de valores de intensidad
-    valores = np.arange(256)
-    
-    # Calcular media ponderada
-    total_pixels = np.sum(histograma)
-    if total_pixels == 0:
+    propiedades = propiedades_histogramas(np.ravel(histograma)[None, :])
+    if not propiedades['validos'][0]:
         return None
     
-    media = np.sum(valores * histograma) / total_pixels
-    
-    # Calcular varianza y desviación estándar
-    varianza = np.sum(((valores - media) ** 2) * histograma) / total_pixels
-    desviacion = np.sqrt(varianza)
-    
-    # Moda (valor más frecuente)
-    moda = np.argmax(histograma)
-    
-    # Mediana (valor acumulado hasta 50%)
-    hist_acumulado = np.cumsum(histograma)
-    mediana = np.where(hist_acumulado >= total_pixels / 2)[0][0]
-    
-    # Rango
-    valores_no_cero = np.where(histograma > 0)[0]
-    if len(valores_no_cero) > 0:
-        minimo = valores_no_cero[0]
-        maximo = valores_no_cero[-1]
-        rango = maximo - minimo
-    else:
-        minimo = maximo = rango = 0
-    
     return {
-        'media': float(media),
-        'mediana': int(mediana),
-        'moda': int(moda),
-        'varianza': float(varianza),
-        'desviacion_estandar': float(desviacion),
-        'minimo': int(minimo),
-        'maximo': int(maximo),
-        'rango': int(rango),
-        'total_pixeles': int(total_pixels)
+        'media': float(propiedades['media'][0]),
+        'mediana': int(propiedades['mediana'][0]),
+        'moda': int(propiedades['moda'][0]),
+        'varianza': float(propiedades['varianza'][0]),
+        'desviacion_estandar': float(propiedades['desviacion_estandar'][0]),
+        'minimo': int(propiedades['minimo'][0]),
+        'maximo': int(propiedades['maximo'][0]),
+        'rango': int(propiedades['rango'][0]),
+        'total_pixeles': int(propiedades['total_pixeles'][0])
     }
@@ -0,0 +1,290 @@
+"""
+Visualización de imágenes en widgets de Tkinter
+Mantiene una pirámide de resoluciones por imagen mostrada, convierte solo
+la región visible y reutiliza el PhotoImage del widget
+"""
+
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+import tkinter as tk
+from PIL import Image, ImageTk
+
+
+class PiramideImagen:
+    """
+    Pirámide de resoluciones de una imagen (cada nivel mide la mitad del anterior)
+    
+    Los niveles se construyen bajo demanda con INTER_AREA a partir del
+    nivel anterior, así que mostrar una imagen grande en una ventana
+    pequeña recorre la imagen completa una sola vez.
+    """
+    
+    def __init__(self, imagen):
+        self.niveles = [imagen]
+    
+    @property
+    def nbytes(self):
+        return sum(nivel.nbytes for nivel in self.niveles)
+    
+    def nivel(self, k):
+        """Nivel k (0 = original), construyendo los que falten"""
+        while len(self.niveles) <= k:
+            anterior = self.niveles[-1]
+            alto, ancho = anterior.shape[:2]
+            if alto < 2 or ancho < 2:
+                break
+            self.niveles.append(cv2.resize(anterior, ((ancho + 1) // 2, (alto + 1) // 2),
+                                           interpolation=cv2.INTER_AREA))
+        return self.niveles[min(k, len(self.niveles) - 1)]
+    
+    @staticmethod
+    def nivel_para_escala(escala):
+        """Nivel más pequeño que aún tiene al menos la resolución pedida"""
+        if escala >= 1:
+            return 0
+        return max(0, int(math.floor(math.log2(1 / escala))))
+
+
+# Memoria máxima de la caché de pirámides (imágenes originales incluidas)
+MEMORIA_PIRAMIDES = 256 * 1024 * 1024
+
+# Lado de la muestra de píxeles usada para detectar cambios en su lugar
+_LADO_MUESTRA = 32
+
+
+def _huella(imagen):
+    """
+    Huella barata del contenido: forma, tipo y una rejilla de ~32x32 píxeles
+    
+    Detecta un arreglo rellenado con otro cuadro sin recorrerlo completo;
+    los cambios que no toquen la rejilla requieren invalidar_piramide.
+    """
+    paso_y = max(1, imagen.shape[0] // _LADO_MUESTRA)
+    paso_x = max(1, imagen.shape[1] // _LADO_MUESTRA)
+    muestra = np.ascontiguousarray(imagen[::paso_y, ::paso_x])
+    return imagen.shape, imagen.dtype.str, hashlib.blake2b(muestra.data, digest_size=8).digest()
+
+
+class CachePiramides:
+    """
+    Caché LRU de pirámides por identidad de la imagen mostrada
+    
+    Cada entrada guarda una huella del contenido que se comprueba al
+    reutilizarla, y la caché se acota por bytes (original más niveles).
+    """
+    
+    def __init__(self, memoria_max=MEMORIA_PIRAMIDES):
+        self.memoria_max = memoria_max
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @property
+    def nbytes(self):
+        """Memoria ocupada por las pirámides guardadas"""
+        with self._lock:
+            return sum(piramide.nbytes for _, _, piramide in self._entradas.values())
+    
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+    
+    def invalidar(self, imagen):
+        """Descarta la pirámide de una imagen modificada en su lugar"""
+        with self._lock:
+            self._entradas.pop(id(imagen), None)
+    
+    def obtener(self, imagen):
+        """Pirámide de la imagen (nueva si no estaba guardada o cambió)"""
+        clave = id(imagen)
+        huella = _huella(imagen)
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            # La referencia guardada evita que otro arreglo reutilice el id
+            if entrada is not None and entrada[0] is imagen and entrada[1] == huella:
+                self._entradas.move_to_end(clave)
+                return entrada[2]
+            piramide = PiramideImagen(imagen)
+            self._entradas[clave] = (imagen, huella, piramide)
+            self._entradas.move_to_end(clave)
+            # Los niveles crecen bajo demanda: el tamaño se revisa en cada acceso
+            total = sum(p.nbytes for _, _, p in self._entradas.values())
+            while total > self.memoria_max and len(self._entradas) > 1:
+                _, (_, _, descartada) = self._entradas.popitem(last=False)
+                total -= descartada.nbytes
+            return piramide
+
+
+_cache_piramides = CachePiramides()
+
+
+def invalidar_piramide(imagen):
+    """Indica que una imagen ya mostrada se modificó en su lugar"""
+    _cache_piramides.invalidar(imagen)
+
+
+def limpiar_cache_piramides():
+    """Vacía la caché de pirámides"""
+    _cache_piramides.limpiar()
+
+
+def renderizar_vista(imagen, ancho_max, alto_max, region=None):
+    """
+    Región de una imagen ajustada a un tamaño máximo y convertida a RGB
+    
+    Args:
+        imagen: Imagen uint8 en grises, BGR o BGRA
+        ancho_max, alto_max: Tamaño máximo de la vista en píxeles
+        region: Rectángulo visible (x, y, ancho, alto) en coordenadas de la
+                imagen; None = imagen completa
+    
+    Returns:
+        Tupla (vista_rgb, factor) donde factor son píxeles de vista por píxel
+        de imagen
+    """
+    alto_img, ancho_img = imagen.shape[:2]
+    x, y, ancho, alto = region if region is not None else (0, 0, ancho_img, alto_img)
+    x = min(max(0, int(x)), ancho_img - 1)
+    y = min(max(0, int(y)), alto_img - 1)
+    ancho = max(1, min(int(ancho), ancho_img - x))
+    alto = max(1, min(int(alto), alto_img - y))
+    
+    factor = min(ancho_max / ancho, alto_max / alto, 1.0)
+    ancho_vista = max(1, int(ancho * factor))
+    alto_vista = max(1, int(alto * factor))
+    
+    # Recortar la región en el nivel de la pirámide más cercano
+    nivel = _cache_piramides.obtener(imagen).nivel(PiramideImagen.nivel_para_escala(factor))
+    escala_x = nivel.shape[1] / ancho_img
+    escala_y = nivel.shape[0] / alto_img
+    recorte = nivel[int(y * escala_y):max(int(y * escala_y) + 1, math.ceil((y + alto) * escala_y)),
+                    int(x * escala_x):max(int(x * escala_x) + 1, math.ceil((x + ancho) * escala_x))]
+    if recorte.shape[1] != ancho_vista or recorte.shape[0] != alto_vista:
+        recorte = cv2.resize(recorte, (ancho_vista, alto_vista), interpolation=cv2.INTER_AREA)
+    
+    # La conversión de color solo toca los píxeles visibles
+    if recorte.ndim == 2:
+        vista = cv2.cvtColor(recorte, cv2.COLOR_GRAY2RGB)
+    elif recorte.shape[2] == 4:
+        vista = cv2.cvtColor(recorte, cv2.COLOR_BGRA2RGB)
+    else:
+        vista = cv2.cvtColor(recorte, cv2.COLOR_BGR2RGB)
+    return vista, factor
+
+
+class VisorImagen:
+    """
+    Muestra imágenes de OpenCV en un ttk.Label / tk.Label o en un tk.Canvas
+    
+    El PhotoImage se reutiliza con paste mientras el tamaño de la vista no
+    cambie, y la posición del ratón puede convertirse a coordenadas de la
+    imagen mostrada.
+    """
+    
+    def __init__(self, widget, tamano_max=None):
+        """
+        Args:
+            widget: Label o Canvas donde se dibuja la imagen
+            tamano_max: (ancho, alto) máximos; None = tamaño actual del widget
+        """
+        self.widget = widget
+        self.tamano_max = tamano_max
+        self.es_canvas = isinstance(widget, tk.Canvas)
+        self.foto = None
+        self.id_canvas = None
+        self.posicion = (0, 0)
+        
+        self.imagen = None
+        self.region = None
+        self.factor = 1.0
+    
+    def _tamano_disponible(self, tamano_max):
+        """Tamaño máximo de la vista"""
+        if tamano_max is not None:
+            return tamano_max
+        if self.tamano_max is not None:
+            return self.tamano_max
+        self.widget.update_idletasks()
+        ancho, alto = self.widget.winfo_width(), self.widget.winfo_height()
+        if ancho <= 1 or alto <= 1:
+            # Widget aún sin dibujar: mostrar sin reducir
+            return self.imagen.shape[1], self.imagen.shape[0]
+        return ancho, alto
+    
+    def mostrar(self, imagen, tamano_max=None, region=None):
+        """
+        Muestra una imagen (o una región de ella) ajustada al widget
+        
+        Args:
+            imagen: Imagen uint8 en grises, BGR o BGRA
+            tamano_max: (ancho, alto) máximos para esta llamada
+            region: Rectángulo visible (x, y, ancho, alto); None = completa
+        """
+        if imagen is None:
+            return
+        self.imagen = imagen
+        self.region = region
+        
+        ancho_max, alto_max = self._tamano_disponible(tamano_max)
+        vista, self.factor = renderizar_vista(imagen, ancho_max, alto_max, region)
+        alto_vista, ancho_vista = vista.shape[:2]
+        
+        imagen_pil = Image.fromarray(vista)
+        if self.foto is not None and (self.foto.width(), self.foto.height()) == (ancho_vista, alto_vista):
+            self.foto.paste(imagen_pil)
+        else:
+            self.foto = ImageTk.PhotoImage(imagen_pil)
+        
+        if self.es_canvas:
+            self._colocar_en_canvas(ancho_vista, alto_vista)
+        else:
+            self.widget.config(image=self.foto)
+        # Guardar referencia para evitar garbage collection
+        self.widget.image = self.foto
+    
+    def _colocar_en_canvas(self, ancho_vista, alto_vista):
+        """Centra la imagen en el canvas reutilizando el mismo elemento"""
+        canvas = self.widget
+        x = max(0, (canvas.winfo_width() - ancho_vista) // 2)
+        y = max(0, (canvas.winfo_height() - alto_vista) // 2)
+        self.posicion = (x, y)
+        
+        if self.id_canvas is None or self.id_canvas not in canvas.find_all():
+            canvas.delete("all")
+            self.id_canvas = canvas.create_image(x, y, anchor=tk.NW, image=self.foto)
+        else:
+            canvas.itemconfig(self.id_canvas, image=self.foto)
+            canvas.coords(self.id_canvas, x, y)
+    
+    def limpiar(self):
+        """Quita la imagen del widget"""
+        if self.es_canvas:
+            self.widget.delete("all")
+            self.id_canvas = None
+        else:
+            self.widget.config(image='')
+        self.widget.image = None
+        self.foto = None
+        self.imagen = None
+    
+    def a_coordenadas_imagen(self, x, y):
+        """Convierte una posición del widget (p. ej. event.x, event.y) a la imagen"""
+        if self.foto is None:
+            return None
+        if self.es_canvas:
+            margen_x, margen_y = self.posicion
+        else:
+            # Posición de la imagen dentro del label según su anchor
+            anchor = str(self.widget.cget('anchor')) or 'center'
+            libre_x = self.widget.winfo_width() - self.foto.width()
+            libre_y = self.widget.winfo_height() - self.foto.height()
+            margen_x = 0 if 'w' in anchor else (libre_x if 'e' in anchor else libre_x // 2)
+            margen_y = 0 if 'n' in anchor else (libre_y if 's' in anchor else libre_y // 2)
+        
+        origen_x, origen_y = self.region[:2] if self.region is not None else (0, 0)
+        return (int(origen_x + (x - margen_x) / self.factor),
+                int(origen_y + (y - margen_y) / self.factor))
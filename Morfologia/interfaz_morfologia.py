@@ -11,6 +11,14 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import os
+import sys
+
+# Importar la lectura de imágenes compartida desde el directorio raíz del proyecto
+directorio_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if directorio_raiz not in sys.path:
+    sys.path.insert(0, directorio_raiz)
+
+from ImagenDigital.procesamiento_basico import leer_imagen
 
 
 # ===================================================================
@@ -380,7 +388,7 @@ class InterfazMorfologia:
         
         if ruta:
             # Cargar imagen en escala de grises
-            self.imagen = cv2.imread(ruta, cv2.IMREAD_GRAYSCALE)
+            self.imagen = leer_imagen(ruta, 'grises')
             
             if self.imagen is None:
                 messagebox.showerror("Error", "No se pudo cargar la imagen")
@@ -5,18 +5,34 @@ Este módulo proporciona funcionalidades para:
 - Operaciones con escalares: suma, resta, multiplicación, división
 - Operaciones lógicas: AND, OR, XOR, NOT
 - Operaciones aritméticas entre imágenes: suma, resta, multiplicación, división, diferencia absoluta
+- Expresiones que combinan varias operaciones evaluadas por bloques de filas
+- Operaciones por lotes sobre pilas de cuadros y reducciones temporales
 """
 
 from .procesamiento_operaciones import (
     suma_escalar, resta_escalar, multiplicacion_escalar, division_escalar,
     operacion_and, operacion_or, operacion_xor, operacion_not,
     suma_imagenes, resta_imagenes, multiplicacion_imagenes, 
-    division_imagenes, diferencia_absoluta
+    division_imagenes, diferencia_absoluta, MODOS_COLOR,
+    CacheOperandos
+)
+from .expresiones_operaciones import (
+    Expresion, ExpresionCompilada, imagen, dif_abs,
+    analizar_expresion, compilar_expresion, evaluar_expresion
+)
+from .operaciones_lote import (
+    operar_pila, suma_pila, resta_pila, diferencia_absoluta_pila, reducir_pila,
+    OPERACIONES_PILA, REDUCCIONES
 )
 
 __all__ = [
     'suma_escalar', 'resta_escalar', 'multiplicacion_escalar', 'division_escalar',
     'operacion_and', 'operacion_or', 'operacion_xor', 'operacion_not',
     'suma_imagenes', 'resta_imagenes', 'multiplicacion_imagenes', 
-    'division_imagenes', 'diferencia_absoluta'
+    'division_imagenes', 'diferencia_absoluta', 'MODOS_COLOR',
+    'CacheOperandos',
+    'Expresion', 'ExpresionCompilada', 'imagen', 'dif_abs',
+    'analizar_expresion', 'compilar_expresion', 'evaluar_expresion',
+    'operar_pila', 'suma_pila', 'resta_pila', 'diferencia_absoluta_pila', 'reducir_pila',
+    'OPERACIONES_PILA', 'REDUCCIONES'
 ]
@@ -0,0 +1,458 @@
+"""
+Motor de expresiones para operaciones aritméticas y lógicas sobre imágenes
+Compila cadenas de operaciones en una evaluación fusionada por bloques de filas
+"""
+
+import ast
+
+import cv2
+import numpy as np
+
+try:
+    from .procesamiento_operaciones import (
+        _descomponer, _preparar_operando, _recomponer, _escalar
+    )
+except ImportError:
+    from procesamiento_operaciones import (
+        _descomponer, _preparar_operando, _recomponer, _escalar
+    )
+
+
+# Bytes aproximados que ocupan a la vez todos los bloques de una evaluación
+TAMAÑO_CACHE = 1024 * 1024
+
+# Filas mínimas por bloque: con bloques más pequeños domina el costo por llamada
+FILAS_MINIMAS_BLOQUE = 16
+
+
+# ==================== CONSTRUCCIÓN DE EXPRESIONES ====================
+
+class Expresion:
+    """
+    Nodo de una expresión sobre imágenes uint8
+    
+    Las expresiones se construyen con los operadores de Python a partir de
+    variables (imagen('a')) y números. La semántica de cada operación es la
+    de procesamiento_operaciones, con saturación en [0, 255]:
+        a + b, a - b       suma y resta con saturación
+        a * b, a / b       multiplicación (escala 1/255) y división (x255,
+                           divisor 0 tratado como 1) entre imágenes
+        a * k, a / k       producto y cociente por un escalar (k = 0 copia)
+        a + k, a - k, k - a
+        a & b, a | b, a ^ b, ~a
+        dif_abs(a, b)      |a - b|
+    """
+    
+    def __init__(self, operacion, operandos=(), valor=None):
+        self.operacion = operacion
+        self.operandos = tuple(operandos)
+        self.valor = valor
+    
+    def __repr__(self):
+        if self.operacion == 'variable':
+            return self.valor
+        if self.operacion == 'constante':
+            return repr(self.valor)
+        return f"{self.operacion}({', '.join(map(repr, self.operandos))})"
+    
+    @staticmethod
+    def _como_expresion(otro):
+        if isinstance(otro, Expresion):
+            return otro
+        if isinstance(otro, (int, float, np.integer, np.floating)):
+            return Expresion('constante', valor=float(otro))
+        return NotImplemented
+    
+    def _binaria(self, operacion, otro, invertida=False):
+        otro = self._como_expresion(otro)
+        if otro is NotImplemented:
+            return otro
+        operandos = (otro, self) if invertida else (self, otro)
+        return Expresion(operacion, operandos)
+    
+    def __add__(self, otro):
+        return self._binaria('suma', otro)
+    
+    def __radd__(self, otro):
+        return self._binaria('suma', otro, invertida=True)
+    
+    def __sub__(self, otro):
+        return self._binaria('resta', otro)
+    
+    def __rsub__(self, otro):
+        return self._binaria('resta', otro, invertida=True)
+    
+    def __mul__(self, otro):
+        return self._binaria('multiplicacion', otro)
+    
+    def __rmul__(self, otro):
+        return self._binaria('multiplicacion', otro, invertida=True)
+    
+    def __truediv__(self, otro):
+        return self._binaria('division', otro)
+    
+    def __and__(self, otro):
+        return self._binaria('and', otro)
+    
+    def __or__(self, otro):
+        return self._binaria('or', otro)
+    
+    def __xor__(self, otro):
+        return self._binaria('xor', otro)
+    
+    def __invert__(self):
+        return Expresion('not', (self,))
+    
+    def es_constante(self):
+        return self.operacion == 'constante'
+
+
+def imagen(nombre):
+    """Variable de imagen con nombre"""
+    return Expresion('variable', valor=nombre)
+
+
+def dif_abs(a, b):
+    """Diferencia absoluta |a - b|"""
+    return Expresion._como_expresion(a)._binaria('dif_abs', b)
+
+
+# ==================== ANÁLISIS DE CADENAS ====================
+
+_OPERADORES_AST = {
+    ast.Add: lambda a, b: a + b,
+    ast.Sub: lambda a, b: a - b,
+    ast.Mult: lambda a, b: a * b,
+    ast.Div: lambda a, b: a / b,
+    ast.BitAnd: lambda a, b: a & b,
+    ast.BitOr: lambda a, b: a | b,
+    ast.BitXor: lambda a, b: a ^ b
+}
+
+
+def analizar_expresion(texto):
+    """
+    Convierte una cadena como "(a*0.7 + b*0.3) - c + 20" en una Expresion
+    
+    Se admiten nombres de imagen, números, + - * / & | ^ ~, paréntesis y
+    las funciones dif(a, b) o abs(a - b) para la diferencia absoluta.
+    """
+    def convertir(nodo):
+        if isinstance(nodo, ast.Expression):
+            return convertir(nodo.body)
+        if isinstance(nodo, ast.Name):
+            return imagen(nodo.id)
+        if isinstance(nodo, ast.Constant) and isinstance(nodo.value, (int, float)):
+            return float(nodo.value)
+        if isinstance(nodo, ast.BinOp) and type(nodo.op) in _OPERADORES_AST:
+            a, b = convertir(nodo.left), convertir(nodo.right)
+            if not isinstance(a, Expresion) and not isinstance(b, Expresion):
+                # Aritmética entre números: se pliega al analizar
+                return _OPERADORES_AST[type(nodo.op)](a, b)
+            if not isinstance(a, Expresion):
+                a = Expresion._como_expresion(a)
+            return _OPERADORES_AST[type(nodo.op)](a, b)
+        if isinstance(nodo, ast.UnaryOp):
+            operando = convertir(nodo.operand)
+            if isinstance(nodo.op, ast.Invert) and isinstance(operando, Expresion):
+                return ~operando
+            if isinstance(nodo.op, ast.USub) and not isinstance(operando, Expresion):
+                return -operando
+            if isinstance(nodo.op, ast.UAdd):
+                return operando
+        if isinstance(nodo, ast.Call) and isinstance(nodo.func, ast.Name) and not nodo.keywords:
+            argumentos = [convertir(a) for a in nodo.args]
+            if nodo.func.id == 'dif' and len(argumentos) == 2:
+                return dif_abs(*argumentos)
+            if (nodo.func.id == 'abs' and len(argumentos) == 1
+                    and isinstance(argumentos[0], Expresion) and argumentos[0].operacion == 'resta'):
+                return dif_abs(*argumentos[0].operandos)
+        raise ValueError(f"Expresión no admitida: {ast.unparse(nodo)}")
+    
+    resultado = convertir(ast.parse(texto, mode='eval'))
+    return Expresion._como_expresion(resultado)
+
+
+# ==================== COMPILACIÓN ====================
+
+def _coeficientes(expresion):
+    """(variable, peso) si la expresión es una variable o variable * k con k >= 0"""
+    if expresion.operacion == 'variable':
+        return expresion, 1.0
+    if expresion.operacion == 'multiplicacion':
+        a, b = expresion.operandos
+        if a.es_constante():
+            a, b = b, a
+        if b.es_constante() and b.valor >= 0 and a.operacion != 'constante':
+            return a, b.valor
+    return None
+
+
+def _es_entero(valor):
+    return float(valor).is_integer()
+
+
+def _fusionar(expresion, aproximar=False):
+    """
+    Reescribe a*α + b*β (+ γ) como un solo nodo 'ponderada' (cv2.addWeighted)
+    
+    Por defecto solo se fusiona con α, β y γ enteros no negativos: los
+    productos intermedios no se redondean y una saturación intermedia en
+    255 también satura la suma, así que el resultado es idéntico al de la
+    cadena de operaciones. Con aproximar=True se fusionan también pesos no
+    enteros; cv2.addWeighted omite entonces el redondeo y la saturación
+    intermedios y el resultado puede diferir del encadenado.
+    """
+    operandos = tuple(_fusionar(o, aproximar) for o in expresion.operandos)
+    expresion = Expresion(expresion.operacion, operandos, expresion.valor)
+    
+    if expresion.operacion != 'suma':
+        return expresion
+    a, b = operandos
+    
+    def admitido(valor):
+        return valor >= 0 and (aproximar or _es_entero(valor))
+    
+    # (a*α + b*β) + γ
+    for ponderada, constante in ((a, b), (b, a)):
+        if ponderada.operacion == 'ponderada' and constante.es_constante() and admitido(constante.valor):
+            x, y = ponderada.operandos
+            alfa, beta, gamma = ponderada.valor
+            return Expresion('ponderada', (x, y), (alfa, beta, gamma + constante.valor))
+    
+    coef_a, coef_b = _coeficientes(a), _coeficientes(b)
+    if coef_a is not None and coef_b is not None and admitido(coef_a[1]) and admitido(coef_b[1]):
+        return Expresion('ponderada', (coef_a[0], coef_b[0]), (coef_a[1], coef_b[1], 0.0))
+    return expresion
+
+
+def _plegar_constantes(expresion):
+    """Evalúa en Python las subexpresiones sin imágenes"""
+    operandos = tuple(_plegar_constantes(o) for o in expresion.operandos)
+    if operandos and all(o.es_constante() for o in operandos):
+        a = operandos[0].valor
+        b = operandos[1].valor if len(operandos) > 1 else None
+        funciones = {
+            'suma': lambda: a + b, 'resta': lambda: a - b, 'multiplicacion': lambda: a * b,
+            'division': lambda: a / b if b != 0 else a, 'dif_abs': lambda: abs(a - b),
+            'and': lambda: float(int(a) & int(b)), 'or': lambda: float(int(a) | int(b)),
+            'xor': lambda: float(int(a) ^ int(b)), 'not': lambda: float(255 - int(a))
+        }
+        return Expresion('constante', valor=funciones[expresion.operacion]())
+    return Expresion(expresion.operacion, operandos, expresion.valor)
+
+
+def _ejecutar(operacion, valor, entradas, salida):
+    """Ejecuta una instrucción sobre bloques de filas; las entradas son arreglos o escalares"""
+    a = entradas[0]
+    b = entradas[1] if len(entradas) > 1 else None
+    escalar_a = not isinstance(a, np.ndarray)
+    escalar_b = b is not None and not isinstance(b, np.ndarray)
+    
+    if operacion == 'ponderada':
+        alfa, beta, gamma = valor
+        cv2.addWeighted(a, alfa, b, beta, gamma, dst=salida)
+    elif operacion == 'suma':
+        if escalar_a:
+            a, b = b, a
+        cv2.add(a, _escalar(b) if escalar_a or escalar_b else b, dst=salida)
+    elif operacion == 'resta':
+        cv2.subtract(_escalar(a) if escalar_a else a, _escalar(b) if escalar_b else b, dst=salida)
+    elif operacion == 'multiplicacion':
+        if escalar_a:
+            a, b = b, a
+        if escalar_a or escalar_b:
+            cv2.multiply(a, _escalar(b), dst=salida)
+        else:
+            cv2.multiply(a, b, dst=salida, scale=1.0/255.0)
+    elif operacion == 'division':
+        if escalar_b:
+            if b == 0:
+                np.copyto(salida, a)
+            else:
+                cv2.multiply(a, _escalar(1.0 / b), dst=salida)
+        else:
+            # El divisor seguro se construye en la propia salida
+            cv2.max(b, _escalar(1), dst=salida)
+            cv2.divide(a, salida, dst=salida, scale=255.0)
+    elif operacion == 'dif_abs':
+        if escalar_a:
+            a, b = b, a
+        cv2.absdiff(a, _escalar(b) if escalar_a or escalar_b else b, dst=salida)
+    elif operacion in ('and', 'or', 'xor'):
+        funcion = {'and': cv2.bitwise_and, 'or': cv2.bitwise_or, 'xor': cv2.bitwise_xor}[operacion]
+        if escalar_a:
+            a, b = b, a
+        funcion(a, _escalar(b) if escalar_a or escalar_b else b, dst=salida)
+    elif operacion == 'not':
+        cv2.bitwise_not(a, dst=salida)
+    else:
+        raise ValueError(f"Operación no reconocida: {operacion}")
+
+
+def _entregar(salida, ycrcb, dst):
+    """Recompone el resultado y garantiza que quede escrito en dst si se pidió"""
+    resultado = _recomponer(salida, ycrcb, dst)
+    if dst is not None and resultado is not dst:
+        np.copyto(dst, resultado)
+        return dst
+    return resultado
+
+
+class ExpresionCompilada:
+    """
+    Expresión lista para evaluarse por bloques de filas
+    
+    La expresión se convierte en una lista de instrucciones con un registro
+    por resultado intermedio. Cada registro es un bloque de pocas filas que
+    cabe en caché, así que toda la cadena se evalúa sobre un bloque antes de
+    pasar al siguiente y los intermedios nunca ocupan una imagen completa.
+    """
+    
+    def __init__(self, expresion, modo_color='gris', fusionar=False):
+        """
+        Args:
+            expresion: Expresion o cadena (ver analizar_expresion)
+            modo_color: 'gris', 'canales' o 'luminancia' (ver procesamiento_operaciones)
+            fusionar: True para fusionar también sumas ponderadas con pesos no
+                      enteros en un cv2.addWeighted, más rápido pero sin el
+                      redondeo intermedio de las operaciones encadenadas
+        """
+        if isinstance(expresion, str):
+            expresion = analizar_expresion(expresion)
+        self.expresion = _fusionar(_plegar_constantes(expresion), aproximar=fusionar)
+        self.modo_color = modo_color
+        
+        # Variables en orden de aparición; la primera define tamaño y color
+        self.variables = []
+        self.instrucciones = []
+        self.raiz = self._linealizar(self.expresion)
+    
+    def _linealizar(self, expresion):
+        """
+        Añade las instrucciones de la expresión en postorden
+        
+        Returns:
+            ('variable', nombre), ('constante', valor) o ('registro', indice)
+        """
+        if expresion.operacion == 'variable':
+            if expresion.valor not in self.variables:
+                self.variables.append(expresion.valor)
+            return ('variable', expresion.valor)
+        if expresion.operacion == 'constante':
+            return ('constante', expresion.valor)
+        
+        if expresion.operacion == 'division' and expresion.operandos[0].es_constante():
+            raise ValueError("No se admite dividir un escalar entre una imagen")
+        entradas = [self._linealizar(o) for o in expresion.operandos]
+        self.instrucciones.append((expresion.operacion, expresion.valor, entradas))
+        return ('registro', len(self.instrucciones) - 1)
+    
+    def __repr__(self):
+        return f"ExpresionCompilada({self.expresion!r})"
+    
+    def _preparar_entradas(self, imagenes, cache=None):
+        """Planos de todas las variables con el tamaño y canales de la primera"""
+        faltantes = [v for v in self.variables if v not in imagenes]
+        if faltantes:
+            raise ValueError(f"Faltan imágenes para: {', '.join(faltantes)}")
+        if not self.variables:
+            raise ValueError("La expresión no contiene imágenes")
+        
+        primera = self.variables[0]
+        plano, ycrcb = _descomponer(imagenes[primera], self.modo_color)
+        planos = {primera: np.ascontiguousarray(plano)}
+        for nombre in self.variables[1:]:
+            planos[nombre] = np.ascontiguousarray(
+                _preparar_operando(imagenes[nombre], plano, self.modo_color, cache)
+            )
+        return planos, ycrcb
+    
+    def evaluar(self, imagenes=None, dst=None, filas_bloque=None, cache=None, **kwargs):
+        """
+        Evalúa la expresión
+        
+        Args:
+            imagenes: Diccionario nombre -> imagen (también se aceptan como kwargs)
+            dst: Arreglo de salida opcional (uint8, mismo tamaño que el resultado);
+                 puede ser una de las imágenes de entrada
+            filas_bloque: Filas por bloque (None = según TAMAÑO_CACHE)
+            cache: CacheOperandos opcional para los operandos redimensionados
+        
+        Returns:
+            Imagen resultante
+        """
+        imagenes = dict(imagenes or {}, **kwargs)
+        planos, ycrcb = self._preparar_entradas(imagenes, cache)
+        forma = planos[self.variables[0]].shape
+        altura, bytes_fila = forma[0], int(np.prod(forma[1:]))
+        
+        # Si dst comparte memoria con una entrada se evalúa en un arreglo
+        # aparte y el resultado se copia a dst al final (ver _entregar)
+        salida = dst if ycrcb is None else None
+        if salida is not None and any(np.shares_memory(salida, p) for p in planos.values()):
+            salida = None
+        if salida is None:
+            salida = np.empty(forma, dtype=np.uint8)
+        
+        if self.raiz[0] == 'variable':
+            np.copyto(salida, planos[self.raiz[1]])
+            return _entregar(salida, ycrcb, dst)
+        if self.raiz[0] == 'constante':
+            salida[...] = np.uint8(np.clip(np.rint(self.raiz[1]), 0, 255))
+            return _entregar(salida, ycrcb, dst)
+        
+        if filas_bloque is None:
+            activos = len(self.instrucciones) + len(planos) + 1
+            filas_bloque = max(FILAS_MINIMAS_BLOQUE, TAMAÑO_CACHE // max(1, bytes_fila * activos))
+        
+        # Un bloque reutilizable por resultado intermedio (el último escribe en la salida)
+        registros = [np.empty((filas_bloque,) + forma[1:], dtype=np.uint8)
+                     for _ in self.instrucciones[:-1]]
+        
+        for inicio in range(0, altura, filas_bloque):
+            fin = min(inicio + filas_bloque, altura)
+            filas = fin - inicio
+            bloque = {nombre: p[inicio:fin] for nombre, p in planos.items()}
+            
+            for i, (operacion, valor, entradas) in enumerate(self.instrucciones):
+                argumentos = []
+                for tipo, dato in entradas:
+                    if tipo == 'variable':
+                        argumentos.append(bloque[dato])
+                    elif tipo == 'constante':
+                        argumentos.append(dato)
+                    else:
+                        argumentos.append(registros[dato][:filas])
+                destino = salida[inicio:fin] if i == len(self.instrucciones) - 1 else registros[i][:filas]
+                _ejecutar(operacion, valor, argumentos, destino)
+        
+        return _entregar(salida, ycrcb, dst)
+
+
+def compilar_expresion(expresion, modo_color='gris', fusionar=False):
+    """
+    Compila una expresión (Expresion o cadena) para evaluarla varias veces
+    
+    Returns:
+        ExpresionCompilada (ver fusionar en ExpresionCompilada)
+    """
+    return ExpresionCompilada(expresion, modo_color, fusionar)
+
+
+def evaluar_expresion(expresion, imagenes, modo_color='gris', dst=None, cache=None, fusionar=False):
+    """
+    Compila y evalúa una expresión en un solo paso
+    
+    Args:
+        expresion: Expresion o cadena, por ejemplo "~((a*0.7 + b*0.3) - c + 20)"
+        imagenes: Diccionario nombre -> imagen
+        modo_color: 'gris', 'canales' o 'luminancia'
+        dst: Arreglo de salida opcional
+        cache: CacheOperandos opcional para los operandos redimensionados
+        fusionar: Fusión aproximada de sumas ponderadas (ver ExpresionCompilada)
+    
+    Returns:
+        Imagen resultante
+    """
+    return ExpresionCompilada(expresion, modo_color, fusionar).evaluar(imagenes, dst=dst, cache=cache)
@@ -10,14 +10,23 @@ from tkinter import ttk, filedialog, messagebox
 import cv2
 import numpy as np
 from PIL import Image, ImageTk
+import sys
+import os
 
 from procesamiento_operaciones import (
     suma_escalar, resta_escalar, multiplicacion_escalar, division_escalar,
     operacion_and, operacion_or, operacion_xor, operacion_not,
     suma_imagenes, resta_imagenes, multiplicacion_imagenes, 
-    division_imagenes, diferencia_absoluta
+    division_imagenes, diferencia_absoluta, MODOS_COLOR, CacheOperandos
 )
 
+# Importar la lectura de imágenes compartida desde el directorio raíz del proyecto
+directorio_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if directorio_raiz not in sys.path:
+    sys.path.insert(0, directorio_raiz)
+
+from ImagenDigital.procesamiento_basico import leer_imagen
+
 
 class InterfazOperaciones:
     def __init__(self, root):
@@ -28,6 +37,8 @@ class InterfazOperaciones:
         self.imagen1 = None
         self.imagen2 = None
         self.imagen_resultado = None
+        # La imagen 2 redimensionada se reutiliza entre operaciones
+        self.cache_operandos = CacheOperandos()
         
         self.crear_interfaz()
     
@@ -51,6 +62,12 @@ class InterfazOperaciones:
         ttk.Button(panel_superior, text="Reiniciar", 
                   command=self.reiniciar).pack(side=tk.LEFT, padx=5)
         
+        # Modo de color para imágenes BGR
+        ttk.Label(panel_superior, text="Modo de color:").pack(side=tk.LEFT, padx=(20, 5))
+        self.var_modo_color = tk.StringVar(value='gris')
+        ttk.Combobox(panel_superior, textvariable=self.var_modo_color, values=list(MODOS_COLOR),
+                     state='readonly', width=12).pack(side=tk.LEFT, padx=5)
+        
         # Frame contenedor
         frame_contenido = ttk.Frame(main_container)
         frame_contenido.pack(fill=tk.BOTH, expand=True)
@@ -250,7 +267,7 @@ class InterfazOperaciones:
         )
         
         if ruta:
-            self.imagen1 = cv2.imread(ruta)
+            self.imagen1 = leer_imagen(ruta)
             if self.imagen1 is None:
                 messagebox.showerror("Error", "No se pudo cargar la imagen 1")
                 return
@@ -267,7 +284,7 @@ class InterfazOperaciones:
         )
         
         if ruta:
-            self.imagen2 = cv2.imread(ruta)
+            self.imagen2 = leer_imagen(ruta)
             if self.imagen2 is None:
                 messagebox.showerror("Error", "No se pudo cargar la imagen 2")
                 return
@@ -308,23 +325,24 @@ class InterfazOperaciones:
         
         try:
             valor = self.var_escalar.get()
+            modo = self.var_modo_color.get()
             
             if operacion == 'suma':
-                self.imagen_resultado = suma_escalar(self.imagen1, valor)
+                self.imagen_resultado = suma_escalar(self.imagen1, valor, modo)
                 op_texto = f"Suma con {valor:.1f}"
             elif operacion == 'resta':
-                self.imagen_resultado = resta_escalar(self.imagen1, valor)
+                self.imagen_resultado = resta_escalar(self.imagen1, valor, modo)
                 op_texto = f"Resta de {valor:.1f}"
             elif operacion == 'multiplicacion':
-                self.imagen_resultado = multiplicacion_escalar(self.imagen1, valor)
+                self.imagen_resultado = multiplicacion_escalar(self.imagen1, valor, modo)
                 op_texto = f"Multiplicación por {valor:.1f}"
             elif operacion == 'division':
-                self.imagen_resultado = division_escalar(self.imagen1, valor)
+                self.imagen_resultado = division_escalar(self.imagen1, valor, modo)
                 op_texto = f"División por {valor:.1f}"
             
             self.mostrar_imagen(self.imagen_resultado, self.label_resultado)
             messagebox.showinfo("Éxito", f"Operación aplicada: {op_texto}")
-            
+        
         except Exception as e:
             messagebox.showerror("Error", f"Error en operación: {str(e)}")
     
@@ -340,22 +358,25 @@ class InterfazOperaciones:
                 return
         
         try:
+            modo = self.var_modo_color.get()
+            cache = self.cache_operandos
+            
             if operacion == 'and':
-                self.imagen_resultado = operacion_and(self.imagen1, self.imagen2)
+                self.imagen_resultado = operacion_and(self.imagen1, self.imagen2, modo_color=modo, cache=cache)
                 op_texto = "AND lógico"
             elif operacion == 'or':
-                self.imagen_resultado = operacion_or(self.imagen1, self.imagen2)
+                self.imagen_resultado = operacion_or(self.imagen1, self.imagen2, modo_color=modo, cache=cache)
                 op_texto = "OR lógico"
             elif operacion == 'xor':
-                self.imagen_resultado = operacion_xor(self.imagen1, self.imagen2)
+                self.imagen_resultado = operacion_xor(self.imagen1, self.imagen2, modo_color=modo, cache=cache)
                 op_texto = "XOR lógico"
             elif operacion == 'not':
-                self.imagen_resultado = operacion_not(self.imagen1)
+                self.imagen_resultado = operacion_not(self.imagen1, modo_color=modo)
                 op_texto = "NOT lógico (inversión)"
             
             self.mostrar_imagen(self.imagen_resultado, self.label_resultado)
             messagebox.showinfo("Éxito", f"Operación aplicada: {op_texto}")
-            
+        
         except Exception as e:
             messagebox.showerror("Error", f"Error en operación lógica: {str(e)}")
     
@@ -366,27 +387,30 @@ class InterfazOperaciones:
             return
         
         try:
+            modo = self.var_modo_color.get()
+            cache = self.cache_operandos
+            
             if operacion == 'suma':
                 peso1 = self.var_peso1.get()
                 peso2 = self.var_peso2.get()
-                self.imagen_resultado = suma_imagenes(self.imagen1, self.imagen2, peso1, peso2)
+                self.imagen_resultado = suma_imagenes(self.imagen1, self.imagen2, peso1, peso2, modo, cache=cache)
                 op_texto = f"Suma ponderada (w1={peso1:.2f}, w2={peso2:.2f})"
             elif operacion == 'resta':
-                self.imagen_resultado = resta_imagenes(self.imagen1, self.imagen2)
+                self.imagen_resultado = resta_imagenes(self.imagen1, self.imagen2, modo_color=modo, cache=cache)
                 op_texto = "Resta (Img1 - Img2)"
             elif operacion == 'multiplicacion':
-                self.imagen_resultado = multiplicacion_imagenes(self.imagen1, self.imagen2)
+                self.imagen_resultado = multiplicacion_imagenes(self.imagen1, self.imagen2, modo_color=modo, cache=cache)
                 op_texto = "Multiplicación"
             elif operacion == 'division':
-                self.imagen_resultado = division_imagenes(self.imagen1, self.imagen2)
+                self.imagen_resultado = division_imagenes(self.imagen1, self.imagen2, modo_color=modo, cache=cache)
                 op_texto = "División (Img1 / Img2)"
             elif operacion == 'diferencia':
-                self.imagen_resultado = diferencia_absoluta(self.imagen1, self.imagen2)
+                self.imagen_resultado = diferencia_absoluta(self.imagen1, self.imagen2, modo_color=modo, cache=cache)
                 op_texto = "Diferencia absoluta |Img1-Img2|"
             
             self.mostrar_imagen(self.imagen_resultado, self.label_resultado)
             messagebox.showinfo("Éxito", f"Operación aplicada: {op_texto}")
-            
+        
         except Exception as e:
             messagebox.showerror("Error", f"Error en operación aritmética: {str(e)}")
     
@@ -410,6 +434,7 @@ class InterfazOperaciones:
         self.imagen1 = None
         self.imagen2 = None
         self.imagen_resultado = None
+        self.cache_operandos.limpiar()
         
         self.label_img1.config(image='')
         self.label_img2.config(image='')
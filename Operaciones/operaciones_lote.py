@@ -0,0 +1,195 @@
+"""
+Operaciones por lotes sobre pilas de imágenes (N, H, W[, C])
+Aplica una referencia a todos los cuadros de una pila y reduce pilas en el tiempo
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+try:
+    from .procesamiento_operaciones import (
+        operacion_and, operacion_or, operacion_xor,
+        suma_imagenes, resta_imagenes, multiplicacion_imagenes,
+        division_imagenes, diferencia_absoluta, _preparar_operando
+    )
+except ImportError:
+    from procesamiento_operaciones import (
+        operacion_and, operacion_or, operacion_xor,
+        suma_imagenes, resta_imagenes, multiplicacion_imagenes,
+        division_imagenes, diferencia_absoluta, _preparar_operando
+    )
+
+
+OPERACIONES_PILA = {
+    'suma': suma_imagenes,
+    'resta': resta_imagenes,
+    'multiplicacion': multiplicacion_imagenes,
+    'division': division_imagenes,
+    'diferencia': diferencia_absoluta,
+    'and': operacion_and,
+    'or': operacion_or,
+    'xor': operacion_xor
+}
+
+REDUCCIONES = ('media', 'mediana', 'maximo', 'minimo')
+
+# Bytes de cada banda de filas que se reduce de una vez en reducir_pila
+BYTES_BANDA = 64 * 1024 * 1024
+
+
+def _repartir(funcion, inicios, max_workers):
+    """Ejecuta funcion(inicio) para cada inicio, en hilos si hay más de uno disponible"""
+    hilos = max_workers if max_workers is not None else (os.cpu_count() or 1)
+    if hilos <= 1 or len(inicios) <= 1:
+        for inicio in inicios:
+            funcion(inicio)
+        return
+    with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+        list(ejecutor.map(funcion, inicios))
+
+
+# ==================== OPERACIONES CON REFERENCIA ====================
+
+def operar_pila(operacion, pila, referencia, dst=None, cuadros_bloque=16, max_workers=None, **parametros):
+    """
+    Aplica una operación entre cada cuadro de una pila y una referencia
+    
+    Los cuadros se operan tal como vienen (sin convertir a grises); la
+    referencia se ajusta una sola vez al tamaño y canales de los cuadros.
+    Los bloques de cuadros se reparten en un grupo de hilos y cada cuadro
+    se escribe directamente en su lugar de la salida.
+    
+    Args:
+        operacion: Nombre de la operación (ver OPERACIONES_PILA)
+        pila: Arreglo uint8 (N, H, W) o (N, H, W, C); puede ser un np.memmap
+        referencia: Imagen que se opera contra todos los cuadros
+        dst: Arreglo de salida opcional con la forma de la pila
+        cuadros_bloque: Cuadros por tarea del grupo de hilos
+        max_workers: Hilos (None = automático)
+        **parametros: Parámetros extra de la operación (p. ej. peso1, peso2)
+    
+    Returns:
+        Pila resultante
+    """
+    if operacion not in OPERACIONES_PILA:
+        raise ValueError(f"Operación no reconocida: {operacion}")
+    if pila.ndim not in (3, 4):
+        raise ValueError("La pila debe tener forma (N, H, W) o (N, H, W, C)")
+    
+    funcion = OPERACIONES_PILA[operacion]
+    referencia = np.ascontiguousarray(_preparar_operando(referencia, pila[0], 'canales'))
+    if dst is None:
+        dst = np.empty(pila.shape, dtype=np.uint8)
+    
+    def operar_bloque(inicio):
+        for i in range(inicio, min(inicio + cuadros_bloque, len(pila))):
+            funcion(np.ascontiguousarray(pila[i]), referencia, modo_color='canales', dst=dst[i], **parametros)
+    
+    _repartir(operar_bloque, range(0, len(pila), cuadros_bloque), max_workers)
+    
+    return dst
+
+
+def suma_pila(pila, referencia, peso1=0.5, peso2=0.5, dst=None, max_workers=None):
+    """Suma ponderada de cada cuadro con la referencia"""
+    return operar_pila('suma', pila, referencia, dst=dst, max_workers=max_workers,
+                       peso1=peso1, peso2=peso2)
+
+
+def resta_pila(pila, referencia, dst=None, max_workers=None):
+    """Resta con saturación cuadro - referencia para todos los cuadros"""
+    return operar_pila('resta', pila, referencia, dst=dst, max_workers=max_workers)
+
+
+def diferencia_absoluta_pila(pila, referencia, dst=None, max_workers=None):
+    """Diferencia absoluta |cuadro - referencia| para todos los cuadros"""
+    return operar_pila('diferencia', pila, referencia, dst=dst, max_workers=max_workers)
+
+
+# ==================== REDUCCIONES TEMPORALES ====================
+
+def _reducir_banda(banda, reduccion):
+    """Reduce una banda (N, filas, W[, C]) a lo largo de los cuadros"""
+    if reduccion == 'maximo':
+        return banda.max(axis=0)
+    if reduccion == 'minimo':
+        return banda.min(axis=0)
+    if reduccion == 'media':
+        valores = banda.mean(axis=0, dtype=np.float64)
+    else:
+        valores = np.median(banda, axis=0)
+    return np.rint(valores).astype(np.uint8)
+
+
+def _reducir_flujo(cuadros, reduccion):
+    """Reduce un iterable de cuadros guardando un solo acumulador"""
+    acumulador = None
+    n = 0
+    for cuadro in cuadros:
+        cuadro = np.ascontiguousarray(cuadro)
+        if acumulador is None:
+            if reduccion == 'media':
+                acumulador = np.zeros(cuadro.shape, dtype=np.float64)
+            else:
+                acumulador = cuadro.copy()
+                n = 1
+                continue
+        if acumulador.shape[:2] != cuadro.shape[:2]:
+            raise ValueError("Todos los cuadros deben tener el mismo tamaño")
+        
+        if reduccion == 'media':
+            cv2.accumulate(cuadro, acumulador)
+        elif reduccion == 'maximo':
+            cv2.max(acumulador, cuadro, dst=acumulador)
+        else:
+            cv2.min(acumulador, cuadro, dst=acumulador)
+        n += 1
+    
+    if acumulador is None:
+        raise ValueError("No hay cuadros para reducir")
+    if reduccion == 'media':
+        return cv2.convertScaleAbs(acumulador, alpha=1.0 / n)
+    return acumulador
+
+
+def reducir_pila(cuadros, reduccion='media', max_workers=None):
+    """
+    Reduce una pila de cuadros a una sola imagen (media, mediana, máximo o mínimo)
+    
+    Con un arreglo (o np.memmap) se reducen bandas de filas en paralelo y
+    solo una banda de resultados intermedios existe a la vez. Con cualquier
+    otro iterable (p. ej. un generador que lee un video) media, máximo y
+    mínimo se acumulan cuadro a cuadro sin guardar la secuencia; la mediana
+    necesita todos los cuadros y los reúne como uint8.
+    
+    Args:
+        cuadros: Arreglo (N, H, W[, C]) uint8 o iterable de cuadros
+        reduccion: 'media', 'mediana', 'maximo' o 'minimo'
+        max_workers: Hilos para las bandas (None = automático)
+    
+    Returns:
+        Imagen uint8 (H, W[, C]) reducida
+    """
+    if reduccion not in REDUCCIONES:
+        raise ValueError(f"Reducción no reconocida: {reduccion}")
+    
+    if not isinstance(cuadros, np.ndarray):
+        if reduccion != 'mediana':
+            return _reducir_flujo(cuadros, reduccion)
+        cuadros = np.stack([np.asarray(c, dtype=np.uint8) for c in cuadros])
+    
+    n, altura = cuadros.shape[:2]
+    bytes_fila = n * int(np.prod(cuadros.shape[2:])) * cuadros.itemsize
+    filas_banda = max(1, BYTES_BANDA // max(1, bytes_fila))
+    salida = np.empty(cuadros.shape[1:], dtype=np.uint8)
+    
+    def reducir(inicio):
+        fin = min(inicio + filas_banda, altura)
+        salida[inicio:fin] = _reducir_banda(cuadros[:, inicio:fin], reduccion)
+    
+    _repartir(reducir, range(0, altura, filas_banda), max_workers)
+    
+    return salida
@@ -3,189 +3,351 @@ Módulo de operaciones sobre imágenes
 Incluye operaciones con escalares, operaciones lógicas y operaciones aritméticas
 """
 
+import hashlib
+import threading
+from collections import OrderedDict
+
 import cv2
 import numpy as np
 
 
+# ==================== UTILIDADES ====================
+# Todas las operaciones aceptan dst=: un arreglo uint8 del tamaño del
+# resultado donde se escribe sin reservar memoria nueva. Si dst es None se
+# crea un arreglo nuevo. Las operaciones usan la aritmética con saturación
+# de OpenCV, que redondea al entero más cercano.
+#
+# modo_color indica cómo se tratan las imágenes BGR:
+#   'gris'        convierte a escala de grises (comportamiento original)
+#   'canales'     opera sobre los 3 canales intercalados en una sola llamada
+#   'luminancia'  opera solo sobre Y en YCrCb y conserva el color (Cr, Cb)
+
+MODOS_COLOR = ('gris', 'canales', 'luminancia')
+
+# Interpolación al igualar el tamaño del segundo operando, con o sin caché:
+# INTER_AREA al reducir (evita aliasing) e INTER_LINEAR al ampliar
+INTERPOLACION_REDUCCION = cv2.INTER_AREA
+INTERPOLACION_AMPLIACION = cv2.INTER_LINEAR
+
+
+def _a_gris(imagen):
+    """Convierte a escala de grises si la imagen tiene 3 canales"""
+    if len(imagen.shape) == 3:
+        return cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+    return imagen
+
+
+def _descomponer(imagen, modo_color):
+    """
+    Obtiene el plano sobre el que se opera según el modo de color
+    
+    Returns:
+        Tupla (plano, ycrcb) donde ycrcb es la imagen YCrCb completa en modo
+        'luminancia' con color (para recomponer el resultado) o None
+    """
+    if modo_color not in MODOS_COLOR:
+        raise ValueError(f"Modo de color no válido: {modo_color}")
+    
+    if len(imagen.shape) == 2 or modo_color == 'canales':
+        return imagen, None
+    if modo_color == 'gris':
+        return cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY), None
+    
+    ycrcb = cv2.cvtColor(imagen, cv2.COLOR_BGR2YCrCb)
+    return cv2.extractChannel(ycrcb, 0), ycrcb
+
+
+def _destino(dst, ycrcb):
+    """Salida de la operación sobre el plano: dst salvo que haya que recomponer"""
+    return dst if ycrcb is None else None
+
+
+def _recomponer(resultado, ycrcb, dst=None):
+    """Devuelve el resultado en el espacio de la imagen de entrada"""
+    if ycrcb is None:
+        return resultado
+    cv2.insertChannel(resultado, ycrcb, 0)
+    return cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2BGR, dst=dst)
+
+
+class CacheOperandos:
+    """
+    Memoria LRU del segundo operando ya convertido y redimensionado
+    
+    En la interfaz la misma imagen 2 se usa en muchas operaciones seguidas;
+    pasando cache= a las operaciones, el cambio de tamaño (con su
+    conversión de color) se hace una sola vez por combinación de imagen,
+    forma destino y modo de color. Los operandos que ya tienen el tamaño
+    correcto no se guardan: convertirlos cuesta lo mismo que validarlos.
+    
+    Es opcional: sin cache= las operaciones no guardan nada. La imagen se
+    identifica por identidad del arreglo (se guarda una referencia, así que
+    el id no puede reutilizarse) o, con por_contenido, por un hash de sus
+    bytes. Con identidad, un arreglo que se rellena en su lugar en cada
+    cuadro necesita por_contenido=True o limpiar() entre usos.
+    """
+    
+    def __init__(self, max_entradas=8, por_contenido=False):
+        """
+        Args:
+            max_entradas: Operandos preparados que se conservan
+            por_contenido: Identificar las imágenes por hash de contenido
+        """
+        self.max_entradas = max_entradas
+        self.por_contenido = por_contenido
+        self._entradas = OrderedDict()
+        self._candado = threading.Lock()
+    
+    def limpiar(self):
+        """Elimina todos los operandos guardados"""
+        with self._candado:
+            self._entradas.clear()
+    
+    def _clave(self, imagen, forma, modo_color):
+        if self.por_contenido:
+            resumen = hashlib.blake2b(np.ascontiguousarray(imagen).data, digest_size=16).digest()
+            origen = (resumen, imagen.shape, imagen.dtype.str)
+        else:
+            origen = id(imagen)
+        return origen, forma, modo_color
+    
+    def preparar(self, imagen2, plano1, modo_color):
+        """Versión cacheada de _preparar_segundo (el resultado es de solo lectura)"""
+        if imagen2.shape[:2] == plano1.shape[:2]:
+            # Sin cambio de tamaño no se guarda nada
+            return _preparar_segundo(imagen2, plano1, modo_color)
+        
+        clave = self._clave(imagen2, plano1.shape, modo_color)
+        with self._candado:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and (self.por_contenido or entrada[0] is imagen2):
+                self._entradas.move_to_end(clave)
+                return entrada[1]
+        
+        resultado = _preparar_segundo(imagen2, plano1, modo_color)
+        resultado.flags.writeable = False
+        
+        with self._candado:
+            self._entradas[clave] = (None if self.por_contenido else imagen2, resultado)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+        return resultado
+
+
+def _redimensionar(imagen, ancho, alto):
+    """Cambia el tamaño con la interpolación según se reduzca o se amplíe"""
+    reduce = ancho <= imagen.shape[1] and alto <= imagen.shape[0]
+    interpolacion = INTERPOLACION_REDUCCION if reduce else INTERPOLACION_AMPLIACION
+    return cv2.resize(imagen, (ancho, alto), interpolation=interpolacion)
+
+
+def _preparar_segundo(imagen2, plano1, modo_color):
+    """Lleva imagen2 al mismo número de canales y tamaño que el plano de imagen1"""
+    if len(plano1.shape) == 2:
+        # Plano de un canal: grises o luminancia según el modo
+        if modo_color == 'luminancia' and len(imagen2.shape) == 3:
+            imagen2 = cv2.extractChannel(cv2.cvtColor(imagen2, cv2.COLOR_BGR2YCrCb), 0)
+        else:
+            imagen2 = _a_gris(imagen2)
+    elif len(imagen2.shape) == 2:
+        imagen2 = cv2.cvtColor(imagen2, cv2.COLOR_GRAY2BGR)
+    
+    # Asegurar mismo tamaño
+    if imagen2.shape[:2] != plano1.shape[:2]:
+        imagen2 = _redimensionar(imagen2, plano1.shape[1], plano1.shape[0])
+    
+    return imagen2
+
+
+def _preparar_operando(imagen2, plano1, modo_color, cache=None):
+    """_preparar_segundo, a través de la caché de operandos si se indica"""
+    if cache is None:
+        return _preparar_segundo(imagen2, plano1, modo_color)
+    return cache.preparar(imagen2, plano1, modo_color)
+
+
+def _preparar_par(imagen1, imagen2, modo_color, cache=None):
+    """
+    Prepara los operandos de una operación binaria
+    
+    Returns:
+        Tupla (plano1, plano2, ycrcb) con ycrcb como en _descomponer
+    """
+    plano1, ycrcb = _descomponer(imagen1, modo_color)
+    return plano1, _preparar_operando(imagen2, plano1, modo_color, cache), ycrcb
+
+
+def _escalar(valor):
+    """Escalar de OpenCV con el mismo valor en todos los canales"""
+    return (float(valor),) * 4
+
+
 # ==================== OPERACIONES CON ESCALARES ====================
 
-def suma_escalar(imagen, valor):
+def suma_escalar(imagen, valor, modo_color='gris', dst=None):
     """
     Suma un valor escalar a todos los píxeles de la imagen
     
     Args:
         imagen: Imagen de entrada
         valor: Valor escalar a sumar
+        modo_color: 'gris', 'canales' o 'luminancia'
+        dst: Arreglo de salida opcional (uint8, mismo tamaño que el resultado)
     
     Returns:
         Imagen resultante
     """
-    # Convertir a grises si es necesario
-    if len(imagen.shape) == 3:
-        imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+    plano, ycrcb = _descomponer(imagen, modo_color)
     
-    # Sumar y saturar (clip) entre 0 y 255
-    resultado = np.clip(imagen.astype(np.int16) + valor, 0, 255).astype(np.uint8)
-    return resultado
+    # Sumar con saturación entre 0 y 255
+    resultado = cv2.add(plano, _escalar(valor), dst=_destino(dst, ycrcb))
+    return _recomponer(resultado, ycrcb, dst)
 
 
-def resta_escalar(imagen, valor):
+def resta_escalar(imagen, valor, modo_color='gris', dst=None):
     """
     Resta un valor escalar a todos los píxeles de la imagen
     
     Args:
         imagen: Imagen de entrada
         valor: Valor escalar a restar
+        modo_color: 'gris', 'canales' o 'luminancia'
+        dst: Arreglo de salida opcional (uint8, mismo tamaño que el resultado)
     
     Returns:
         Imagen resultante
     """
-    # Convertir a grises si es necesario
-    if len(imagen.shape) == 3:
-        imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+    plano, ycrcb = _descomponer(imagen, modo_color)
     
-    # Restar y saturar entre 0 y 255
-    resultado = np.clip(imagen.astype(np.int16) - valor, 0, 255).astype(np.uint8)
-    return resultado
+    # Restar con saturación entre 0 y 255
+    resultado = cv2.subtract(plano, _escalar(valor), dst=_destino(dst, ycrcb))
+    return _recomponer(resultado, ycrcb, dst)
 
 
-def multiplicacion_escalar(imagen, valor):
+def multiplicacion_escalar(imagen, valor, modo_color='gris', dst=None):
     """
     Multiplica todos los píxeles de la imagen por un valor escalar
     
     Args:
         imagen: Imagen de entrada
         valor: Valor escalar multiplicador
+        modo_color: 'gris', 'canales' o 'luminancia'
+        dst: Arreglo de salida opcional (uint8, mismo tamaño que el resultado)
     
     Returns:
         Imagen resultante
     """
-    # Convertir a grises si es necesario
-    if len(imagen.shape) == 3:
-        imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+    plano, ycrcb = _descomponer(imagen, modo_color)
     
-    # Multiplicar y saturar entre 0 y 255
-    resultado = np.clip(imagen.astype(np.float32) * valor, 0, 255).astype(np.uint8)
-    return resultado
+    # Multiplicar con saturación entre 0 y 255
+    resultado = cv2.multiply(plano, _escalar(valor), dst=_destino(dst, ycrcb))
+    return _recomponer(resultado, ycrcb, dst)
 
 
-def division_escalar(imagen, valor):
+def division_escalar(imagen, valor, modo_color='gris', dst=None):
     """
     Divide todos los píxeles de la imagen por un valor escalar
     
     Args:
         imagen: Imagen de entrada
         valor: Valor escalar divisor
+        modo_color: 'gris', 'canales' o 'luminancia'
+        dst: Arreglo de salida opcional (uint8, mismo tamaño que el resultado)
     
     Returns:
         Imagen resultante
     """
-    # Convertir a grises si es necesario
-    if len(imagen.shape) == 3:
-        imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
-    
     if valor == 0:
-        return imagen.copy()
+        imagen = _a_gris(imagen) if modo_color == 'gris' else imagen
+        if dst is None:
+            return imagen.copy()
+        np.copyto(dst, imagen)
+        return dst
     
-    # Dividir y saturar entre 0 y 255
-    resultado = np.clip(imagen.astype(np.float32) / valor, 0, 255).astype(np.uint8)
-    return resultado
-
+    plano, ycrcb = _descomponer(imagen, modo_color)
+    
+    # Dividir con saturación entre 0 y 255
+    resultado = cv2.multiply(plano, _escalar(1.0 / valor), dst=_destino(dst, ycrcb))
+    return _recomponer(resultado, ycrcb, dst)
 
-# ==================== OPERACIONES LÓGICAS ====================
 
-def operacion_and(imagen1, imagen2):
+def operacion_and(imagen1, imagen2, modo_color='gris', dst=None, cache=None):
     """
     Operación lógica AND bit a bit entre dos imágenes
     
     Args:
         imagen1: Primera imagen
         imagen2: Segunda imagen
+        modo_color: 'gris', 'canales' o 'luminancia'
+        dst: Arreglo de salida opcional (uint8, mismo tamaño que el resultado)
     
     Returns:
         Imagen resultante de la operación AND
     """
-    # Convertir ambas a grises
-    if len(imagen1.shape) == 3:
-        imagen1 = cv2.cvtColor(imagen1, cv2.COLOR_BGR2GRAY)
-    if len(imagen2.shape) == 3:
-        imagen2 = cv2.cvtColor(imagen2, cv2.COLOR_BGR2GRAY)
-    
-    # Asegurar mismo tamaño
-    if imagen1.shape != imagen2.shape:
-        imagen2 = cv2.resize(imagen2, (imagen1.shape[1], imagen1.shape[0]))
+    plano1, plano2, ycrcb = _preparar_par(imagen1, imagen2, modo_color, cache)
     
-    return cv2.bitwise_and(imagen1, imagen2)
+    resultado = cv2.bitwise_and(plano1, plano2, dst=_destino(dst, ycrcb))
+    return _recomponer(resultado, ycrcb, dst)
 
 
-def operacion_or(imagen1, imagen2):
+def operacion_or(imagen1, imagen2, modo_color='gris', dst=None, cache=None):
     """
     Operación lógica OR bit a bit entre dos imágenes
     
     Args:
         imagen1: Primera imagen
         imagen2: Segunda imagen
+        modo_color: 'gris', 'canales' o 'luminancia'
+        dst: Arreglo de salida opcional (uint8, mismo tamaño que el resultado)
     
     Returns:
         Imagen resultante de la operación OR
     """
-    # Convertir ambas a grises
-    if len(imagen1.shape) == 3:
-        imagen1 = cv2.cvtColor(imagen1, cv2.COLOR_BGR2GRAY)
-    if len(imagen2.shape) == 3:
-        imagen2 = cv2.cvtColor(imagen2, cv2.COLOR_BGR2GRAY)
+    plano1, plano2, ycrcb = _preparar_par(imagen1, imagen2, modo_color, cache)
     
-    # Asegurar mismo tamaño
-    if imagen1.shape != imagen2.shape:
-        imagen2 = cv2.resize(imagen2, (imagen1.shape[1], imagen1.shape[0]))
-    
-    return cv2.bitwise_or(imagen1, imagen2)
+    resultado = cv2.bitwise_or(plano1, plano2, dst=_destino(dst, ycrcb))
+    return _recomponer(resultado, ycrcb, dst)
 
 
-def operacion_xor(imagen1, imagen2):
+def operacion_xor(imagen1, imagen2, modo_color='gris', dst=None, cache=None):
     """
     Operación lógica XOR bit a bit entre dos imágenes
     
     Args:
         imagen1: Primera imagen
         imagen2: Segunda imagen
+        modo_color: 'gris', 'canales' o 'luminancia'
+        dst: Arreglo de salida opcional (uint8, mismo tamaño que el resultado)
     
     Returns:
         Imagen resultante de la operación XOR
     """
-    # Convertir ambas a grises
-    if len(imagen1.shape) == 3:
-        imagen1 = cv2.cvtColor(imagen1, cv2.COLOR_BGR2GRAY)
-    if len(imagen2.shape) == 3:
-        imagen2 = cv2.cvtColor(imagen2, cv2.COLOR_BGR2GRAY)
+    plano1, plano2, ycrcb = _preparar_par(imagen1, imagen2, modo_color, cache)
     
-    # Asegurar mismo tamaño
-    if imagen1.shape != imagen2.shape:
-        imagen2 = cv2.resize(imagen2, (imagen1.shape[1], imagen1.shape[0]))
-    
-    return cv2.bitwise_xor(imagen1, imagen2)
+    resultado = cv2.bitwise_xor(plano1, plano2, dst=_destino(dst, ycrcb))
+    return _recomponer(resultado, ycrcb, dst)
 
 
-def operacion_not(imagen):
+def operacion_not(imagen, modo_color='gris', dst=None):
     """
     Operación lógica NOT (inversión) de una imagen
     
     Args:
         imagen: Imagen de entrada
+        modo_color: 'gris', 'canales' o 'luminancia'
+        dst: Arreglo de salida opcional (uint8, mismo tamaño que el resultado)
     
     Returns:
         Imagen resultante de la operación NOT
     """
-    # Convertir a grises si es necesario
-    if len(imagen.shape) == 3:
-        imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+    plano, ycrcb = _descomponer(imagen, modo_color)
     
-    return cv2.bitwise_not(imagen)
+    resultado = cv2.bitwise_not(plano, dst=_destino(dst, ycrcb))
+    return _recomponer(resultado, ycrcb, dst)
 
 
-# ==================== OPERACIONES ARITMÉTICAS ====================
-
-def suma_imagenes(imagen1, imagen2, peso1=0.5, peso2=0.5):
+def suma_imagenes(imagen1, imagen2, peso1=0.5, peso2=0.5, modo_color='gris', dst=None, cache=None):
     """
     Suma aritmética de dos imágenes con pesos opcionales
     
@@ -194,123 +356,100 @@ def suma_imagenes(imagen1, imagen2, peso1=0.5, peso2=0.5):
         imagen2: Segunda imagen
         peso1: Peso para imagen1 (default 0.5)
         peso2: Peso para imagen2 (default 0.5)
+        modo_color: 'gris', 'canales' o 'luminancia'
+        dst: Arreglo de salida opcional (uint8, mismo tamaño que el resultado)
     
     Returns:
         Imagen resultante de la suma ponderada
     """
-    # Convertir ambas a grises
-    if len(imagen1.shape) == 3:
-        imagen1 = cv2.cvtColor(imagen1, cv2.COLOR_BGR2GRAY)
-    if len(imagen2.shape) == 3:
-        imagen2 = cv2.cvtColor(imagen2, cv2.COLOR_BGR2GRAY)
-    
-    # Asegurar mismo tamaño
-    if imagen1.shape != imagen2.shape:
-        imagen2 = cv2.resize(imagen2, (imagen1.shape[1], imagen1.shape[0]))
+    plano1, plano2, ycrcb = _preparar_par(imagen1, imagen2, modo_color, cache)
     
     # Suma ponderada
-    resultado = cv2.addWeighted(imagen1, peso1, imagen2, peso2, 0)
-    return resultado
+    resultado = cv2.addWeighted(plano1, peso1, plano2, peso2, 0, dst=_destino(dst, ycrcb))
+    return _recomponer(resultado, ycrcb, dst)
 
 
-def resta_imagenes(imagen1, imagen2):
+def resta_imagenes(imagen1, imagen2, modo_color='gris', dst=None, cache=None):
     """
     Resta aritmética de dos imágenes (imagen1 - imagen2)
     
     Args:
         imagen1: Primera imagen (minuendo)
         imagen2: Segunda imagen (sustraendo)
+        modo_color: 'gris', 'canales' o 'luminancia'
+        dst: Arreglo de salida opcional (uint8, mismo tamaño que el resultado)
     
     Returns:
         Imagen resultante de la resta
     """
-    # Convertir ambas a grises
-    if len(imagen1.shape) == 3:
-        imagen1 = cv2.cvtColor(imagen1, cv2.COLOR_BGR2GRAY)
-    if len(imagen2.shape) == 3:
-        imagen2 = cv2.cvtColor(imagen2, cv2.COLOR_BGR2GRAY)
-    
-    # Asegurar mismo tamaño
-    if imagen1.shape != imagen2.shape:
-        imagen2 = cv2.resize(imagen2, (imagen1.shape[1], imagen1.shape[0]))
+    plano1, plano2, ycrcb = _preparar_par(imagen1, imagen2, modo_color, cache)
     
     # Resta con saturación
-    resultado = cv2.subtract(imagen1, imagen2)
-    return resultado
+    resultado = cv2.subtract(plano1, plano2, dst=_destino(dst, ycrcb))
+    return _recomponer(resultado, ycrcb, dst)
 
 
-def multiplicacion_imagenes(imagen1, imagen2):
+def multiplicacion_imagenes(imagen1, imagen2, modo_color='gris', dst=None, cache=None):
     """
     Multiplicación aritmética de dos imágenes (píxel a píxel)
     
     Args:
         imagen1: Primera imagen
         imagen2: Segunda imagen
+        modo_color: 'gris', 'canales' o 'luminancia'
+        dst: Arreglo de salida opcional (uint8, mismo tamaño que el resultado)
     
     Returns:
         Imagen resultante de la multiplicación
     """
-    # Convertir ambas a grises
-    if len(imagen1.shape) == 3:
-        imagen1 = cv2.cvtColor(imagen1, cv2.COLOR_BGR2GRAY)
-    if len(imagen2.shape) == 3:
-        imagen2 = cv2.cvtColor(imagen2, cv2.COLOR_BGR2GRAY)
-    
-    # Asegurar mismo tamaño
-    if imagen1.shape != imagen2.shape:
-        imagen2 = cv2.resize(imagen2, (imagen1.shape[1], imagen1.shape[0]))
+    plano1, plano2, ycrcb = _preparar_par(imagen1, imagen2, modo_color, cache)
     
     # Multiplicar y normalizar
-    resultado = cv2.multiply(imagen1, imagen2, scale=1.0/255.0)
-    return resultado
+    resultado = cv2.multiply(plano1, plano2, dst=_destino(dst, ycrcb), scale=1.0/255.0)
+    return _recomponer(resultado, ycrcb, dst)
 
 
-def division_imagenes(imagen1, imagen2):
+def division_imagenes(imagen1, imagen2, modo_color='gris', dst=None, cache=None):
     """
     División aritmética de dos imágenes (imagen1 / imagen2)
     
     Args:
         imagen1: Primera imagen (dividendo)
         imagen2: Segunda imagen (divisor)
+        modo_color: 'gris', 'canales' o 'luminancia'
+        dst: Arreglo de salida opcional (uint8, mismo tamaño que el resultado)
     
     Returns:
         Imagen resultante de la división
     """
-    # Convertir ambas a grises
-    if len(imagen1.shape) == 3:
-        imagen1 = cv2.cvtColor(imagen1, cv2.COLOR_BGR2GRAY)
-    if len(imagen2.shape) == 3:
-        imagen2 = cv2.cvtColor(imagen2, cv2.COLOR_BGR2GRAY)
-    
-    # Asegurar mismo tamaño
-    if imagen1.shape != imagen2.shape:
-        imagen2 = cv2.resize(imagen2, (imagen1.shape[1], imagen1.shape[0]))
-    
-    # División con protección contra división por cero
-    imagen2_safe = np.where(imagen2 == 0, 1, imagen2)
-    resultado = np.clip((imagen1.astype(np.float32) / imagen2_safe.astype(np.float32)) * 255, 0, 255).astype(np.uint8)
-    return resultado
+    plano1, plano2, ycrcb = _preparar_par(imagen1, imagen2, modo_color, cache)
+    salida = _destino(dst, ycrcb)
+    
+    # Protección contra división por cero: el divisor 0 se trata como 1.
+    # El divisor seguro se escribe en la salida salvo que sea el dividendo
+    if salida is None or np.shares_memory(salida, plano1):
+        divisor = cv2.max(plano2, _escalar(1))
+    else:
+        divisor = cv2.max(plano2, _escalar(1), dst=salida)
+    
+    resultado = cv2.divide(plano1, divisor, dst=salida, scale=255.0)
+    return _recomponer(resultado, ycrcb, dst)
 
 
-def diferencia_absoluta(imagen1, imagen2):
+def diferencia_absoluta(imagen1, imagen2, modo_color='gris', dst=None, cache=None):
     """
     Diferencia absoluta entre dos imágenes |imagen1 - imagen2|
     
     Args:
         imagen1: Primera imagen
         imagen2: Segunda imagen
+        modo_color: 'gris', 'canales' o 'luminancia'
+        dst: Arreglo de salida opcional (uint8, mismo tamaño que el resultado)
     
     Returns:
         Imagen resultante de la diferencia absoluta
     """
-    # Convertir ambas a grises
-    if len(imagen1.shape) == 3:
-        imagen1 = cv2.cvtColor(imagen1, cv2.COLOR_BGR2GRAY)
-    if len(imagen2.shape) == 3:
-        imagen2 = cv2.cvtColor(imagen2, cv2.COLOR_BGR2GRAY)
-    
-    # Asegurar mismo tamaño
-    if imagen1.shape != imagen2.shape:
-        imagen2 = cv2.resize(imagen2, (imagen1.shape[1], imagen1.shape[0]))
+    plano1, plano2, ycrcb = _preparar_par(imagen1, imagen2, modo_color, cache)
     
-    return cv2.absdiff(imagen1, imagen2)
+    resultado = cv2.absdiff(plano1, plano2, dst=_destino(dst, ycrcb))
+    return _recomponer(resultado, ycrcb, dst)
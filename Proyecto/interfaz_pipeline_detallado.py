@@ -17,6 +17,7 @@ if directorio_raiz not in sys.path:
     sys.path.insert(0, directorio_raiz)
 
 from Proyecto.pipeline_detallado_ocr import PipelineDetalladoOCR
+from ImagenDigital.procesamiento_basico import leer_imagen
 
 
 class InterfazPipelineDetallado:
@@ -130,7 +131,7 @@ class InterfazPipelineDetallado:
             return
         
         try:
-            self.imagen_original = cv2.imread(ruta)
+            self.imagen_original = leer_imagen(ruta)
             if self.imagen_original is None:
                 raise Exception("No se pudo cargar la imagen")
             
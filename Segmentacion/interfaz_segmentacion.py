@@ -11,6 +11,16 @@ from PIL import Image, ImageTk
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
+import sys
+import os
+
+# Importar el visor compartido desde el directorio raíz del proyecto
+directorio_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if directorio_raiz not in sys.path:
+    sys.path.insert(0, directorio_raiz)
+
+from ImagenDigital.visor_imagen import VisorImagen
+from ImagenDigital.procesamiento_basico import leer_imagen
 
 # Importar módulos propios
 from tecnicas_umbralizacion import (
@@ -43,6 +53,7 @@ class InterfazSegmentacion:
         self.imagen_procesada = None
         self.contornos_detectados = None
         self.propiedades_objetos = None
+        self.visores = {}
         
         self.crear_interfaz()
     
@@ -369,7 +380,7 @@ class InterfazSegmentacion:
         )
         
         if ruta:
-            self.imagen_original = cv2.imread(ruta)
+            self.imagen_original = leer_imagen(ruta)
             if self.imagen_original is None:
                 messagebox.showerror("Error", "No se pudo cargar la imagen")
                 return
@@ -383,22 +394,10 @@ class InterfazSegmentacion:
         if imagen is None:
             return
         
-        if len(imagen.shape) == 3:
-            imagen_rgb = cv2.cvtColor(imagen, cv2.COLOR_BGR2RGB)
-        else:
-            imagen_rgb = cv2.cvtColor(imagen, cv2.COLOR_GRAY2RGB)
-        
-        h, w = imagen_rgb.shape[:2]
-        factor = min(tamano_max[0]/w, tamano_max[1]/h)
-        if factor < 1:
-            nuevo_w, nuevo_h = int(w*factor), int(h*factor)
-            imagen_rgb = cv2.resize(imagen_rgb, (nuevo_w, nuevo_h))
-        
-        imagen_pil = Image.fromarray(imagen_rgb)
-        imagen_tk = ImageTk.PhotoImage(imagen_pil)
-        
-        label.config(image=imagen_tk)
-        label.image = imagen_tk
+        # Un visor por label: reutiliza su PhotoImage y la pirámide de la imagen
+        if label not in self.visores:
+            self.visores[label] = VisorImagen(label)
+        self.visores[label].mostrar(imagen, tamano_max)
     
     def mostrar_histogramas_comparacion(self, img_original, img_procesada):
         """Muestra histogramas comparativos de las imágenes original y procesada"""